@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark opening a persistent Chroma collection from a fresh process
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+import numpy as np
+
+# Runs in a fresh interpreter so nothing is warm from the populate step; opens
+# the collection through the same shared client the application uses
+OPEN_SCRIPT = """
+import json, sys, time
+import numpy as np
+start = time.perf_counter()
+from src.vectordb.resources import get_chroma_client
+imported = time.perf_counter()
+client = get_chroma_client(sys.argv[1], mode="persistent")
+collection = client.get_collection(sys.argv[2])
+opened = time.perf_counter()
+count = collection.count()
+counted = time.perf_counter()
+query = np.random.default_rng(1).standard_normal((1, int(sys.argv[3])), dtype=np.float32)
+collection.query(query_embeddings=query, n_results=5)
+first_query = time.perf_counter()
+collection.query(query_embeddings=query * 0.5, n_results=5)
+second_query = time.perf_counter()
+print(json.dumps({
+    "count": count,
+    "import": imported - start,
+    "open": opened - imported,
+    "count_s": counted - opened,
+    "first_query": first_query - counted,
+    "warm_query": second_query - first_query,
+}))
+"""
+
+
+def populate(path: str, name: str, chunks: int, dimension: int, batch_size: int) -> None:
+    from src.vectordb.resources import get_chroma_client
+
+    client = get_chroma_client(path, mode="persistent")
+    collection = client.get_or_create_collection(name)
+    existing = collection.count()
+    if existing >= chunks:
+        print(f"Reusing existing collection with {existing} chunks")
+        return
+
+    rng = np.random.default_rng(0)
+    batch_size = min(batch_size, client.get_max_batch_size())
+    start = time.perf_counter()
+    for offset in range(existing, chunks, batch_size):
+        size = min(batch_size, chunks - offset)
+        collection.upsert(
+            ids=[f"chunk-{i}" for i in range(offset, offset + size)],
+            embeddings=rng.standard_normal((size, dimension), dtype=np.float32),
+            documents=[f"synthetic chunk {i}" for i in range(offset, offset + size)],
+            metadatas=[{"source": f"synthetic/doc_{i // 50}.txt"} for i in range(offset, offset + size)]
+        )
+        done = offset + size
+        elapsed = time.perf_counter() - start
+        print(f"\rPopulated {done}/{chunks} chunks ({(done - existing) / elapsed:.0f}/s)", end="", flush=True)
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure persistent collection open/query time and check data survives restarts"
+    )
+    parser.add_argument("--chunks", type=int, default=1_000_000, help="Chunks in the collection")
+    parser.add_argument("--dimension", type=int, default=384, help="Embedding dimension")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Chunks per upsert while populating")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh-process opens to time")
+    parser.add_argument(
+        "--persist-dir",
+        type=str,
+        default=None,
+        help="Directory to populate/reuse (default: a temporary directory)"
+    )
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = args.persist_dir or temp_dir
+        name = "open_bench"
+        populate(path, name, args.chunks, args.dimension, args.batch_size)
+
+        print(f"\n{'run':<4} {'count':>9} {'import s':>9} {'open s':>8} {'count s':>8} {'1st query s':>12} {'warm ms':>8}")
+        for run in range(1, args.runs + 1):
+            output = subprocess.run(
+                [sys.executable, "-c", OPEN_SCRIPT, path, name, str(args.dimension)],
+                cwd=ROOT,
+                capture_output=True,
+                text=True,
+                check=True
+            ).stdout
+            timings = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{run:<4} {timings['count']:>9} {timings['import']:>9.2f} {timings['open']:>8.3f} "
+                f"{timings['count_s']:>8.3f} {timings['first_query']:>12.2f} {timings['warm_query'] * 1000:>8.1f}"
+            )
+            if timings["count"] < args.chunks:
+                print(f"Persistence check failed: expected {args.chunks} chunks after reopening")
+                sys.exit(1)
+
+        print(f"\nPersistence check passed: all {args.chunks} chunks visible from new processes")
+
+
+if __name__ == "__main__":
+    main()
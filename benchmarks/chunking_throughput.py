@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark the token-aware chunker against the character-based recursive splitter on large documents
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain.docstore.document import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from src.ingestion import DocumentProcessor
+from src.ingestion.chunker import TokenChunker
+from benchmarks.corpus import WORDS, words
+
+
+def build_document(size_mb: float, seed: int, layout: str = "markdown") -> str:
+    """Markdown-like text with headings, paragraphs and sentences of varied length.
+
+    The ``lines`` layout instead hard-wraps plain text at 80 characters with no
+    blank lines, like text extracted from PDFs.
+    """
+    rng = random.Random(seed)
+    parts, size, section = [], 0, 0
+    while size < size_mb * 1_048_576:
+        if rng.random() < 0.05:
+            section += 1
+            part = f"\n\n## Section {section}: {rng.choice(WORDS).title()}\n\n"
+        else:
+            part = words(rng, rng.randint(5, 30)).capitalize() + rng.choice([". ", ". ", "? ", ".\n\n"])
+        parts.append(part)
+        size += len(part)
+    text = "".join(parts)
+    if layout == "lines":
+        flat = " ".join(text.replace("## ", "").split())
+        text = "\n".join(flat[i:i + 80] for i in range(0, len(flat), 80))
+    return text
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare chunking throughput and chunk token sizes across chunking strategies"
+    )
+    parser.add_argument("--docs", type=int, default=3, help="Number of documents")
+    parser.add_argument("--size-mb", type=float, default=4.0, help="Size of each document in MiB")
+    parser.add_argument("--layout", choices=["markdown", "lines"], default="markdown", help="Document layout")
+    parser.add_argument("--model-limit", type=int, default=256, help="Embedding model max sequence length")
+    parser.add_argument(
+        "--skip-token-splitter",
+        action="store_true",
+        help="Skip the recursive splitter measuring length in tokens (slow on large corpora)"
+    )
+
+    args = parser.parse_args()
+    documents = [
+        Document(page_content=build_document(args.size_mb, seed, args.layout), metadata={"source": f"doc_{seed}.md"})
+        for seed in range(args.docs)
+    ]
+    total_mb = sum(len(document.page_content) for document in documents) / 1_048_576
+    # Token sizes of every strategy's chunks are measured with the same tokenizer
+    counter = TokenChunker()
+    tokenizer = "model tokenizer" if counter.tokenizer is not None else "regex estimate"
+
+    print(f"Corpus: {args.docs} documents, {total_mb:.1f} MiB; chunk tokens measured with {tokenizer}")
+    # The recursive splitter can size by tokens too, but re-tokenizes every candidate piece
+    token_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=counter.max_tokens,
+        chunk_overlap=counter.overlap_tokens,
+        length_function=counter.count_tokens
+    )
+    strategies = [("character", DocumentProcessor(chunking_strategy="character").iter_split_documents)]
+    if not args.skip_token_splitter:
+        strategies.append(("recursive-tokens", token_splitter.split_documents))
+    strategies.append(("token", DocumentProcessor(chunking_strategy="token").iter_split_documents))
+
+    print(
+        f"{'strategy':<17} {'seconds':>8} {'MiB/s':>7} {'chunks':>7} "
+        f"{'mean tok':>9} {'max tok':>8} {f'>{args.model_limit} tok':>9} {'speedup':>8}"
+    )
+
+    baseline = None
+    for strategy, split in strategies:
+        start = time.perf_counter()
+        chunks = list(split(documents))
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+
+        tokens = [counter.count_tokens(chunk.page_content) + 2 for chunk in chunks]  # + [CLS]/[SEP]
+        truncated = sum(count > args.model_limit for count in tokens)
+        print(
+            f"{strategy:<17} {elapsed:>8.2f} {total_mb / elapsed:>7.2f} {len(chunks):>7} "
+            f"{statistics.mean(tokens):>9.1f} {max(tokens):>8} {truncated / len(chunks):>9.1%} "
+            f"{baseline / elapsed:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
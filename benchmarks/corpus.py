@@ -0,0 +1,40 @@
+"""
+Synthetic text shared by the benchmarks, so every benchmark draws on one vocabulary
+"""
+import random
+from typing import List
+
+WORDS = (
+    "revenue forecast quarterly policy contract clause vendor invoice compliance "
+    "audit retention schedule region warehouse shipment liability coverage term "
+    "notwithstanding indemnification subcontractor reconciliation interoperability "
+    "pump valve pressure seal flange gasket bearing motor shaft impeller housing "
+    "inspection maintenance warranty order supplier delivery torque calibration "
+    "sensor controller firmware voltage current thermal report summary"
+).split()
+
+
+def words(rng: random.Random, count: int) -> str:
+    """``count`` random vocabulary words separated by spaces."""
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def title(rng: random.Random, count: int = 4) -> str:
+    return words(rng, count).title()
+
+
+def sentence(rng: random.Random, min_words: int = 6, max_words: int = 14) -> str:
+    return words(rng, rng.randint(min_words, max_words)).capitalize() + "."
+
+
+def sentences(rng: random.Random, count: int, min_words: int = 6, max_words: int = 14) -> List[str]:
+    return [sentence(rng, min_words, max_words) for _ in range(count)]
+
+
+def paragraph(rng: random.Random, min_sentences: int = 3, max_sentences: int = 8) -> str:
+    return " ".join(sentences(rng, rng.randint(min_sentences, max_sentences), 8, 25))
+
+
+def part_number(rng: random.Random) -> str:
+    """An identifier such as ``XJ-9920``, which only exact keyword matching finds reliably."""
+    return f"{rng.choice('ABCDEFGHJKXZ')}{rng.choice('ABCDEFGHJKXZ')}-{rng.randint(1000, 9999)}"
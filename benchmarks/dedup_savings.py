@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark near-duplicate chunk collapsing on a corpus with copied and lightly edited documents
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ingestion.chunker import TokenChunker
+from src.vectordb.dedup_index import DedupIndex
+from benchmarks.corpus import WORDS, paragraph
+
+
+def build_document(rng: random.Random, paragraphs: int) -> str:
+    return "\n\n".join(paragraph(rng) for _ in range(paragraphs))
+
+
+def edit_document(rng: random.Random, text: str, rate: float) -> str:
+    """Replace roughly ``rate`` of the words, as between two versions of a file."""
+    words = text.split(" ")
+    for i in range(len(words)):
+        if rng.random() < rate:
+            words[i] = rng.choice(WORDS)
+    return " ".join(words)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure how many chunks and how much index size near-duplicate collapsing saves"
+    )
+    parser.add_argument("--documents", type=int, default=200, help="Distinct base documents")
+    parser.add_argument("--paragraphs", type=int, default=40, help="Paragraphs per document")
+    parser.add_argument("--copies", type=int, default=2, help="Exact copies of each document")
+    parser.add_argument("--versions", type=int, default=2, help="Edited versions of each document")
+    parser.add_argument("--edit-rate", type=float, default=0.01, help="Fraction of words changed per version")
+    parser.add_argument("--threshold", type=float, default=0.85, help="Estimated Jaccard similarity to collapse")
+    parser.add_argument("--dimension", type=int, default=384, help="Embedding dimension for size estimates")
+
+    args = parser.parse_args()
+    rng = random.Random(0)
+    chunker = TokenChunker()
+
+    files = []
+    for index in range(args.documents):
+        base = build_document(rng, args.paragraphs)
+        files.append((f"doc_{index}.md", base))
+        files.extend((f"doc_{index}_copy{copy}.md", base) for copy in range(args.copies))
+        files.extend(
+            (f"doc_{index}_v{version}.md", edit_document(rng, base, args.edit_rate))
+            for version in range(args.versions)
+        )
+    chunked = [(name, list(chunker.iter_chunks(text))) for name, text in files]
+    total = sum(len(chunks) for _, chunks in chunked)
+    text_bytes = sum(len(chunk.encode("utf-8")) for _, chunks in chunked for chunk in chunks)
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = DedupIndex(os.path.join(directory, "dedup.sqlite"), threshold=args.threshold)
+        exact = near = saved_bytes = 0
+        start = time.perf_counter()
+        for name, chunks in chunked:
+            matches = index.add(
+                [f"{name}:{i}" for i in range(len(chunks))], chunks, [name] * len(chunks), [{}] * len(chunks)
+            )
+            for chunk, match in zip(chunks, matches):
+                if match is None:
+                    continue
+                exact += match[1]
+                near += not match[1]
+                saved_bytes += args.dimension * 4 + len(chunk.encode("utf-8"))
+        elapsed = time.perf_counter() - start
+        stored = index.count
+        index.close()
+
+    vector_bytes = args.dimension * 4
+    before = total * vector_bytes + text_bytes
+    print(
+        f"Corpus: {len(files)} files ({args.documents} documents, {args.copies} copies and "
+        f"{args.versions} versions at {args.edit_rate:.1%} edits each), {total} chunks"
+    )
+    print(f"Dedup:  {elapsed:.2f}s ({total / elapsed:.0f} chunks/s)")
+    print(f"Stored: {stored} chunks ({exact} exact and {near} near duplicates collapsed)")
+    # Every version of a document is a candidate duplicate of the first copy's chunks
+    ideal = total - sum(len(chunks) for name, chunks in chunked if "_" not in name[len("doc_"):])
+    if ideal:
+        print(f"Near-duplicate versions collapsed: {exact + near}/{ideal} ({(exact + near) / ideal:.1%})")
+    print(
+        f"Index:  {before / 1_048_576:.1f} MiB -> {(before - saved_bytes) / 1_048_576:.1f} MiB "
+        f"of vectors and text ({saved_bytes / before:.1%} saved)"
+    )
+
+
+if __name__ == "__main__":
+    main()
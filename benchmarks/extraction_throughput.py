@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-format text extraction: native extractors vs the LangChain loaders
+"""
+import os
+import sys
+import csv
+import json
+import time
+import random
+import argparse
+import logging
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ingestion import DocumentProcessor
+from src.ingestion.document_processor import LOADER_EXTENSIONS
+from benchmarks.corpus import WORDS, sentences, title
+
+
+def write_pdf(path: str, pages: list) -> None:
+    """Write a minimal multi-page PDF with one Helvetica text stream per page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for lines in pages:
+        text = " T* ".join(f"({line}) Tj" for line in lines)
+        stream = f"BT /F1 10 Tf 12 TL 40 800 Td {text} ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(f.tell())
+            f.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+        xref = f.tell()
+        f.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+        for offset in offsets:
+            f.write(f"{offset:010d} 00000 n \n".encode())
+        f.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+
+
+def build_file(directory: str, extension: str, index: int, units: int) -> str:
+    """Write one synthetic document with ``units`` pages/sheets/slides/sections."""
+    rng = random.Random(index)
+    path = os.path.join(directory, f"doc_{index:04d}{extension}")
+
+    if extension == ".pdf":
+        write_pdf(path, [sentences(rng, 40) for _ in range(units)])
+    elif extension == ".xlsx":
+        from openpyxl import Workbook
+        workbook = Workbook()
+        workbook.remove(workbook.active)
+        for sheet_number in range(units):
+            sheet = workbook.create_sheet(f"Sheet{sheet_number + 1}")
+            sheet.append(["region", "item", "amount", "note"])
+            for _ in range(200):
+                sheet.append([rng.choice(WORDS), rng.choice(WORDS), rng.randint(1, 10_000), sentences(rng, 1)[0]])
+        workbook.save(path)
+    elif extension == ".pptx":
+        from pptx import Presentation
+        presentation = Presentation()
+        for _ in range(units):
+            slide = presentation.slides.add_slide(presentation.slide_layouts[1])
+            slide.shapes.title.text = title(rng)
+            slide.placeholders[1].text = "\n".join(sentences(rng, 8))
+        presentation.save(path)
+    elif extension == ".docx":
+        import docx
+        document = docx.Document()
+        for _ in range(units):
+            document.add_heading(title(rng), level=2)
+            document.add_paragraph(" ".join(sentences(rng, 30)))
+        document.save(path)
+    elif extension == ".csv":
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["region", "item", "amount", "note"])
+            for _ in range(units * 50):
+                writer.writerow([rng.choice(WORDS), rng.choice(WORDS), rng.randint(1, 10_000), sentences(rng, 1)[0]])
+    elif extension == ".json":
+        records = [
+            {"id": i, "region": rng.choice(WORDS), "details": {"note": sentences(rng, 2), "amount": rng.randint(1, 999)}}
+            for i in range(units * 50)
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(records, f)
+    elif extension == ".html":
+        body = "".join(f"<h2>Section {i}</h2><p>{' '.join(sentences(rng, 30))}</p>" for i in range(units))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"<html><head><title>Doc {index}</title><style>p {{}}</style></head><body>{body}</body></html>")
+    elif extension == ".md":
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n\n".join(f"## Section {i}\n\n{' '.join(sentences(rng, 30))}" for i in range(units)))
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n\n".join(" ".join(sentences(rng, 30)) for _ in range(units)))
+    return path
+
+
+def measure(processor: DocumentProcessor, paths: list) -> tuple:
+    start = time.perf_counter()
+    documents = [document for path in paths for document in processor.load_document(path)]
+    return time.perf_counter() - start, documents
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare native extractor and LangChain loader throughput per file format"
+    )
+    parser.add_argument("--files", type=int, default=20, help="Files per format")
+    parser.add_argument("--units", type=int, default=10, help="Pages/sheets/slides/sections per file")
+    parser.add_argument(
+        "--formats",
+        type=str,
+        default=".pdf,.docx,.xlsx,.pptx,.txt,.md,.csv,.json,.html",
+        help="Comma-separated extensions to benchmark"
+    )
+
+    args = parser.parse_args()
+    # Failed loaders (e.g. Unstructured not installed) are reported in the table instead
+    logging.disable(logging.ERROR)
+
+    native = DocumentProcessor(use_native_extractors=True)
+    loaders = DocumentProcessor(use_native_extractors=False)
+
+    print(f"{'format':<7} {'MiB':>6} {'native files/s':>15} {'loader files/s':>15} {'speedup':>8} {'docs':>6}  metadata")
+    with tempfile.TemporaryDirectory() as directory:
+        for extension in args.formats.split(","):
+            try:
+                paths = [build_file(directory, extension, i, args.units) for i in range(args.files)]
+            except ImportError as e:
+                print(f"{extension:<7} skipped: cannot build sample files ({e})")
+                continue
+            size_mb = sum(os.path.getsize(path) for path in paths) / 1_048_576
+
+            native_seconds, documents = measure(native, paths)
+            loader_seconds, loader_documents = measure(loaders, paths)
+
+            native_rate = f"{args.files / native_seconds:.1f}" if documents else "failed"
+            if extension not in LOADER_EXTENSIONS:
+                loader_rate = "unsupported"
+            else:
+                loader_rate = f"{args.files / loader_seconds:.1f}" if loader_documents else "unavailable"
+            speedup = f"{loader_seconds / native_seconds:.1f}x" if documents and loader_documents else "-"
+            keys = sorted(documents[0].metadata) if documents else []
+            print(
+                f"{extension:<7} {size_mb:>6.1f} {native_rate:>15} {loader_rate:>15} {speedup:>8} "
+                f"{len(documents):>6}  {', '.join(keys)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
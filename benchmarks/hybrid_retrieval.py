@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark vector, keyword (BM25) and hybrid (RRF) retrieval latency on a synthetic corpus
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from langchain.docstore.document import Document
+from config import settings
+from benchmarks.corpus import part_number, words
+
+
+def make_corpus(num_chunks: int, words_per_chunk: int, seed: int) -> list:
+    rng = random.Random(seed)
+    documents = []
+    for i in range(num_chunks):
+        tokens = words(rng, words_per_chunk).split()
+        tokens.insert(rng.randrange(len(tokens)), part_number(rng))
+        source = f"synthetic/doc_{i // 20}.txt"
+        documents.append(Document(
+            page_content=" ".join(tokens),
+            metadata={"source": source, "filename": os.path.basename(source)}
+        ))
+    return documents
+
+
+def make_queries(num_queries: int, seed: int) -> list:
+    rng = random.Random(seed + 1)
+    queries = []
+    for i in range(num_queries):
+        if i % 2:
+            queries.append(f"which documents mention {part_number(rng)}")
+        else:
+            queries.append(words(rng, 4) + f" {i}")
+    return queries
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare retrieval latency across retrieval modes")
+    parser.add_argument("--chunks", type=int, default=20000, help="Synthetic chunks to index")
+    parser.add_argument("--words", type=int, default=120, help="Words per chunk")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per mode")
+    parser.add_argument("--top-k", type=int, default=5, help="Results per query")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Chunks per add_documents call")
+    parser.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+
+    # Measure retrieval itself, not the caches in front of it
+    settings.query_cache_size = 0
+    settings.embedding_cache_enabled = False
+
+    from src.vectordb import ChromaVectorDB
+
+    with tempfile.TemporaryDirectory() as persist_dir:
+        vector_db = ChromaVectorDB(collection_name="hybrid_bench", persist_directory=persist_dir)
+        dimension = vector_db.embedding_model.dimension
+
+        documents = make_corpus(args.chunks, args.words, args.seed)
+        rng = np.random.default_rng(args.seed)
+
+        start = time.perf_counter()
+        for i in range(0, len(documents), args.batch_size):
+            batch = documents[i:i + args.batch_size]
+            # Random vectors keep the benchmark about retrieval rather than encoding
+            embeddings = rng.standard_normal((len(batch), dimension), dtype=np.float32)
+            vector_db.add_documents(batch, embeddings)
+        elapsed = time.perf_counter() - start
+        print(f"Indexed {len(documents)} chunks (Chroma + BM25) in {elapsed:.1f}s")
+
+        queries = make_queries(args.queries, args.seed)
+
+        print(f"\n{'mode':<9} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8}")
+        for mode in ("vector", "keyword", "hybrid"):
+            timings = []
+            for query_text in queries:
+                start = time.perf_counter()
+                vector_db.query(query_text, n_results=args.top_k, mode=mode)
+                timings.append((time.perf_counter() - start) * 1000)
+            print(
+                f"{mode:<9} {percentile(timings, 0.5):>8.2f} {percentile(timings, 0.95):>8.2f} "
+                f"{statistics.mean(timings):>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
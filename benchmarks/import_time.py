@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark CLI cold-start and package import times
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {
+    "ingest.py --help": [sys.executable, "ingest.py", "--help"],
+    "query.py --help": [sys.executable, "query.py", "--help"],
+    "serve.py --help": [sys.executable, "serve.py", "--help"],
+    "import config": [sys.executable, "-c", "import config"],
+    "import src.storage": [sys.executable, "-c", "import src.storage"],
+    "import src.ingestion": [sys.executable, "-c", "import src.ingestion"],
+    "import src.vectordb": [sys.executable, "-c", "import src.vectordb"],
+    "import src.rag": [sys.executable, "-c", "import src.rag"],
+}
+
+
+def time_command(command: list, runs: int) -> float:
+    """Return the median wall time of a command in fresh interpreters."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def slowest_imports(command: list, limit: int) -> list:
+    """Return the slowest cumulative module imports reported by -X importtime."""
+    result = subprocess.run(
+        [command[0], "-X", "importtime", *command[1:]],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=False
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, module = line.split("|", 2)
+        rows.append((int(cumulative_us), module.strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure CLI cold-start time to catch import-time regressions"
+    )
+    parser.add_argument("--runs", type=int, default=5, help="Runs per target (median reported)")
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        default=None,
+        help="Exit non-zero if any '--help' cold start exceeds this many seconds"
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=0,
+        help="Also list the N slowest imports for each CLI '--help'"
+    )
+
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'target':<24} {'median s':>9}")
+    for name, command in TARGETS.items():
+        elapsed = time_command(command, args.runs)
+        print(f"{name:<24} {elapsed:>9.3f}")
+        if args.max_seconds is not None and name.endswith("--help") and elapsed > args.max_seconds:
+            failures.append(name)
+
+    if args.top:
+        for name, command in TARGETS.items():
+            if not name.endswith("--help"):
+                continue
+            print(f"\nSlowest imports for {name}:")
+            for cumulative_us, module in slowest_imports(command, args.top):
+                print(f"  {cumulative_us / 1000:>9.1f} ms  {module}")
+
+    if failures:
+        print(f"\nCold start over {args.max_seconds}s: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
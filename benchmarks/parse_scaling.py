@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark DocumentProcessor parsing/chunking throughput across worker counts
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ingestion import DocumentProcessor
+from benchmarks.corpus import sentence
+
+
+def build_corpus(directory: str, files: int, size_kb: int) -> list:
+    """Write a synthetic corpus of plain-text documents."""
+    rng = random.Random(0)
+    paths = []
+    for i in range(files):
+        path = os.path.join(directory, f"doc_{i:05d}.txt")
+        parts = []
+        while len(" ".join(parts)) < size_kb * 1024:
+            parts.append(sentence(rng, 6, 18))
+            if rng.random() < 0.1:
+                parts.append("\n\n")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(" ".join(parts))
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure parse/chunk scaling of DocumentProcessor on a synthetic corpus"
+    )
+    parser.add_argument("--files", type=int, default=200, help="Number of documents")
+    parser.add_argument("--size-kb", type=int, default=256, help="Size of each document in KiB")
+    parser.add_argument(
+        "--workers",
+        type=str,
+        default="1,2,4,8",
+        help="Comma-separated worker counts to benchmark"
+    )
+
+    args = parser.parse_args()
+    processor = DocumentProcessor()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = build_corpus(directory, args.files, args.size_kb)
+        total_mb = args.files * args.size_kb / 1024
+
+        print(f"Corpus: {args.files} files, {total_mb:.1f} MiB")
+        print(f"{'workers':>8} {'seconds':>9} {'files/s':>9} {'MiB/s':>8} {'chunks':>8} {'speedup':>8}")
+
+        baseline = None
+        for workers in (int(w) for w in args.workers.split(",")):
+            start = time.perf_counter()
+            chunks = sum(
+                len(c or []) for _, c in processor.iter_process_documents(paths, max_workers=workers)
+            )
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(
+                f"{workers:>8} {elapsed:>9.2f} {args.files / elapsed:>9.1f} "
+                f"{total_mb / elapsed:>8.2f} {chunks:>8} {baseline / elapsed:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark cross-encoder reranking latency by candidate count and batch size
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from benchmarks.corpus import words
+
+
+def make_results(rng: random.Random, candidates: int) -> dict:
+    """A Chroma-style single-query result with chunks of mixed length."""
+    documents = [
+        words(rng, rng.randint(20, 250))
+        for _ in range(candidates)
+    ]
+    return {
+        "ids": [[f"chunk_{i}" for i in range(candidates)]],
+        "documents": [documents],
+        "metadatas": [[{"source": f"synthetic/doc_{i}.txt"} for i in range(candidates)]],
+        "distances": [[i / candidates for i in range(candidates)]]
+    }
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cross-encoder rerank latency per query")
+    parser.add_argument("--model", default=settings.rerank_model, help="Cross-encoder model")
+    parser.add_argument("--candidates", type=int, nargs="+", default=[10, 20, 50], help="Candidates per query")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 32], help="Pairs per model batch")
+    parser.add_argument("--queries", type=int, default=20, help="Queries per configuration")
+    parser.add_argument("--top-n", type=int, default=5, help="Results kept after reranking")
+    parser.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+
+    # Every query is new, so measure the model rather than the score cache
+    settings.query_cache_size = 0
+
+    from src.vectordb.reranker import CrossEncoderReranker
+
+    start = time.perf_counter()
+    reranker = CrossEncoderReranker(args.model)
+    print(f"Loaded {args.model} in {time.perf_counter() - start:.1f}s")
+
+    rng = random.Random(args.seed)
+    # Warm up so the first configuration does not pay for lazy initialization
+    reranker.rerank("warm up", make_results(rng, 4), args.top_n)
+
+    print(f"\n{'candidates':>10} {'batch':>6} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8} {'pairs/s':>8}")
+    for candidates in args.candidates:
+        for batch_size in args.batch_sizes:
+            reranker.batch_size = batch_size
+            timings = []
+            for i in range(args.queries):
+                query_text = words(rng, 6) + f" {i}"
+                results = make_results(rng, candidates)
+                start = time.perf_counter()
+                reranker.rerank(query_text, results, args.top_n)
+                timings.append((time.perf_counter() - start) * 1000)
+            mean = statistics.mean(timings)
+            print(
+                f"{candidates:>10} {batch_size:>6} {percentile(timings, 0.5):>8.1f} "
+                f"{percentile(timings, 0.95):>8.1f} {mean:>8.1f} {candidates / mean * 1000:>8.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
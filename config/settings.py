@@ -21,16 +21,84 @@ class Settings(BaseSettings):
     azure_storage_connection_string: str = Field(default="", env="AZURE_STORAGE_CONNECTION_STRING")
     azure_container_name: str = Field(default="", env="AZURE_CONTAINER_NAME")
 
+    # Local storage
+    local_storage_path: str = Field(default="./data", env="LOCAL_STORAGE_PATH")
+
+    # Downloads
+    download_concurrency: int = Field(default=16, env="DOWNLOAD_CONCURRENCY")
+    download_max_retries: int = Field(default=3, env="DOWNLOAD_MAX_RETRIES")
+    download_retry_backoff: float = Field(default=0.5, env="DOWNLOAD_RETRY_BACKOFF")
+    download_in_memory_max_bytes: int = Field(default=8 * 1024 * 1024, env="DOWNLOAD_IN_MEMORY_MAX_BYTES")
+
+    # Ingestion
+    ingestion_manifest_path: str = Field(default="", env="INGESTION_MANIFEST_PATH")
+    ingest_batch_size: int = Field(default=256, env="INGEST_BATCH_SIZE")
+    ingest_queue_size: int = Field(default=8, env="INGEST_QUEUE_SIZE")
+    parse_workers: int = Field(default=1, env="PARSE_WORKERS")
+    parse_timeout: float = Field(default=300.0, env="PARSE_TIMEOUT")
+    native_extractors_enabled: bool = Field(default=True, env="NATIVE_EXTRACTORS_ENABLED")
+    chunking_strategy: str = Field(default="token", env="CHUNKING_STRATEGY")
+    chunk_tokens: int = Field(default=254, env="CHUNK_TOKENS")
+    chunk_overlap_tokens: int = Field(default=32, env="CHUNK_OVERLAP_TOKENS")
+    dedup_enabled: bool = Field(default=True, env="DEDUP_ENABLED")
+    dedup_threshold: float = Field(default=0.85, env="DEDUP_THRESHOLD")
+    dedup_index_path: str = Field(default="", env="DEDUP_INDEX_PATH")
+
     # Vector DB
+    chroma_client_mode: str = Field(default="persistent", env="CHROMA_CLIENT_MODE")
     chroma_persist_directory: str = Field(default="./chroma_db", env="CHROMA_PERSIST_DIRECTORY")
+    chroma_host: str = Field(default="localhost", env="CHROMA_HOST")
+    chroma_port: int = Field(default=8001, env="CHROMA_PORT")
     collection_name: str = Field(default="documents", env="COLLECTION_NAME")
+    query_cache_size: int = Field(default=1024, env="QUERY_CACHE_SIZE")
+    query_cache_ttl: float = Field(default=300.0, env="QUERY_CACHE_TTL")
+    upsert_batch_size: int = Field(default=5000, env="UPSERT_BATCH_SIZE")
+
+    # Retrieval
+    retrieval_mode: str = Field(default="vector", env="RETRIEVAL_MODE")
+    bm25_index_enabled: bool = Field(default=True, env="BM25_INDEX_ENABLED")
+    bm25_index_path: str = Field(default="", env="BM25_INDEX_PATH")
+    hybrid_candidate_multiplier: int = Field(default=4, env="HYBRID_CANDIDATE_MULTIPLIER")
+    rrf_k: int = Field(default=60, env="RRF_K")
+
+    # Reranking
+    rerank_enabled: bool = Field(default=False, env="RERANK_ENABLED")
+    rerank_model: str = Field(default="cross-encoder/ms-marco-MiniLM-L-6-v2", env="RERANK_MODEL")
+    rerank_candidates: int = Field(default=20, env="RERANK_CANDIDATES")
+    rerank_batch_size: int = Field(default=32, env="RERANK_BATCH_SIZE")
+
+    # Context assembly
+    context_max_tokens: int = Field(default=3000, env="CONTEXT_MAX_TOKENS")
+    context_duplicate_threshold: float = Field(default=0.9, env="CONTEXT_DUPLICATE_THRESHOLD")
 
     # Embedding
     embedding_model: str = Field(default="all-MiniLM-L6-v2", env="EMBEDDING_MODEL")
+    embedding_batch_size: int = Field(default=64, env="EMBEDDING_BATCH_SIZE")
+    embedding_device: str = Field(default="", env="EMBEDDING_DEVICE")
+    embedding_backend: str = Field(default="torch", env="EMBEDDING_BACKEND")
+    embedding_precision: str = Field(default="float32", env="EMBEDDING_PRECISION")
+    embedding_onnx_file: str = Field(default="", env="EMBEDDING_ONNX_FILE")
+    embedding_cache_enabled: bool = Field(default=True, env="EMBEDDING_CACHE_ENABLED")
+    embedding_cache_path: str = Field(default="", env="EMBEDDING_CACHE_PATH")
+    embedding_cache_max_entries: int = Field(default=1_000_000, env="EMBEDDING_CACHE_MAX_ENTRIES")
 
     # LLM
     llm_model: str = Field(default="gpt-4o", env="LLM_MODEL")
     llm_temperature: float = Field(default=0.7, env="LLM_TEMPERATURE")
+    llm_max_concurrency: int = Field(default=16, env="LLM_MAX_CONCURRENCY")
+    llm_max_retries: int = Field(default=5, env="LLM_MAX_RETRIES")
+    llm_retry_backoff: float = Field(default=1.0, env="LLM_RETRY_BACKOFF")
+
+    # Query server
+    query_server_host: str = Field(default="127.0.0.1", env="QUERY_SERVER_HOST")
+    query_server_port: int = Field(default=8000, env="QUERY_SERVER_PORT")
+    query_server_url: str = Field(default="http://127.0.0.1:8000", env="QUERY_SERVER_URL")
+
+    # Semantic answer cache
+    answer_cache_enabled: bool = Field(default=False, env="ANSWER_CACHE_ENABLED")
+    answer_cache_path: str = Field(default="", env="ANSWER_CACHE_PATH")
+    answer_cache_threshold: float = Field(default=0.95, env="ANSWER_CACHE_THRESHOLD")
+    answer_cache_max_entries: int = Field(default=10_000, env="ANSWER_CACHE_MAX_ENTRIES")
 
     class Config:
         env_file = ".env"
@@ -4,7 +4,6 @@ CLI script for document ingestion
 """
 import argparse
 import logging
-from src.ingestion import IngestionPipeline
 
 # Configure logging
 logging.basicConfig(
@@ -15,14 +14,14 @@ logging.basicConfig(
 
 def main():
     parser = argparse.ArgumentParser(
-        description="Ingest documents from cloud storage into vector database"
+        description="Ingest documents from cloud or local storage into vector database"
     )
     parser.add_argument(
         "--storage",
         type=str,
-        choices=["s3", "gcp", "azure"],
+        choices=["s3", "gcp", "azure", "local"],
         required=True,
-        help="Cloud storage provider"
+        help="Cloud storage provider, or local to read LOCAL_STORAGE_PATH in place"
     )
     parser.add_argument(
         "--prefix",
@@ -30,13 +29,21 @@ def main():
         default="",
         help="Storage prefix/folder path to filter files"
     )
+    parser.add_argument(
+        "--full-refresh",
+        action="store_true",
+        help="Re-ingest every file, ignoring the incremental ingestion manifest"
+    )
 
     args = parser.parse_args()
 
+    # Imported after argument parsing so --help and usage errors stay fast
+    from src.ingestion import IngestionPipeline
+
     logger = logging.getLogger(__name__)
     logger.info(f"Starting ingestion from {args.storage}...")
     pipeline = IngestionPipeline(storage_type=args.storage)
-    pipeline.run(prefix=args.prefix)
+    pipeline.run(prefix=args.prefix, incremental=not args.full_refresh)
     logger.info("Ingestion complete!")
 
 
@@ -2,9 +2,12 @@
 """
 CLI script for querying the RAG system
 """
+import sys
+import json
 import argparse
 import logging
-from src.rag import RAGQueryEngine
+from config import settings
+from src.vectordb.filters import build_where, prefix_conditions
 
 # Configure logging
 logging.basicConfig(
@@ -28,21 +31,147 @@ def main():
         default=5,
         help="Number of documents to retrieve"
     )
+    parser.add_argument(
+        "--retrieval",
+        type=str,
+        choices=["vector", "hybrid", "keyword"],
+        default=None,
+        help="Retrieval mode: dense vectors, BM25 keywords, or both fused (default: RETRIEVAL_MODE)"
+    )
+    parser.add_argument(
+        "--rerank",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Rerank over-fetched candidates with a cross-encoder (default: RERANK_ENABLED)"
+    )
+    parser.add_argument(
+        "--filename",
+        type=str,
+        default=None,
+        help="Only search chunks from this file name"
+    )
+    parser.add_argument(
+        "--extension",
+        type=str,
+        action="append",
+        default=None,
+        help="Only search files with this extension, e.g. pdf (repeatable)"
+    )
+    parser.add_argument(
+        "--provider",
+        type=str,
+        choices=["s3", "gcp", "azure", "local"],
+        default=None,
+        help="Only search documents ingested from this storage provider"
+    )
+    parser.add_argument(
+        "--prefix",
+        type=str,
+        default=None,
+        help="Only search documents stored under this folder at any depth, e.g. reports/2024"
+    )
+    parser.add_argument(
+        "--folder",
+        type=str,
+        default=None,
+        help="Only search documents stored directly in this storage folder"
+    )
+    parser.add_argument(
+        "--where",
+        type=json.loads,
+        default=None,
+        help='Raw Chroma metadata filter as JSON, e.g. \'{"page": {"$lt": 10}}\''
+    )
+    parser.add_argument(
+        "--server",
+        nargs="?",
+        const=settings.query_server_url,
+        default=None,
+        metavar="URL",
+        help="Send the question to a running query server (serve.py) instead of loading models locally"
+    )
+    parser.add_argument(
+        "--no-stream",
+        action="store_true",
+        help="Wait for the complete answer instead of printing tokens as they arrive"
+    )
 
     args = parser.parse_args()
 
-    query_engine = RAGQueryEngine(top_k=args.top_k)
-    result = query_engine.query(args.query)
+    where = build_where(
+        filename=args.filename,
+        extension=[
+            extension if extension.startswith(".") else f".{extension}"
+            for extension in args.extension or []
+        ],
+        storage_provider=args.provider,
+        folder=args.folder,
+        **prefix_conditions(args.prefix)
+    )
+    if args.where:
+        where = {"$and": [where, args.where]} if where else args.where
 
+    # Imported on demand: server mode never loads models, Chroma or the OpenAI SDK
+    if args.server:
+        from src.rag import QueryServerClient, QueryServerError
+        try:
+            answer(QueryServerClient(args.server), args, where)
+        except QueryServerError as e:
+            sys.exit(f"Error: {e}")
+    else:
+        from src.rag import RAGQueryEngine
+        answer(RAGQueryEngine(top_k=args.top_k), args, where)
+
+
+def answer(query_engine, args: argparse.Namespace, where: dict) -> None:
+    """Print the answer and sources for ``args.query``, streaming unless ``--no-stream``."""
+    if args.no_stream:
+        result = query_engine.query(
+            args.query,
+            top_k=args.top_k,
+            retrieval_mode=args.retrieval,
+            where=where,
+            rerank=args.rerank
+        )
+        print_header(result['query'])
+        print(result['answer'])
+        print_sources(result['sources'], result.get('timings'))
+        return
+
+    sources, timings = [], None
+    events = query_engine.query_stream(
+        args.query,
+        top_k=args.top_k,
+        retrieval_mode=args.retrieval,
+        where=where,
+        rerank=args.rerank
+    )
+    for event in events:
+        if event['type'] == 'retrieval':
+            sources = event['sources']
+            print_header(event['query'])
+        elif event['type'] == 'token':
+            print(event['content'], end="", flush=True)
+        elif event['type'] == 'done':
+            timings = event.get('timings')
+            print()
+    print_sources(sources, timings)
+
+
+def print_header(query: str) -> None:
     print("\n" + "="*80)
-    print("QUESTION:", result['query'])
+    print("QUESTION:", query)
     print("="*80)
     print("\nANSWER:")
-    print(result['answer'])
+
+
+def print_sources(sources: list, timings: dict = None) -> None:
     print("\n" + "="*80)
     print("SOURCES:")
-    for source in result['sources']:
+    for source in sources:
         print(f"  - {source['filename']}")
+    if timings:
+        print("TIMINGS: " + ", ".join(f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in timings.items()))
     print("="*80 + "\n")
 
 
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Run a resident query server that keeps models and clients loaded
+"""
+import argparse
+import logging
+from functools import partial
+from config import settings
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve RAG queries over HTTP/JSON with a warm query engine"
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        default=settings.query_server_host,
+        help="Interface to bind"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=settings.query_server_port,
+        help="Port to listen on"
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=5,
+        help="Default number of documents to retrieve"
+    )
+    parser.add_argument(
+        "--retrieval",
+        type=str,
+        choices=["vector", "hybrid", "keyword"],
+        default=None,
+        help="Default retrieval mode (default: RETRIEVAL_MODE)"
+    )
+
+    args = parser.parse_args()
+
+    # Imported after argument parsing so --help and usage errors stay fast
+    from src.rag import RAGQueryEngine, QueryServer
+
+    logger = logging.getLogger(__name__)
+    server = QueryServer(args.host, args.port, partial(
+        RAGQueryEngine,
+        top_k=args.top_k,
+        retrieval_mode=args.retrieval
+    ))
+    logger.info(f"Query server listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,28 @@
-from .document_processor import DocumentProcessor
-from .ingestion_pipeline import IngestionPipeline
+from typing import TYPE_CHECKING
 
-__all__ = ["DocumentProcessor", "IngestionPipeline"]
+from src.lazy_exports import lazy_exports
+
+if TYPE_CHECKING:
+    from .document_processor import DocumentProcessor
+    from .extractors import register_extractor, get_extractor
+    from .ingestion_pipeline import IngestionPipeline
+    from .manifest import IngestionManifest
+    from .progress import IngestionProgress
+    from .jobs import IngestionJob, start_ingestion_job, get_ingestion_job, list_ingestion_jobs
+
+_EXPORTS = {
+    "DocumentProcessor": ".document_processor",
+    "register_extractor": ".extractors",
+    "get_extractor": ".extractors",
+    "IngestionPipeline": ".ingestion_pipeline",
+    "IngestionManifest": ".manifest",
+    "IngestionProgress": ".progress",
+    "IngestionJob": ".jobs",
+    "start_ingestion_job": ".jobs",
+    "get_ingestion_job": ".jobs",
+    "list_ingestion_jobs": ".jobs"
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,260 @@
+import re
+import logging
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional, Tuple
+import numpy as np
+from langchain.docstore.document import Document
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Boundary strength: a chunk ends at the strongest boundary in its size window
+HEADING, PARAGRAPH, SENTENCE = 3, 2, 1
+
+HEADING_PATTERN = re.compile(r"^#{1,6}[ \t]+(.+?)[ \t#]*$", re.MULTILINE)
+
+# Lone surrogates, which some PDF and HTML extraction leaves behind, cannot be
+# encoded as UTF-8 for the tokenizer, embedding model or Chroma
+SURROGATE_PATTERN = re.compile("[\ud800-\udfff]")
+
+# Used when the embedding model's tokenizer is unavailable: runs of word
+# characters split every few characters (over-counting slightly, so chunks
+# still fit the model) and one token per other non-space character
+FALLBACK_WORD_PIECE = 5
+
+# Characters per piece when encoding large texts with the model tokenizer
+TOKENIZE_PIECE_CHARS = 65536
+
+_ASCII = np.arange(128)
+_ASCII_SPACE = np.isin(_ASCII, [9, 10, 11, 12, 13, 32])
+_ASCII_WORD = np.array([chr(code).isalnum() or chr(code) == "_" for code in _ASCII])
+_UNICODE_SPACES = np.array([0x85, 0xA0, 0x1680, *range(0x2000, 0x200B), 0x2028, 0x2029, 0x202F, 0x205F, 0x3000])
+_SENTENCE_TERMINALS = np.array([ord(c) for c in ".!?;:"])
+_CLOSERS = np.array([ord(c) for c in "\"')]"])
+
+
+def _code_points(text: str) -> np.ndarray:
+    """Unicode code points of ``text``; indices match Python string offsets."""
+    return np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype="<u4")
+
+
+def _replace_surrogates(text: str) -> str:
+    """``text`` with lone surrogates replaced by U+FFFD; offsets are unchanged."""
+    return SURROGATE_PATTERN.sub("\ufffd", text) if SURROGATE_PATTERN.search(text) else text
+
+
+def _shift(mask: np.ndarray, step: int) -> np.ndarray:
+    """``mask`` moved ``step`` positions right (positive) or left, padded with False."""
+    shifted = np.zeros_like(mask)
+    if step > 0:
+        shifted[step:] = mask[:-step]
+    else:
+        shifted[:step] = mask[-step:]
+    return shifted
+
+
+def _estimate_token_offsets(codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Approximate token (starts, ends) without a tokenizer, in vectorized passes."""
+    if not len(codes):
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    non_ascii = np.flatnonzero(codes >= 128)
+    ascii_codes = codes.astype(np.int32)
+    ascii_codes[non_ascii] = 0
+    space = _ASCII_SPACE[ascii_codes]
+    word = _ASCII_WORD[ascii_codes]
+    if len(non_ascii):
+        space[non_ascii] = np.isin(codes[non_ascii], _UNICODE_SPACES)
+        word[non_ascii] = ~space[non_ascii]
+    punct = ~(word | space)
+
+    positions = np.arange(len(codes), dtype=np.int32)
+    run_first = np.maximum.accumulate(np.where(word & ~_shift(word, 1), positions, 0))
+    word_start = word & ((positions - run_first) % FALLBACK_WORD_PIECE == 0)
+    run_last = np.flatnonzero(word & ~_shift(word, -1))
+
+    starts = np.flatnonzero(word_start | punct).astype(np.int64)
+    ends = starts + 1
+    word_token = word[starts]
+    word_starts = starts[word_token]
+    run_ends = run_last[np.searchsorted(run_last, word_starts)] + 1
+    ends[word_token] = np.minimum(word_starts + FALLBACK_WORD_PIECE, run_ends)
+    return starts, ends
+
+
+@lru_cache(maxsize=None)
+def _get_tokenizer(model_name: str):
+    """Return the fast (Rust) tokenizer for an embedding model, or None if unavailable."""
+    try:
+        from transformers import AutoTokenizer
+    except ImportError as e:
+        logger.warning(f"transformers unavailable ({e}); estimating chunk tokens with a regex")
+        return None
+
+    candidates = [model_name]
+    if "/" not in model_name:
+        candidates.append(f"sentence-transformers/{model_name}")
+    for candidate in candidates:
+        try:
+            tokenizer = AutoTokenizer.from_pretrained(candidate)
+        except Exception:
+            continue
+        if tokenizer.is_fast:
+            return tokenizer.backend_tokenizer
+
+    logger.warning(f"No fast tokenizer found for {model_name}; estimating chunk tokens with a regex")
+    return None
+
+
+class TokenChunker:
+    """Split text into chunks sized in embedding-model tokens.
+
+    The text is tokenized once to get every token's character offsets, and
+    heading, paragraph and sentence boundaries are found with vectorized
+    passes over the text's code points and mapped to token positions. Each chunk then ends at the strongest boundary between
+    ``min_tokens`` and ``max_tokens`` tokens from its start (the latest one on
+    ties). Unless it ended at a paragraph or heading, the next chunk starts
+    ``overlap_tokens`` earlier, snapped to a sentence start where there is one.
+    Chunks are slices of the original text.
+    """
+
+    def __init__(
+        self,
+        max_tokens: Optional[int] = None,
+        overlap_tokens: Optional[int] = None,
+        min_tokens: Optional[int] = None,
+        model_name: Optional[str] = None
+    ):
+        self.max_tokens = max(1, max_tokens or settings.chunk_tokens)
+        self.overlap_tokens = settings.chunk_overlap_tokens if overlap_tokens is None else overlap_tokens
+        self.overlap_tokens = min(self.overlap_tokens, self.max_tokens // 2)
+        self.min_tokens = self.max_tokens // 2 if min_tokens is None else min(min_tokens, self.max_tokens)
+        self.model_name = model_name or settings.embedding_model
+
+    @property
+    def tokenizer(self):
+        return _get_tokenizer(self.model_name)
+
+    def token_offsets(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (starts, ends) character offsets of every token in ``text``."""
+        tokenizer = self.tokenizer
+        if tokenizer is None:
+            return _estimate_token_offsets(_code_points(text))
+
+        text = _replace_surrogates(text)
+        # Large texts are cut at whitespace and encoded as a batch, which the
+        # Rust tokenizer spreads across threads
+        pieces, start = [], 0
+        while start < len(text):
+            end = start + TOKENIZE_PIECE_CHARS
+            if end < len(text):
+                cut = text.rfind("\n", start, end)
+                if cut <= start:
+                    cut = text.rfind(" ", start, end)
+                end = cut + 1 if cut > start else end
+            pieces.append((start, min(end, len(text))))
+            start = end
+
+        encodings = tokenizer.encode_batch([text[a:b] for a, b in pieces], add_special_tokens=False)
+        spans = np.concatenate([
+            np.array(encoding.offsets, dtype=np.int64).reshape(-1, 2) + piece_start
+            for encoding, (piece_start, _) in zip(encodings, pieces)
+        ]) if pieces else np.zeros((0, 2), dtype=np.int64)
+        return spans[:, 0], spans[:, 1]
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.token_offsets(text)[0])
+
+    @staticmethod
+    def _boundary_priorities(codes: np.ndarray, starts: np.ndarray, heading_offsets: np.ndarray) -> np.ndarray:
+        """Strongest boundary at each token position (a chunk may start there).
+
+        Boundaries are character offsets inside the gap before the next chunk's
+        first token, so each maps to the first token starting at or after it.
+        """
+        blank = (codes == 32) | (codes == 9)
+        terminal = np.isin(codes, _SENTENCE_TERMINALS)
+        sentence_ends = np.flatnonzero(
+            _shift(blank, -1) & (terminal | (np.isin(codes, _CLOSERS) & _shift(terminal, 1)))
+        )
+
+        newlines = np.flatnonzero(codes == 10)
+        # Two newlines with only spaces or tabs between them end a paragraph
+        non_blank = np.cumsum(~blank, dtype=np.int32)
+        between, following = newlines[:-1], newlines[1:]
+        paragraph_ends = following[non_blank[following - 1] == non_blank[between]]
+
+        offsets = np.concatenate((sentence_ends + 1, newlines + 1, paragraph_ends + 1, heading_offsets))
+        levels = np.concatenate((
+            np.full(len(sentence_ends) + len(newlines), SENTENCE, dtype=np.int8),
+            np.full(len(paragraph_ends), PARAGRAPH, dtype=np.int8),
+            np.full(len(heading_offsets), HEADING, dtype=np.int8)
+        ))
+
+        priorities = np.zeros(len(starts) + 1, dtype=np.int8)
+        np.maximum.at(priorities, np.searchsorted(starts, offsets), levels)
+        return priorities
+
+    def iter_spans(self, text: str) -> Iterator[Tuple[int, int, Optional[str]]]:
+        """Yield (start, end, heading) for each chunk; heading is the latest
+        markdown heading at or before the chunk start."""
+        starts, ends = self.token_offsets(text)
+        n_tokens = len(starts)
+        if not n_tokens:
+            return
+
+        headings = [(match.start(), match.group(1)) for match in HEADING_PATTERN.finditer(text)]
+        priorities = self._boundary_priorities(
+            _code_points(text),
+            starts,
+            np.array([offset for offset, _ in headings], dtype=np.int64)
+        )
+        # Chunk starts only move forward, so the current heading is tracked incrementally
+        heading_index = -1
+
+        first = 0
+        while first < n_tokens:
+            if first + self.max_tokens >= n_tokens:
+                end = n_tokens
+            else:
+                low, high = first + self.min_tokens, first + self.max_tokens
+                window = priorities[low:high + 1]
+                # Latest position holding the strongest boundary in the window
+                end = high - int(np.argmax(window[::-1] == window.max()))
+
+            start_char = int(starts[first])
+            while heading_index + 1 < len(headings) and headings[heading_index + 1][0] <= start_char:
+                heading_index += 1
+            heading = headings[heading_index][1] if heading_index >= 0 else None
+            yield start_char, int(ends[end - 1]), heading
+
+            if end >= n_tokens:
+                return
+
+            next_first = end
+            # Chunks cut at a paragraph or heading start cleanly, without overlap
+            if self.overlap_tokens and priorities[end] < PARAGRAPH:
+                low = max(first + 1, end - self.overlap_tokens)
+                sentence_starts = np.flatnonzero(priorities[low:end] >= SENTENCE)
+                next_first = low + int(sentence_starts[0]) if len(sentence_starts) else low
+            first = next_first
+
+    def iter_chunks(self, text: str) -> Iterator[str]:
+        text = _replace_surrogates(text)
+        for start, end, _ in self.iter_spans(text):
+            chunk = text[start:end].strip()
+            if chunk:
+                yield chunk
+
+    def iter_split_documents(self, documents: Iterable[Document]) -> Iterator[Document]:
+        """Lazily chunk documents, copying each document's metadata to its chunks."""
+        for document in documents:
+            text = _replace_surrogates(document.page_content)
+            for start, end, heading in self.iter_spans(text):
+                chunk = text[start:end].strip()
+                if not chunk:
+                    continue
+                metadata = dict(document.metadata)
+                if heading:
+                    metadata["section"] = heading
+                yield Document(page_content=chunk, metadata=metadata)
@@ -1,70 +1,351 @@
+import io
 import os
+import time
+import queue
 import logging
-from typing import List
+import tempfile
+import multiprocessing
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
 from pathlib import Path
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.docstore.document import Document
-from langchain_community.document_loaders import (
-    PyPDFLoader,
-    Docx2txtLoader,
-    UnstructuredExcelLoader,
-    UnstructuredPowerPointLoader,
-    TextLoader
-)
+from src.storage.base import InMemoryFile
+from .chunker import TokenChunker
+from .extractors import get_extractor
+from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Formats the LangChain loaders handle, used when there is no native extractor
+LOADER_EXTENSIONS = ('.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.txt')
+
+# Per-process DocumentProcessor used by pool workers
+_worker_processor = None
+
+
+def _init_worker(
+    chunk_size: int,
+    chunk_overlap: int,
+    use_native_extractors: bool,
+    chunking_strategy: str
+) -> None:
+    global _worker_processor
+    _worker_processor = DocumentProcessor(chunk_size, chunk_overlap, use_native_extractors, chunking_strategy)
+
+
+def _parse_file(file: Union[str, InMemoryFile]) -> List[Document]:
+    return _worker_processor.process_file(file)
+
+
+def _file_path(file: Union[str, InMemoryFile]) -> str:
+    return file.path if isinstance(file, InMemoryFile) else file
+
 
 class DocumentProcessor:
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        use_native_extractors: Optional[bool] = None,
+        chunking_strategy: Optional[str] = None
+    ):
+        """``chunk_size`` and ``chunk_overlap`` are in characters and apply to
+        the ``character`` strategy; the ``token`` strategy sizes chunks in
+        embedding-model tokens (``CHUNK_TOKENS``, ``CHUNK_OVERLAP_TOKENS``)."""
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-            length_function=len
+        self.use_native_extractors = (
+            settings.native_extractors_enabled if use_native_extractors is None else use_native_extractors
         )
+        self.chunking_strategy = (chunking_strategy or settings.chunking_strategy).lower()
 
-    def load_document(self, file_path: str) -> List[Document]:
-        """Load a single document based on file extension."""
-        file_extension = Path(file_path).suffix.lower()
+        if self.chunking_strategy == "token":
+            self.chunker = TokenChunker()
+        elif self.chunking_strategy == "character":
+            self.text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+                length_function=len
+            )
+        else:
+            raise ValueError(f"Unsupported chunking strategy: {self.chunking_strategy}")
 
+    def load_document(
+        self,
+        file_path: str,
+        data: Optional[bytes] = None,
+        raise_errors: bool = False
+    ) -> List[Document]:
+        """Load a single document based on file extension.
+
+        Formats with a native extractor (see ``extractors.py``) are read
+        directly, from ``data`` when the contents are already in memory. Other
+        formats, and files a native extractor cannot handle, go through the
+        LangChain loaders. A file that cannot be read is logged and yields no
+        documents, unless ``raise_errors`` is set; unsupported formats always
+        yield no documents.
+        """
         try:
-            if file_extension == '.pdf':
-                loader = PyPDFLoader(file_path)
-            elif file_extension in ['.doc', '.docx']:
-                loader = Docx2txtLoader(file_path)
-            elif file_extension in ['.xls', '.xlsx']:
-                loader = UnstructuredExcelLoader(file_path)
-            elif file_extension in ['.ppt', '.pptx']:
-                loader = UnstructuredPowerPointLoader(file_path)
-            elif file_extension == '.txt':
-                loader = TextLoader(file_path)
-            else:
-                logger.warning(f"Unsupported file type: {file_extension}")
-                return []
-
-            documents = loader.load()
-            return documents
+            return list(self._iter_document(file_path, data))
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(f"Error loading document {file_path}: {e}", exc_info=True)
             return []
 
-    def process_documents(self, file_paths: List[str]) -> List[Document]:
-        """Load and chunk multiple documents."""
-        all_documents = []
+    def _iter_document(self, file_path: str, data: Optional[bytes]) -> Iterator[Document]:
+        """Yield a document's pages as the native extractor parses them.
+
+        Extraction failures fall back to the LangChain loader only before the
+        first page is yielded; later ones propagate, since pages already passed
+        on cannot be taken back.
+        """
+        file_extension = Path(file_path).suffix.lower()
+
+        extractor = get_extractor(file_extension) if self.use_native_extractors else None
+        if extractor is not None:
+            extracted = False
+            try:
+                for document in extractor(file_path if data is None else io.BytesIO(data)):
+                    extracted = True
+                    yield document
+                return
+            except Exception as e:
+                if extracted or file_extension not in LOADER_EXTENSIONS:
+                    raise
+                logger.warning(f"Native extraction failed for {file_path} ({e}); falling back to loader")
+
+        if file_extension not in LOADER_EXTENSIONS:
+            logger.warning(f"Unsupported file type: {file_extension}")
+            return
+
+        if data is None:
+            yield from self._load_with_loader(file_path)
+            return
+
+        # The loaders only read from disk
+        with tempfile.NamedTemporaryFile(suffix=file_extension, delete=False) as f:
+            f.write(data)
+        try:
+            yield from self._load_with_loader(f.name)
+        finally:
+            os.remove(f.name)
+
+    def _load_with_loader(self, file_path: str) -> List[Document]:
+        """Load a document with its LangChain loader, imported per format so
+        only the parsers actually needed are loaded."""
+        file_extension = Path(file_path).suffix.lower()
+
+        if file_extension == '.pdf':
+            from langchain_community.document_loaders import PyPDFLoader
+            loader = PyPDFLoader(file_path)
+        elif file_extension in ['.doc', '.docx']:
+            from langchain_community.document_loaders import Docx2txtLoader
+            loader = Docx2txtLoader(file_path)
+        elif file_extension in ['.xls', '.xlsx']:
+            from langchain_community.document_loaders import UnstructuredExcelLoader
+            loader = UnstructuredExcelLoader(file_path)
+        elif file_extension in ['.ppt', '.pptx']:
+            from langchain_community.document_loaders import UnstructuredPowerPointLoader
+            loader = UnstructuredPowerPointLoader(file_path)
+        else:
+            from langchain_community.document_loaders import TextLoader
+            loader = TextLoader(file_path)
+
+        return loader.load()
+
+    @staticmethod
+    def _clean_metadata(metadata: dict) -> dict:
+        """Keep only values Chroma can store and filter on (str, int, float, bool)."""
+        cleaned = {}
+        for key, value in metadata.items():
+            if isinstance(value, (str, int, float, bool)):
+                cleaned[key] = value
+            elif isinstance(value, (list, tuple)):
+                cleaned[key] = ", ".join(str(item) for item in value)
+        return cleaned
+
+    def _attach_source(self, doc: Document, file_path: str) -> Document:
+        doc.metadata = self._clean_metadata(doc.metadata)
+        doc.metadata['source'] = file_path
+        doc.metadata['filename'] = os.path.basename(file_path)
+        doc.metadata['extension'] = Path(file_path).suffix.lower()
+        return doc
+
+    def load_file(self, file: Union[str, InMemoryFile], raise_errors: bool = False) -> List[Document]:
+        """Load a single document from a path or memory and attach source metadata."""
+        file_path = _file_path(file)
+        logger.info(f"Processing: {file_path}")
+        docs = self.load_document(
+            file_path,
+            file.data if isinstance(file, InMemoryFile) else None,
+            raise_errors=raise_errors
+        )
+        return [self._attach_source(doc, file_path) for doc in docs]
+
+    def iter_load_file(self, file: Union[str, InMemoryFile]) -> Iterator[Document]:
+        """Lazily load a single document from a path or memory, raising if it cannot be read."""
+        file_path = _file_path(file)
+        logger.info(f"Processing: {file_path}")
+        for doc in self._iter_document(file_path, file.data if isinstance(file, InMemoryFile) else None):
+            yield self._attach_source(doc, file_path)
+
+    def process_file(self, file: Union[str, InMemoryFile]) -> List[Document]:
+        """Load and chunk a single document, chunking each page as it is
+        extracted so the pages of a large file are never all held at once."""
+        return self.split_documents(self.iter_load_file(file))
+
+    def iter_split_documents(self, documents: Iterable[Document]) -> Iterator[Document]:
+        """Lazily chunk loaded documents."""
+        if self.chunking_strategy == "token":
+            yield from self.chunker.iter_split_documents(documents)
+        else:
+            for document in documents:
+                yield from self.text_splitter.split_documents([document])
+
+    def split_documents(self, documents: Iterable[Document]) -> List[Document]:
+        """Chunk loaded documents."""
+        return list(self.iter_split_documents(documents))
+
+    def iter_process_documents(
+        self,
+        file_paths: Iterable[Union[str, InMemoryFile]],
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> Iterator[Tuple[str, Optional[List[Document]]]]:
+        """Load and chunk documents, yielding (file_path, chunks) as each completes.
+
+        Items may be paths or ``InMemoryFile`` contents; either way the path is
+        what gets yielded. With more than one worker, parsing and chunking fan out to a process
+        pool and results arrive in completion order. A file that runs longer
+        than ``timeout`` seconds is abandoned and the pool is restarted so it
+        cannot stall the run.
+
+        ``chunks`` is None for a file that failed to parse or timed out, so
+        callers can retry it later; a file that parsed without any text (or
+        has an unsupported format) yields an empty list.
+        """
+        max_workers = max_workers or settings.parse_workers
+        timeout = timeout or settings.parse_timeout
+
+        if max_workers <= 1:
+            for file in file_paths:
+                try:
+                    chunks = self.process_file(file)
+                except Exception as e:
+                    logger.error(f"Error processing document {_file_path(file)}: {e}", exc_info=True)
+                    chunks = None
+                yield _file_path(file), chunks
+            return
+
+        yield from self._iter_process_parallel(file_paths, max_workers, timeout)
+
+    def _new_pool(self, max_workers: int):
+        return multiprocessing.get_context("spawn").Pool(
+            max_workers,
+            initializer=_init_worker,
+            initargs=(self.chunk_size, self.chunk_overlap, self.use_native_extractors, self.chunking_strategy)
+        )
+
+    def _iter_process_parallel(
+        self,
+        file_paths: Iterable[Union[str, InMemoryFile]],
+        max_workers: int,
+        timeout: float
+    ) -> Iterator[Tuple[str, Optional[List[Document]]]]:
+        paths = iter(file_paths)
+        results = queue.Queue()
+        deadlines = {}
+        # Submitted items by path, kept until done so survivors can be resubmitted
+        files = {}
+        pool = self._new_pool(max_workers)
+
+        def submit(file: Union[str, InMemoryFile]) -> None:
+            file_path = _file_path(file)
+            files[file_path] = file
+            deadlines[file_path] = time.monotonic() + timeout
+            pool.apply_async(
+                _parse_file,
+                (file,),
+                callback=lambda chunks, p=file_path: results.put((p, chunks)),
+                error_callback=lambda e, p=file_path: results.put((p, e))
+            )
+
+        try:
+            exhausted = False
+            while True:
+                # Keep exactly one task per worker so deadlines track run time
+                while not exhausted and len(deadlines) < max_workers:
+                    file = next(paths, None)
+                    if file is None:
+                        exhausted = True
+                    else:
+                        submit(file)
+
+                if not deadlines:
+                    break
+
+                wait = max(0.0, min(deadlines.values()) - time.monotonic())
+                try:
+                    file_path, outcome = results.get(timeout=wait)
+                except queue.Empty:
+                    now = time.monotonic()
+                    expired = [p for p, deadline in deadlines.items() if deadline <= now]
+                    survivors = [p for p in deadlines if p not in expired]
+
+                    for file_path in expired:
+                        logger.error(f"Timed out parsing {file_path} after {timeout}s; skipping")
+                        del deadlines[file_path]
+                        del files[file_path]
+                        yield file_path, None
+
+                    # The pool cannot cancel a running task, so replace it
+                    pool.terminate()
+                    pool = self._new_pool(max_workers)
+                    for file_path in survivors:
+                        submit(files[file_path])
+                    continue
+
+                if file_path not in deadlines:
+                    # Late result from a task already timed out or resubmitted
+                    continue
+                del deadlines[file_path]
+                del files[file_path]
+
+                if isinstance(outcome, Exception):
+                    logger.error(f"Error processing document {file_path}: {outcome}")
+                    outcome = None
+
+                yield file_path, outcome
+        finally:
+            pool.terminate()
 
-        for file_path in file_paths:
-            logger.info(f"Processing: {file_path}")
-            docs = self.load_document(file_path)
+    def process_documents(
+        self,
+        file_paths: Iterable[str],
+        max_workers: Optional[int] = None
+    ) -> List[Document]:
+        """Load and chunk multiple documents.
 
-            for doc in docs:
-                doc.metadata['source'] = file_path
-                doc.metadata['filename'] = os.path.basename(file_path)
+        ``file_paths`` may be a lazy iterable (e.g. paths yielded as downloads
+        complete), so parsing overlaps with listing and downloading. Set
+        ``max_workers`` above one to parse in a process pool.
+        """
+        max_workers = max_workers or settings.parse_workers
+        chunked_documents = []
+        file_count = 0
 
-            all_documents.extend(docs)
+        if max_workers <= 1:
+            all_documents = []
+            for file_path in file_paths:
+                file_count += 1
+                all_documents.extend(self.load_file(file_path))
+            chunked_documents = self.split_documents(all_documents)
+        else:
+            for _, chunks in self.iter_process_documents(file_paths, max_workers):
+                file_count += 1
+                chunked_documents.extend(chunks or [])
 
-        chunked_documents = self.text_splitter.split_documents(all_documents)
-        logger.info(f"Created {len(chunked_documents)} chunks from {len(file_paths)} documents")
+        logger.info(f"Created {len(chunked_documents)} chunks from {file_count} documents")
 
         return chunked_documents
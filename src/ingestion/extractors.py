@@ -0,0 +1,213 @@
+import csv
+import io
+import json
+from html.parser import HTMLParser
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Union
+from langchain.docstore.document import Document
+
+# A path on disk, or the contents of a file already in memory
+FileSource = Union[str, BinaryIO]
+Extractor = Callable[[FileSource], Iterator[Document]]
+
+_EXTRACTORS: Dict[str, Extractor] = {}
+
+
+def register_extractor(*extensions: str) -> Callable[[Extractor], Extractor]:
+    """Register a native extractor for one or more lowercase extensions (e.g. ``".csv"``)."""
+    def decorator(extractor: Extractor) -> Extractor:
+        for extension in extensions:
+            _EXTRACTORS[extension] = extractor
+        return extractor
+    return decorator
+
+
+def get_extractor(extension: str) -> Optional[Extractor]:
+    """Return the native extractor for an extension, or None if there is none."""
+    return _EXTRACTORS.get(extension.lower())
+
+
+def supported_extensions() -> List[str]:
+    return sorted(_EXTRACTORS)
+
+
+def _read_text(file: FileSource) -> str:
+    if isinstance(file, str):
+        with open(file, "rb") as f:
+            data = f.read()
+    else:
+        data = file.read()
+    # utf-8-sig also strips the byte order mark some editors write
+    return data.decode("utf-8-sig", errors="replace")
+
+
+@register_extractor(".txt", ".md", ".markdown")
+def extract_text(file: FileSource) -> Iterator[Document]:
+    yield Document(page_content=_read_text(file), metadata={})
+
+
+@register_extractor(".csv")
+def extract_csv(file: FileSource) -> Iterator[Document]:
+    """One document per row as ``column: value`` lines, like LangChain's CSVLoader."""
+    reader = csv.DictReader(io.StringIO(_read_text(file), newline=""))
+    for row_number, row in enumerate(reader):
+        lines = [
+            f"{(column or '').strip()}: {(value or '').strip()}"
+            for column, value in row.items()
+            if not isinstance(value, list)
+        ]
+        yield Document(page_content="\n".join(lines), metadata={"row": row_number})
+
+
+def _flatten_json(value, path: str = "") -> Iterator[str]:
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _flatten_json(item, f"{path}.{key}" if path else str(key))
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            yield from _flatten_json(item, f"{path}[{index}]")
+    else:
+        yield f"{path}: {value}" if path else str(value)
+
+
+@register_extractor(".json")
+def extract_json(file: FileSource) -> Iterator[Document]:
+    """Flatten JSON to ``key.path: value`` lines; top-level arrays give one document per item."""
+    data = json.loads(_read_text(file))
+    if isinstance(data, list):
+        for index, item in enumerate(data):
+            yield Document(page_content="\n".join(_flatten_json(item)), metadata={"item": index})
+    else:
+        yield Document(page_content="\n".join(_flatten_json(data)), metadata={})
+
+
+class _HTMLTextParser(HTMLParser):
+    SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "head"}
+    BLOCK_TAGS = {
+        "p", "div", "br", "li", "tr", "table", "section", "article", "header", "footer",
+        "h1", "h2", "h3", "h4", "h5", "h6", "pre", "blockquote", "ul", "ol", "dt", "dd"
+    }
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self.title = ""
+        self._skip_depth = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "title":
+            self._in_title = True
+        elif tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        elif tag in self.SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip_depth:
+            self.parts.append(data)
+
+    def text(self) -> str:
+        lines = (" ".join(line.split()) for line in "".join(self.parts).splitlines())
+        return "\n".join(line for line in lines if line)
+
+
+@register_extractor(".html", ".htm")
+def extract_html(file: FileSource) -> Iterator[Document]:
+    parser = _HTMLTextParser()
+    parser.feed(_read_text(file))
+    parser.close()
+    metadata = {"title": parser.title.strip()} if parser.title.strip() else {}
+    yield Document(page_content=parser.text(), metadata=metadata)
+
+
+@register_extractor(".pdf")
+def extract_pdf(file: FileSource) -> Iterator[Document]:
+    """One document per page; ``page`` is zero-based, as with PyPDFLoader."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(file)
+    for page_number, page in enumerate(reader.pages):
+        yield Document(page_content=page.extract_text(), metadata={"page": page_number})
+
+
+@register_extractor(".xlsx", ".xlsm")
+def extract_xlsx(file: FileSource) -> Iterator[Document]:
+    """One document per worksheet, rows as tab-separated cell values."""
+    from openpyxl import load_workbook
+
+    # read_only streams rows instead of building the whole cell model
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        for sheet_number, sheet in enumerate(workbook.worksheets, 1):
+            rows = []
+            for row in sheet.iter_rows(values_only=True):
+                cells = [str(value) for value in row if value is not None]
+                if cells:
+                    rows.append("\t".join(cells))
+            if rows:
+                yield Document(
+                    page_content="\n".join(rows),
+                    metadata={"sheet": sheet.title, "sheet_number": sheet_number}
+                )
+    finally:
+        workbook.close()
+
+
+def _shape_text(shape) -> Iterator[str]:
+    from pptx.shapes.group import GroupShape
+
+    if isinstance(shape, GroupShape):
+        for child in shape.shapes:
+            yield from _shape_text(child)
+    elif shape.has_text_frame:
+        if shape.text_frame.text.strip():
+            yield shape.text_frame.text
+    elif shape.has_table:
+        for row in shape.table.rows:
+            yield "\t".join(cell.text for cell in row.cells)
+
+
+@register_extractor(".pptx")
+def extract_pptx(file: FileSource) -> Iterator[Document]:
+    """One document per slide, including speaker notes; ``slide`` is one-based."""
+    from pptx import Presentation
+
+    presentation = Presentation(file)
+    for slide_number, slide in enumerate(presentation.slides, 1):
+        parts = [text for shape in slide.shapes for text in _shape_text(shape)]
+        if slide.has_notes_slide and slide.notes_slide.notes_text_frame is not None:
+            notes = slide.notes_slide.notes_text_frame.text
+            if notes.strip():
+                parts.append(notes)
+        if parts:
+            yield Document(page_content="\n".join(parts), metadata={"slide": slide_number})
+
+
+@register_extractor(".docx")
+def extract_docx(file: FileSource) -> Iterator[Document]:
+    """Paragraphs and tables in document order."""
+    import docx
+    from docx.table import Table
+    from docx.text.paragraph import Paragraph
+
+    document = docx.Document(file)
+    parts = []
+    for child in document.element.body.iterchildren():
+        if child.tag.endswith("}p"):
+            text = Paragraph(child, document).text
+            if text.strip():
+                parts.append(text)
+        elif child.tag.endswith("}tbl"):
+            for row in Table(child, document).rows:
+                parts.append("\t".join(cell.text for cell in row.cells))
+    yield Document(page_content="\n".join(parts), metadata={})
@@ -1,71 +1,418 @@
 import os
+import time
+import uuid
+import queue
 import shutil
 import logging
-from typing import List, Optional
+import threading
+from dataclasses import replace
+from typing import Callable, Iterable, Iterator, Optional
 from .document_processor import DocumentProcessor
-from src.storage import StorageConnector, S3Connector, GCPConnector, AzureConnector
-from src.vectordb import ChromaVectorDB
+from .manifest import IngestionManifest
+from .progress import IngestionProgress, ProgressCallback
+from src.storage import InMemoryFile, StorageConnector
+from src.vectordb import ChromaVectorDB, get_vector_db
+from src.vectordb.filters import folder_levels
+from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Marks the end of a stage's input queue
+_DONE = object()
+
 
 class IngestionPipeline:
     def __init__(
         self,
         storage_type: str = "s3",
-        temp_dir: str = "./temp_downloads"
+        temp_dir: str = "./temp_downloads",
+        vector_db: Optional[ChromaVectorDB] = None
     ):
         self.storage_type = storage_type.lower()
         self.temp_dir = temp_dir
         self.document_processor = DocumentProcessor()
-        self.vector_db = ChromaVectorDB()
+        self.vector_db = vector_db or get_vector_db()
 
         self.storage_connector = self._get_storage_connector()
 
     def _get_storage_connector(self) -> StorageConnector:
-        """Get the appropriate storage connector."""
+        """Get the appropriate storage connector, importing only its SDK."""
         if self.storage_type == "s3":
+            from src.storage.s3_connector import S3Connector
             return S3Connector()
         elif self.storage_type == "gcp":
+            from src.storage.gcp_connector import GCPConnector
             return GCPConnector()
         elif self.storage_type == "azure":
+            from src.storage.azure_connector import AzureConnector
             return AzureConnector()
+        elif self.storage_type == "local":
+            from src.storage.local_connector import LocalConnector
+            return LocalConnector()
         else:
             raise ValueError(f"Unsupported storage type: {self.storage_type}")
 
-    def run(self, prefix: str = "") -> None:
-        """Run the complete ingestion pipeline."""
+    def _load_manifest(self) -> IngestionManifest:
+        """Load the ingestion manifest for this connector's location."""
+        path = settings.ingestion_manifest_path or os.path.join(
+            self.vector_db.persist_directory,
+            f"{self.vector_db.collection_name}_manifest.json"
+        )
+        manifest = IngestionManifest(path, self.storage_connector.location)
+
+        if manifest.entries and self.vector_db.get_collection_stats()['count'] == 0:
+            logger.warning("Collection is empty; ignoring stale ingestion manifest")
+            manifest.clear()
+
+        return manifest
+
+    def _remove_deleted(self, manifest: IngestionManifest, prefix: str, seen_keys: set) -> int:
+        """Delete chunks for objects that disappeared from storage."""
+        if self.storage_connector.last_listing_error is not None:
+            logger.warning("Listing was incomplete; skipping removal of deleted objects")
+            return 0
+
+        missing = manifest.missing_keys(prefix, seen_keys)
+        for key in missing:
+            self.vector_db.delete_documents_by_source(manifest.get_source(key))
+            manifest.remove(key)
+
+        return len(missing)
+
+    def _source(self, key: str) -> str:
+        """``source`` metadata of an object's chunks, unique across buckets and providers."""
+        return f"{self.storage_connector.location}/{key}"
+
+    def _storage_metadata(self, key: str) -> dict:
+        """Metadata identifying where a chunk came from, for filtered retrieval."""
+        return {
+            "source": self._source(key),
+            "storage_provider": self.storage_type,
+            "storage_key": key,
+            "folder": os.path.dirname(key),
+            **folder_levels(key),
+            "ingested_at": int(time.time())
+        }
+
+    def _retire_stale(self, manifest: IngestionManifest, keys: Iterable[str]) -> None:
+        """Delete previously ingested chunks for objects about to be re-ingested.
+
+        Entries are dropped from the manifest (and saved) before their chunks are
+        deleted, so an interrupted run re-ingests them instead of skipping them.
+        Each call rewrites the manifest, so callers pass keys a batch at a time.
+        """
+        stale = [(key, manifest.get_source(key)) for key in keys if manifest.get_source(key)]
+        if not stale:
+            return
+
+        for key, _ in stale:
+            manifest.remove(key)
+        manifest.save()
+
+        for _, source in stale:
+            self.vector_db.delete_documents_by_source(source)
+
+    def _run_stage(
+        self,
+        name: str,
+        inbox: queue.Queue,
+        outbox: Optional[queue.Queue],
+        process: Callable[[Iterator], Iterable]
+    ) -> None:
+        """Stream inbox items through ``process``, forwarding results to outbox.
+
+        After a failure the stage keeps draining its inbox so upstream stages
+        never block on a full queue, and the end marker is always forwarded.
+        """
+        def items() -> Iterator:
+            while True:
+                item = inbox.get()
+                if item is _DONE:
+                    return
+                yield item
+
+        stream = items()
         try:
-            os.makedirs(self.temp_dir, exist_ok=True)
+            for result in process(stream):
+                if outbox is not None:
+                    outbox.put(result)
+        except Exception as e:
+            logger.error(f"Ingestion stage '{name}' failed: {e}", exc_info=True)
+            self._stage_errors.append(e)
+            self._abort.set()
+            for _ in stream:
+                pass
+        finally:
+            if outbox is not None:
+                outbox.put(_DONE)
 
-            logger.info(f"Downloading files from {self.storage_type}...")
-            downloaded_files = self.storage_connector.download_all(
-                self.temp_dir,
-                prefix=prefix
-            )
+    def run(
+        self,
+        prefix: str = "",
+        incremental: bool = True,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> None:
+        """Run the complete ingestion pipeline.
 
-            if not downloaded_files:
-                logger.warning("No files downloaded. Check your storage configuration.")
-                return
+        Download, parse/chunk, dedup, embed and upsert run as concurrent stages
+        connected by bounded queues, so batches flow through with backpressure
+        and memory stays flat regardless of corpus size. Parsing fans out to a
+        process pool when ``PARSE_WORKERS`` is above one.
+
+        With ``incremental`` set, objects whose etag, size and last-modified
+        time match the manifest are skipped, modified objects have their old
+        chunks replaced, and chunks for objects no longer in storage are removed.
+
+        With ``DEDUP_ENABLED``, exact and near-duplicate chunks (within the run
+        or already stored) are collapsed into one vector before embedding; the
+        stored chunk lists every copy's source in its ``sources`` metadata.
+
+        Small cloud objects (up to ``DOWNLOAD_IN_MEMORY_MAX_BYTES``) are parsed
+        from memory, larger ones go through ``temp_dir``, and the local
+        connector's files are parsed in place without any copy.
+
+        ``progress_callback`` receives an ``IngestionProgress`` snapshot from the
+        stage threads whenever a counter changes and once more when the run
+        completes or fails.
+        """
+        progress = IngestionProgress()
+        progress_lock = threading.Lock()
+
+        def report(stage: str = None, listing_complete: bool = False, **increments) -> None:
+            with progress_lock:
+                for name, value in increments.items():
+                    setattr(progress, name, getattr(progress, name) + value)
+                if listing_complete:
+                    progress.listing_complete = True
+                if stage is not None:
+                    progress.stage = stage
+                    if stage in ("complete", "failed"):
+                        progress.finished_at = time.time()
+                snapshot = replace(progress)
 
-            logger.info(f"Downloaded {len(downloaded_files)} files")
+            if progress_callback is not None:
+                try:
+                    progress_callback(snapshot)
+                except Exception as e:
+                    logger.warning(f"Ingestion progress callback failed: {e}")
 
-            logger.info("Processing documents...")
-            chunked_documents = self.document_processor.process_documents(
-                downloaded_files
+        run_id = None
+        try:
+            start = time.perf_counter()
+
+            manifest = self._load_manifest()
+            # Dedup index rows stay provisional under this ID until their chunks are stored
+            run_id = uuid.uuid4().hex
+            self._stage_errors = []
+            self._abort = threading.Event()
+
+            seen_keys = set()
+            skipped = 0
+            ingested = []
+            path_keys = {}
+            temp_files = set()
+            retired = set()
+            # Keys that failed to parse keep their manifest entry and old chunks, so they are retried
+            failed_keys = set()
+            merged_ids = set()
+            dedup_counts = {"exact": 0, "near": 0}
+
+            parse_queue = queue.Queue(maxsize=settings.ingest_queue_size)
+            dedup_queue = queue.Queue(maxsize=settings.ingest_queue_size)
+            embed_queue = queue.Queue(maxsize=settings.ingest_queue_size)
+            upsert_queue = queue.Queue(maxsize=settings.ingest_queue_size)
+
+            def changed_objects():
+                nonlocal skipped
+                for obj in self.storage_connector.list_objects(prefix):
+                    seen_keys.add(obj.key)
+                    if incremental and manifest.is_unchanged(obj):
+                        skipped += 1
+                        report(listed=1, skipped=1)
+                        continue
+                    report(listed=1)
+                    yield obj
+                report(listing_complete=True)
+
+            def download():
+                try:
+                    downloads = self.storage_connector.iter_downloads(
+                        self.temp_dir,
+                        prefix=prefix,
+                        objects=changed_objects(),
+                        max_memory_bytes=settings.download_in_memory_max_bytes
+                    )
+                    for obj, file in downloads:
+                        if self._abort.is_set():
+                            downloads.close()
+                            break
+                        local_path = file.path if isinstance(file, InMemoryFile) else file
+                        if not isinstance(file, InMemoryFile) and not self.storage_connector.reads_in_place:
+                            temp_files.add(local_path)
+                        ingested.append(obj)
+                        path_keys[local_path] = obj.key
+                        report(downloaded=1, bytes_downloaded=obj.size)
+                        parse_queue.put(file)
+                except Exception as e:
+                    logger.error(f"Ingestion stage 'download' failed: {e}", exc_info=True)
+                    self._stage_errors.append(e)
+                    self._abort.set()
+                finally:
+                    parse_queue.put(_DONE)
+
+            def parse(paths):
+                for local_path, chunks in self.document_processor.iter_process_documents(paths):
+                    if local_path in temp_files:
+                        os.remove(local_path)
+                    if chunks is None:
+                        failed_keys.add(path_keys[local_path])
+                        report(failed=1)
+                        continue
+                    storage_metadata = self._storage_metadata(path_keys[local_path])
+                    for chunk in chunks:
+                        chunk.metadata.update(storage_metadata)
+                    report(parsed=1, chunks=len(chunks))
+                    if chunks:
+                        yield chunks
+
+            def dedup_batch(chunk_lists):
+                # Old chunks go first, so a new version never collapses into its own stale copy;
+                # the whole batch is retired with one manifest save and matched in one index call
+                chunks = [doc for chunk_list in chunk_lists for doc in chunk_list]
+                keys = {doc.metadata['storage_key'] for doc in chunks} - retired
+                self._retire_stale(manifest, keys)
+                retired.update(keys)
+
+                result = self.vector_db.deduplicate_documents(chunks, run=run_id)
+                merged_ids.update(result.merged_ids)
+                dedup_counts["exact"] += result.exact
+                dedup_counts["near"] += result.near
+                if result.duplicates:
+                    report(duplicates=result.duplicates, dedup_bytes_saved=result.bytes_saved)
+                return result.unique
+
+            def dedup(chunk_lists):
+                # Embedding waits for INGEST_BATCH_SIZE chunks anyway, so files are
+                # grouped to that size here without delaying the next stage
+                pending, size = [], 0
+                for chunks in chunk_lists:
+                    pending.append(chunks)
+                    size += len(chunks)
+                    if size >= settings.ingest_batch_size:
+                        unique = dedup_batch(pending)
+                        pending, size = [], 0
+                        if unique:
+                            yield unique
+
+                if pending:
+                    unique = dedup_batch(pending)
+                    if unique:
+                        yield unique
+
+            def embed(chunk_lists):
+                pending = []
+                for chunks in chunk_lists:
+                    pending.extend(chunks)
+                    while len(pending) >= settings.ingest_batch_size:
+                        batch = pending[:settings.ingest_batch_size]
+                        del pending[:settings.ingest_batch_size]
+                        embeddings = self.vector_db.embed_documents(batch)
+                        report(embedded=len(batch))
+                        yield batch, embeddings
+
+                if pending:
+                    embeddings = self.vector_db.embed_documents(pending)
+                    report(embedded=len(pending))
+                    yield pending, embeddings
+
+            def upsert(batches):
+                for batch, embeddings in batches:
+                    self.vector_db.upsert_documents(batch, embeddings)
+                    report(upserted=len(batch))
+                return ()
+
+            logger.info(f"Streaming changed files from {self.storage_type} through the ingestion pipeline...")
+            threads = [
+                threading.Thread(target=download, name="ingest-download"),
+                threading.Thread(target=self._run_stage, name="ingest-parse",
+                                 args=("parse", parse_queue, dedup_queue, parse)),
+                threading.Thread(target=self._run_stage, name="ingest-dedup",
+                                 args=("dedup", dedup_queue, embed_queue, dedup)),
+                threading.Thread(target=self._run_stage, name="ingest-embed",
+                                 args=("embed", embed_queue, upsert_queue, embed)),
+                threading.Thread(target=self._run_stage, name="ingest-upsert",
+                                 args=("upsert", upsert_queue, None, upsert)),
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            if self._stage_errors:
+                raise self._stage_errors[0]
+
+            report(stage="finalizing")
+            # Merged chunks are all stored now, so their source lists can be written
+            self.vector_db.sync_duplicate_sources(merged_ids, run=run_id)
+            # Objects that parsed without any chunks still need their old chunks retired
+            self._retire_stale(
+                manifest,
+                [obj.key for obj in ingested if obj.key not in retired and obj.key not in failed_keys]
             )
+            removed = self._remove_deleted(manifest, prefix, seen_keys)
+            report(removed=removed)
 
-            if not chunked_documents:
-                logger.warning("No documents processed.")
-                return
+            for obj in ingested:
+                if obj.key not in failed_keys:
+                    manifest.record(obj, self._source(obj.key))
+            manifest.save()
+
+            logger.info(
+                f"Listed {len(seen_keys)} files: {skipped} unchanged, "
+                f"{len(ingested)} new or modified, {removed} deleted"
+            )
+            logger.info(
+                f"Parsed {progress.parsed} files into {progress.chunks} chunks; "
+                f"embedded {progress.embedded} "
+                f"({self.vector_db.embedding_model.throughput:.1f} chunks/s), "
+                f"upserted {progress.upserted} in {time.perf_counter() - start:.2f}s"
+            )
+            if failed_keys:
+                logger.warning(
+                    f"{len(failed_keys)} files failed to parse and will be retried on the next run: "
+                    f"{', '.join(sorted(failed_keys)[:10])}{' ...' if len(failed_keys) > 10 else ''}"
+                )
+            if progress.duplicates:
+                logger.info(
+                    f"Collapsed {progress.duplicates} duplicate chunks ({dedup_counts['exact']} exact, "
+                    f"{dedup_counts['near']} near-duplicate) into {len(merged_ids)} stored chunks, "
+                    f"saving {progress.duplicates} vectors "
+                    f"(~{progress.dedup_bytes_saved / (1024 * 1024):.2f} MiB of index)"
+                )
+            if self.vector_db.embedding_cache is not None:
+                cache_stats = self.vector_db.embedding_cache.stats()
+                logger.info(
+                    f"Embedding cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                    f"({cache_stats['hit_rate']:.1%} hit rate)"
+                )
+
+            report(stage="complete")
 
-            logger.info("Adding documents to vector database...")
-            self.vector_db.add_documents(chunked_documents)
+            if not seen_keys:
+                logger.warning("No files downloaded. Check your storage configuration.")
+                return
 
             stats = self.vector_db.get_collection_stats()
             logger.info(f"Ingestion complete! Collection '{stats['name']}' now has {stats['count']} documents")
 
+        except BaseException:
+            report(stage="failed")
+            if run_id is not None:
+                self.vector_db.discard_duplicates(run_id)
+            raise
+
         finally:
-            if os.path.exists(self.temp_dir):
+            # Never remove a directory the local connector may be reading from
+            if os.path.exists(self.temp_dir) and not self.storage_connector.reads_in_place:
                 shutil.rmtree(self.temp_dir)
                 logger.info(f"Cleaned up temporary directory: {self.temp_dir}")
@@ -0,0 +1,89 @@
+import uuid
+import logging
+import threading
+from typing import Dict, List, Optional
+from .ingestion_pipeline import IngestionPipeline
+from .progress import IngestionProgress
+
+logger = logging.getLogger(__name__)
+
+
+class IngestionJob:
+    """An ingestion run executing on a background thread.
+
+    The job shares the process-wide vector database handle, so queries keep
+    working (and see fresh results) while documents are being ingested.
+    ``status`` is ``running``, ``complete`` or ``failed``; ``progress`` holds
+    the latest snapshot reported by the pipeline.
+    """
+
+    def __init__(self, storage_type: str, prefix: str = "", incremental: bool = True):
+        self.id = uuid.uuid4().hex[:12]
+        self.storage_type = storage_type
+        self.prefix = prefix
+        self.incremental = incremental
+        self.status = "running"
+        self.error: Optional[str] = None
+        self.progress = IngestionProgress()
+        self._thread = threading.Thread(target=self._run, name=f"ingest-job-{self.id}", daemon=True)
+
+    def _on_progress(self, progress: IngestionProgress) -> None:
+        self.progress = progress
+
+    def _run(self) -> None:
+        try:
+            pipeline = IngestionPipeline(storage_type=self.storage_type)
+            pipeline.run(
+                prefix=self.prefix,
+                incremental=self.incremental,
+                progress_callback=self._on_progress
+            )
+            self.status = "complete"
+        except Exception as e:
+            logger.error(f"Ingestion job {self.id} failed: {e}", exc_info=True)
+            self.error = str(e)
+            self.status = "failed"
+
+    @property
+    def is_running(self) -> bool:
+        return self.status == "running"
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until the job finishes; return whether it did within ``timeout``."""
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+
+# Process-wide job registry, shared across Streamlit sessions and reruns
+_lock = threading.Lock()
+_jobs: Dict[str, IngestionJob] = {}
+
+
+def start_ingestion_job(storage_type: str, prefix: str = "", incremental: bool = True) -> IngestionJob:
+    """Start ingestion in the background and return its job.
+
+    Only one job runs at a time, since concurrent runs would race on the
+    ingestion manifest and the collection.
+    """
+    with _lock:
+        running = [job for job in _jobs.values() if job.is_running]
+        if running:
+            raise RuntimeError(f"Ingestion job {running[0].id} is already running")
+
+        job = IngestionJob(storage_type, prefix=prefix, incremental=incremental)
+        _jobs[job.id] = job
+        job._thread.start()
+
+    logger.info(f"Started ingestion job {job.id} ({storage_type}, prefix='{prefix}')")
+    return job
+
+
+def get_ingestion_job(job_id: str) -> Optional[IngestionJob]:
+    with _lock:
+        return _jobs.get(job_id)
+
+
+def list_ingestion_jobs() -> List[IngestionJob]:
+    """Return all jobs started in this process, oldest first."""
+    with _lock:
+        return list(_jobs.values())
@@ -0,0 +1,87 @@
+import os
+import json
+import logging
+from typing import Dict, Iterable, List, Optional
+from src.storage.base import StorageObject
+
+logger = logging.getLogger(__name__)
+
+
+class IngestionManifest:
+    """Persistent record of which storage objects are already in the vector database.
+
+    Entries are grouped by storage location (e.g. ``s3://bucket``) and keyed by
+    object key, storing the etag, size and last-modified time seen at ingest
+    plus the ``source`` metadata value used for the object's chunks.
+    """
+
+    def __init__(self, path: str, location: str):
+        self.path = path
+        self.location = location
+        self._data: Dict[str, Dict[str, dict]] = self._load()
+        self.entries: Dict[str, dict] = self._data.setdefault(location, {})
+
+    def _load(self) -> Dict[str, Dict[str, dict]]:
+        """Load the manifest from disk, starting empty if missing or unreadable."""
+        if not os.path.exists(self.path):
+            return {}
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable ingestion manifest {self.path}: {e}")
+            return {}
+
+    @staticmethod
+    def _fingerprint(obj: StorageObject) -> dict:
+        return {
+            "etag": obj.etag,
+            "size": obj.size,
+            "last_modified": obj.last_modified.isoformat() if obj.last_modified else None
+        }
+
+    def is_unchanged(self, obj: StorageObject) -> bool:
+        """Return True if the object matches the version already ingested."""
+        entry = self.entries.get(obj.key)
+        if entry is None:
+            return False
+
+        fingerprint = self._fingerprint(obj)
+        return all(entry.get(field) == value for field, value in fingerprint.items())
+
+    def get_source(self, key: str) -> Optional[str]:
+        """Return the ``source`` metadata recorded for an ingested object."""
+        entry = self.entries.get(key)
+        return entry["source"] if entry else None
+
+    def record(self, obj: StorageObject, source: str) -> None:
+        """Record an object as ingested with the given chunk source."""
+        self.entries[obj.key] = {**self._fingerprint(obj), "source": source}
+
+    def remove(self, key: str) -> None:
+        """Forget an object."""
+        self.entries.pop(key, None)
+
+    def missing_keys(self, prefix: str, seen_keys: Iterable[str]) -> List[str]:
+        """Return recorded keys under ``prefix`` that were not seen in a listing."""
+        seen = set(seen_keys)
+        return [
+            key for key in self.entries
+            if key.startswith(prefix) and key not in seen
+        ]
+
+    def clear(self) -> None:
+        """Drop all entries for this location."""
+        self.entries.clear()
+
+    def save(self) -> None:
+        """Atomically write the manifest to disk."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._data, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,91 @@
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+
+@dataclass
+class IngestionProgress:
+    """Snapshot of an ingestion run's per-stage counters.
+
+    ``stage`` moves through ``running``, ``finalizing`` and then ``complete``
+    or ``failed``. File totals are only known once listing has finished, so
+    ``eta_seconds`` is ``None`` until then.
+    """
+
+    stage: str = "running"
+    listed: int = 0
+    skipped: int = 0
+    listing_complete: bool = False
+    downloaded: int = 0
+    bytes_downloaded: int = 0
+    parsed: int = 0
+    failed: int = 0
+    chunks: int = 0
+    duplicates: int = 0
+    dedup_bytes_saved: int = 0
+    embedded: int = 0
+    upserted: int = 0
+    removed: int = 0
+    started_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.time()) - self.started_at
+
+    @property
+    def files_processed(self) -> int:
+        """Files parsed or given up on after a parse error."""
+        return self.parsed + self.failed
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files_processed / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.upserted / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def files_to_process(self) -> Optional[int]:
+        """Number of new or modified files, once listing has finished."""
+        if not self.listing_complete:
+            return None
+        return self.listed - self.skipped
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """Estimated seconds until every file is processed, from the parse rate so far."""
+        total = self.files_to_process
+        if total is None or self.stage != "running":
+            return None
+        if not self.files_processed:
+            return None
+        return max(total - self.files_processed, 0) / self.files_per_second
+
+    def as_dict(self) -> dict:
+        return {
+            "stage": self.stage,
+            "listed": self.listed,
+            "skipped": self.skipped,
+            "listing_complete": self.listing_complete,
+            "downloaded": self.downloaded,
+            "bytes_downloaded": self.bytes_downloaded,
+            "parsed": self.parsed,
+            "failed": self.failed,
+            "chunks": self.chunks,
+            "duplicates": self.duplicates,
+            "dedup_bytes_saved": self.dedup_bytes_saved,
+            "embedded": self.embedded,
+            "upserted": self.upserted,
+            "removed": self.removed,
+            "elapsed": self.elapsed,
+            "files_per_second": self.files_per_second,
+            "chunks_per_second": self.chunks_per_second,
+            "eta_seconds": self.eta_seconds
+        }
+
+
+# Called from pipeline worker threads with a copy of the current progress;
+# callbacks should return quickly since they run inline with the stages
+ProgressCallback = Callable[[IngestionProgress], None]
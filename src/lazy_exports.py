@@ -0,0 +1,18 @@
+import importlib
+from typing import Any, Callable, Dict
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Callable[[str], Any]:
+    """Return a module ``__getattr__`` that imports each export on first access.
+
+    ``exports`` maps a public name to the submodule of ``package`` defining
+    it, so importing the package does not pull in every heavy dependency
+    (cloud SDKs, torch, chromadb, loaders) up front.
+    """
+    def __getattr__(name: str) -> Any:
+        if name in exports:
+            module = importlib.import_module(exports[name], package)
+            return getattr(module, name)
+        raise AttributeError(f"module {package!r} has no attribute {name!r}")
+
+    return __getattr__
@@ -1,3 +1,23 @@
-from .query_engine import RAGQueryEngine
+from typing import TYPE_CHECKING
 
-__all__ = ["RAGQueryEngine"]
+from src.lazy_exports import lazy_exports
+
+if TYPE_CHECKING:
+    from .query_engine import RAGQueryEngine
+    from .async_query_engine import AsyncRAGQueryEngine
+    from .answer_cache import SemanticAnswerCache
+    from .server import QueryServer
+    from .client import QueryServerClient, QueryServerError
+
+_EXPORTS = {
+    "RAGQueryEngine": ".query_engine",
+    "AsyncRAGQueryEngine": ".async_query_engine",
+    "SemanticAnswerCache": ".answer_cache",
+    "QueryServer": ".server",
+    "QueryServerClient": ".client",
+    "QueryServerError": ".client"
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__ = lazy_exports(__name__, _EXPORTS)
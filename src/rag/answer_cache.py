@@ -0,0 +1,127 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Optional, Sequence
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticAnswerCache:
+    """Persistent cache of LLM answers matched by query similarity.
+
+    An answer is reused when a new query was answered from exactly the same
+    set of retrieved chunks, with the same model and temperature, and its
+    embedding is within ``threshold`` cosine similarity of the cached query.
+    """
+
+    def __init__(self, path: str, threshold: float = 0.95, max_entries: int = 10_000):
+        self.path = path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS answers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                model TEXT NOT NULL,
+                temperature REAL NOT NULL,
+                context_key TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                answer TEXT NOT NULL,
+                created REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_answers_lookup ON answers (context_key, model, temperature)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _context_key(chunk_ids: Sequence[str]) -> str:
+        return hashlib.sha256("\n".join(sorted(chunk_ids)).encode()).hexdigest()
+
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        embedding = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm else embedding
+
+    def lookup(
+        self,
+        embedding: np.ndarray,
+        chunk_ids: Sequence[str],
+        model: str,
+        temperature: float
+    ) -> Optional[str]:
+        """Return a cached answer for a similar query over the same context, if any."""
+        query = self._normalize(embedding)
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT embedding, answer FROM answers "
+                "WHERE context_key = ? AND model = ? AND temperature = ?",
+                (self._context_key(chunk_ids), model, temperature)
+            ).fetchall()
+
+            best_answer, best_score = None, self.threshold
+            for blob, answer in rows:
+                score = float(np.dot(query, np.frombuffer(blob, dtype=np.float32)))
+                if score >= best_score:
+                    best_answer, best_score = answer, score
+
+            if best_answer is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return best_answer
+
+    def store(
+        self,
+        embedding: np.ndarray,
+        chunk_ids: Sequence[str],
+        model: str,
+        temperature: float,
+        answer: str
+    ) -> None:
+        """Cache an answer, evicting the oldest entries beyond the size bound."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO answers (model, temperature, context_key, embedding, answer, created) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    model,
+                    temperature,
+                    self._context_key(chunk_ids),
+                    self._normalize(embedding).tobytes(),
+                    answer,
+                    time.time()
+                )
+            )
+            self._conn.execute(
+                "DELETE FROM answers WHERE id <= "
+                "(SELECT id FROM answers ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters for monitoring."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
@@ -0,0 +1,197 @@
+import time
+import asyncio
+import random
+import logging
+from typing import Dict, List, Optional
+from openai import (
+    AsyncOpenAI,
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError
+)
+from .query_engine import RAGQueryEngine
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+
+
+class AsyncRAGQueryEngine(RAGQueryEngine):
+    """asyncio-native RAG engine for serving many users or evaluation sets.
+
+    Batches embed all questions in one encode call and search Chroma in one
+    call off the event loop; LLM calls then run concurrently, bounded by a
+    semaphore and retried with backoff on rate limits and transient errors.
+    Context assembly and answer cache reads and writes also run in worker
+    threads, so tokenizing and SQLite never stall other questions.
+    """
+
+    def __init__(
+        self,
+        model: str = None,
+        temperature: float = None,
+        top_k: int = 5,
+        client=None,
+        async_client: Optional[AsyncOpenAI] = None,
+        use_answer_cache: Optional[bool] = None,
+        max_concurrency: int = None,
+        vector_db=None,
+        retrieval_mode: Optional[str] = None,
+        use_reranker: Optional[bool] = None
+    ):
+        super().__init__(
+            model=model,
+            temperature=temperature,
+            top_k=top_k,
+            client=client,
+            use_answer_cache=use_answer_cache,
+            vector_db=vector_db,
+            retrieval_mode=retrieval_mode,
+            use_reranker=use_reranker
+        )
+        # Retries are handled here so they can honour Retry-After and the semaphore
+        self.async_client = async_client or AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            max_retries=0
+        )
+        self.max_concurrency = max_concurrency or settings.llm_max_concurrency
+
+    async def aquery(
+        self,
+        query_text: str,
+        where: Optional[dict] = None,
+        rerank: Optional[bool] = None
+    ) -> Dict[str, any]:
+        """Query the RAG system without blocking the event loop."""
+        return (await self.aquery_batch([query_text], where=where, rerank=rerank))[0]
+
+    def _retrieve_batch(
+        self,
+        query_texts: List[str],
+        where: Optional[dict],
+        rerank: Optional[bool],
+        timings: Dict[str, float]
+    ) -> List[dict]:
+        """Search for every question in one call, then rerank all candidates in one batched pass."""
+        reranker = self._get_reranker(rerank)
+
+        start = time.perf_counter()
+        all_results = self.vector_db.query_batch(
+            query_texts,
+            max(self.top_k, settings.rerank_candidates) if reranker is not None else self.top_k,
+            self.retrieval_mode,
+            where
+        )
+        timings["retrieval"] = time.perf_counter() - start
+
+        if reranker is not None:
+            start = time.perf_counter()
+            all_results = reranker.rerank_batch(query_texts, all_results, self.top_k)
+            timings["rerank"] = time.perf_counter() - start
+
+        return all_results
+
+    async def aquery_batch(
+        self,
+        query_texts: List[str],
+        where: Optional[dict] = None,
+        rerank: Optional[bool] = None
+    ) -> List[Dict[str, any]]:
+        """Answer many questions concurrently, returning results in input order.
+
+        ``where`` is a metadata filter applied to every question's retrieval.
+        Retrieval and reranking run once for the whole batch, so their
+        ``timings`` are shared by every result.
+        """
+        start = time.perf_counter()
+        timings = {}
+        all_results = await asyncio.to_thread(self._retrieve_batch, query_texts, where, rerank, timings)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        return await asyncio.gather(*(
+            self._aanswer(query_text, query_results, semaphore, dict(timings), start)
+            for query_text, query_results in zip(query_texts, all_results)
+        ))
+
+    async def _aanswer(
+        self,
+        query_text: str,
+        query_results: dict,
+        semaphore: asyncio.Semaphore,
+        timings: Dict[str, float],
+        start: float
+    ) -> Dict[str, any]:
+        """Generate the answer for one retrieved context."""
+        if not query_results['documents'][0]:
+            timings["total"] = time.perf_counter() - start
+            return {
+                "answer": "No relevant documents found in the database.",
+                "sources": [],
+                "query": query_text,
+                "timings": timings
+            }
+
+        context = await asyncio.to_thread(self._timed_context, query_results, timings)
+        sources = self._extract_sources(context.metadatas)
+        chunk_ids = query_results['ids'][0]
+        result = {
+            "sources": sources,
+            "query": query_text,
+            **self._context_fields(context),
+            "timings": timings
+        }
+
+        answer = await asyncio.to_thread(self._lookup_cached_answer, query_text, chunk_ids)
+        if answer is not None:
+            timings["total"] = time.perf_counter() - start
+            return {"answer": answer, **result, "cached": True}
+
+        messages = self._build_messages(self._build_prompt(query_text, context.text))
+        try:
+            async with semaphore:
+                generation_start = time.perf_counter()
+                response = await self._acomplete(messages)
+                timings["generation"] = time.perf_counter() - generation_start
+        except Exception as e:
+            logger.error(f"Failed to answer '{query_text}': {e}", exc_info=True)
+            timings["total"] = time.perf_counter() - start
+            return {"answer": None, **result, "cached": False, "error": str(e)}
+
+        answer = response.choices[0].message.content
+        await asyncio.to_thread(self._store_cached_answer, query_text, chunk_ids, answer)
+        timings["total"] = time.perf_counter() - start
+
+        return {"answer": answer, **result, "cached": False}
+
+    async def _acomplete(self, messages: List[Dict[str, str]]):
+        """Call the chat completion API, retrying rate limits and transient failures."""
+        for attempt in range(settings.llm_max_retries + 1):
+            try:
+                return await self.async_client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=self.temperature
+                )
+            except RETRYABLE_ERRORS as e:
+                if attempt == settings.llm_max_retries:
+                    raise
+
+                delay = self._retry_delay(e, attempt)
+                logger.warning(f"LLM call failed ({type(e).__name__}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    def _retry_delay(error: Exception, attempt: int) -> float:
+        """Use the server's Retry-After when given, else exponential backoff with jitter."""
+        response = getattr(error, "response", None)
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            try:
+                return float(retry_after)
+            except (TypeError, ValueError):
+                pass
+
+        backoff = settings.llm_retry_backoff * (2 ** attempt)
+        return backoff + random.uniform(0, backoff / 2)
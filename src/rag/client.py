@@ -0,0 +1,96 @@
+import json
+import urllib.error
+import urllib.request
+from typing import Dict, Iterator, Optional
+from config import settings
+
+
+class QueryServerError(RuntimeError):
+    """The query server could not be reached or answered with an error.
+
+    ``status`` is the HTTP status code, or None when no response arrived.
+    """
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class QueryServerClient:
+    """Minimal client for the resident query server (see ``serve.py``)."""
+
+    def __init__(self, base_url: str = None, timeout: float = 300.0):
+        self.base_url = (base_url or settings.query_server_url).rstrip("/")
+        self.timeout = timeout
+
+    def _post(self, payload: dict):
+        request = urllib.request.Request(
+            f"{self.base_url}/query",
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        try:
+            return urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            # The server explains failures in a JSON ``error`` field
+            try:
+                detail = json.loads(e.read())["error"]
+            except (ValueError, KeyError, TypeError, OSError):
+                detail = e.reason
+            raise QueryServerError(f"Query server returned HTTP {e.code}: {detail}", e.code) from None
+        except (urllib.error.URLError, OSError) as e:
+            reason = getattr(e, "reason", e)
+            raise QueryServerError(f"Cannot reach the query server at {self.base_url}: {reason}") from None
+
+    def ready(self) -> bool:
+        """Return True once the server has loaded its query engine."""
+        try:
+            with urllib.request.urlopen(f"{self.base_url}/ready", timeout=self.timeout) as response:
+                return response.status == 200
+        except (urllib.error.URLError, OSError):
+            return False
+
+    def query(
+        self,
+        query_text: str,
+        top_k: Optional[int] = None,
+        retrieval_mode: Optional[str] = None,
+        where: Optional[dict] = None,
+        rerank: Optional[bool] = None
+    ) -> Dict[str, any]:
+        """Answer a question, returning the same dict as ``RAGQueryEngine.query``."""
+        body = {
+            "query": query_text,
+            "top_k": top_k,
+            "retrieval_mode": retrieval_mode,
+            "where": where,
+            "rerank": rerank
+        }
+        with self._post(body) as response:
+            return json.loads(response.read())
+
+    def query_stream(
+        self,
+        query_text: str,
+        top_k: Optional[int] = None,
+        retrieval_mode: Optional[str] = None,
+        where: Optional[dict] = None,
+        rerank: Optional[bool] = None
+    ) -> Iterator[Dict[str, any]]:
+        """Yield the same events as ``RAGQueryEngine.query_stream`` as they arrive."""
+        body = {
+            "query": query_text,
+            "top_k": top_k,
+            "retrieval_mode": retrieval_mode,
+            "where": where,
+            "rerank": rerank,
+            "stream": True
+        }
+        with self._post(body) as response:
+            for line in response:
+                if line.strip():
+                    event = json.loads(line)
+                    if event.get("type") == "error":
+                        raise QueryServerError(event["error"], response.status)
+                    yield event
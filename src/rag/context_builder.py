@@ -0,0 +1,202 @@
+import re
+import logging
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Overlaps shorter than this are treated as coincidental, not splitter overlap
+MIN_MERGE_OVERLAP = 20
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    """Return the tiktoken encoding for a model, or None if it cannot be loaded."""
+    try:
+        import tiktoken
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # tiktoken downloads its BPE files on first use, which fails offline
+        logger.warning(f"tiktoken encoding unavailable for {model} ({e}); estimating tokens from length")
+        return None
+
+
+def count_tokens(text: str, model: str) -> int:
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str) -> str:
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return text[:max_tokens * 4]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+@dataclass
+class AssembledContext:
+    """Prompt context packed from retrieved chunks, with token accounting."""
+
+    text: str
+    metadatas: List[Dict] = field(default_factory=list)
+    tokens: int = 0
+    original_tokens: int = 0
+    merged: int = 0
+    duplicates: int = 0
+    dropped: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(self.original_tokens - self.tokens, 0)
+
+
+@dataclass
+class _Chunk:
+    text: str
+    metadata: Dict
+
+
+def _overlap_length(first: str, second: str, max_overlap: int) -> int:
+    """Length of the longest suffix of ``first`` that is a prefix of ``second``."""
+    tail = first[-max_overlap:]
+    probe = second[:MIN_MERGE_OVERLAP]
+    if len(probe) < MIN_MERGE_OVERLAP:
+        return 0
+
+    position = tail.find(probe)
+    while position != -1:
+        if second.startswith(tail[position:]):
+            return len(tail) - position
+        position = tail.find(probe, position + 1)
+    return 0
+
+
+def _shingles(text: str, size: int = 3) -> set:
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < size:
+        return {tuple(words)}
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class ContextBuilder:
+    """Assemble retrieved chunks into a compact prompt context.
+
+    Chunks are kept in rank order. Neighbouring chunks from the same source
+    whose text overlaps (as produced by the splitter's chunk overlap) are
+    merged, near-duplicates are dropped, and the remainder is packed into a
+    token budget measured with the model's tiktoken encoding.
+    """
+
+    def __init__(
+        self,
+        model: str = None,
+        max_tokens: Optional[int] = None,
+        duplicate_threshold: Optional[float] = None,
+        max_overlap: int = 1000
+    ):
+        self.model = model or settings.llm_model
+        self.max_tokens = settings.context_max_tokens if max_tokens is None else max_tokens
+        self.duplicate_threshold = (
+            settings.context_duplicate_threshold if duplicate_threshold is None else duplicate_threshold
+        )
+        self.max_overlap = max_overlap
+
+    @staticmethod
+    def _format(index: int, chunk: _Chunk) -> str:
+        source = chunk.metadata.get('filename', 'Unknown')
+        return f"[Document {index} - {source}]\n{chunk.text}\n"
+
+    def _merge_neighbors(self, chunks: List[_Chunk]) -> int:
+        """Merge overlapping chunks from the same source in place; return merges made."""
+        merges = 0
+        i = 0
+        while i < len(chunks):
+            j = i + 1
+            while j < len(chunks):
+                a, b = chunks[i], chunks[j]
+                if a.metadata.get('source') == b.metadata.get('source'):
+                    overlap = _overlap_length(a.text, b.text, self.max_overlap)
+                    if overlap:
+                        a.text = a.text + b.text[overlap:]
+                    else:
+                        overlap = _overlap_length(b.text, a.text, self.max_overlap)
+                        if overlap:
+                            a.text = b.text + a.text[overlap:]
+                    if overlap:
+                        del chunks[j]
+                        merges += 1
+                        # The merged chunk may now overlap ones already passed over
+                        j = i + 1
+                        continue
+                j += 1
+            i += 1
+        return merges
+
+    def _drop_duplicates(self, chunks: List[_Chunk]) -> List[_Chunk]:
+        kept, kept_shingles = [], []
+        for chunk in chunks:
+            shingles = _shingles(chunk.text)
+            duplicate = any(
+                chunk.text in other.text
+                or len(shingles & other_shingles) / len(shingles | other_shingles) >= self.duplicate_threshold
+                for other, other_shingles in zip(kept, kept_shingles)
+            )
+            if not duplicate:
+                kept.append(chunk)
+                kept_shingles.append(shingles)
+        return kept
+
+    def build(self, query_results: dict) -> AssembledContext:
+        """Build the context for a Chroma-style single-query result."""
+        chunks = [
+            _Chunk(document, dict(metadata or {}))
+            for document, metadata in zip(query_results['documents'][0], query_results['metadatas'][0])
+        ]
+        original_tokens = count_tokens(
+            "\n".join(self._format(i, chunk) for i, chunk in enumerate(chunks, 1)),
+            self.model
+        )
+
+        retrieved = len(chunks)
+        merged = self._merge_neighbors(chunks)
+        unique = self._drop_duplicates(chunks)
+        duplicates = retrieved - merged - len(unique)
+
+        parts, metadatas, tokens = [], [], 0
+        for chunk in unique:
+            part = self._format(len(parts) + 1, chunk)
+            part_tokens = count_tokens(part, self.model) + 1
+            if self.max_tokens and tokens + part_tokens > self.max_tokens:
+                if parts:
+                    continue
+                # Always keep the best chunk, trimmed to the budget
+                part = truncate_to_tokens(part, self.max_tokens - 1, self.model)
+                part_tokens = count_tokens(part, self.model) + 1
+            parts.append(part)
+            metadatas.append(chunk.metadata)
+            tokens += part_tokens
+
+        text = "\n".join(parts)
+        context = AssembledContext(
+            text=text,
+            metadatas=metadatas,
+            tokens=count_tokens(text, self.model),
+            original_tokens=original_tokens,
+            merged=merged,
+            duplicates=duplicates,
+            dropped=len(unique) - len(parts)
+        )
+        logger.info(
+            f"Context: {len(parts)} of {retrieved} chunks ({merged} merged, {duplicates} duplicates, "
+            f"{context.dropped} over budget), {context.tokens} tokens, {context.tokens_saved} saved"
+        )
+        return context
@@ -1,7 +1,12 @@
+import os
+import json
+import time
 import logging
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
 from openai import OpenAI
-from src.vectordb import ChromaVectorDB
+from src.vectordb import ChromaVectorDB, CrossEncoderReranker, get_reranker, get_vector_db
+from .answer_cache import SemanticAnswerCache
+from .context_builder import AssembledContext, ContextBuilder
 from config import settings
 
 logger = logging.getLogger(__name__)
@@ -12,26 +17,58 @@ class RAGQueryEngine:
         self,
         model: str = None,
         temperature: float = None,
-        top_k: int = 5
+        top_k: int = 5,
+        client: Optional[OpenAI] = None,
+        use_answer_cache: Optional[bool] = None,
+        vector_db: Optional[ChromaVectorDB] = None,
+        retrieval_mode: Optional[str] = None,
+        use_reranker: Optional[bool] = None
     ):
         self.model = model or settings.llm_model
         self.temperature = temperature or settings.llm_temperature
         self.top_k = top_k
+        self.retrieval_mode = retrieval_mode or settings.retrieval_mode
+        self.context_builder = ContextBuilder(self.model)
 
-        self.client = OpenAI(api_key=settings.openai_api_key)
-        self.vector_db = ChromaVectorDB()
+        self.client = client or OpenAI(api_key=settings.openai_api_key)
+        self.vector_db = vector_db or get_vector_db()
 
-    def _build_context(self, query_results: dict) -> str:
-        """Build context from retrieved documents."""
-        documents = query_results['documents'][0]
-        metadatas = query_results['metadatas'][0]
+        if use_answer_cache is None:
+            use_answer_cache = settings.answer_cache_enabled
+        self.answer_cache = None
+        if use_answer_cache:
+            self.answer_cache = SemanticAnswerCache(
+                settings.answer_cache_path
+                or os.path.join(self.vector_db.persist_directory, "answer_cache.sqlite"),
+                threshold=settings.answer_cache_threshold,
+                max_entries=settings.answer_cache_max_entries
+            )
 
-        context_parts = []
-        for i, (doc, metadata) in enumerate(zip(documents, metadatas), 1):
-            source = metadata.get('filename', 'Unknown')
-            context_parts.append(f"[Document {i} - {source}]\n{doc}\n")
+        if use_reranker is None:
+            use_reranker = settings.rerank_enabled
+        # Loaded up front so the first question does not pay for it
+        self.reranker = get_reranker() if use_reranker else None
 
-        return "\n".join(context_parts)
+    def _get_reranker(self, rerank: Optional[bool] = None) -> Optional[CrossEncoderReranker]:
+        """Reranker for one question: the engine default, or forced on/off by ``rerank``."""
+        if rerank is None:
+            return self.reranker
+        if not rerank:
+            return None
+        return self.reranker or get_reranker()
+
+    def _build_context(self, query_results: dict) -> AssembledContext:
+        """Build a merged, deduplicated, token-budgeted context from retrieved documents."""
+        return self.context_builder.build(query_results)
+
+    @staticmethod
+    def _context_fields(context: AssembledContext) -> Dict[str, any]:
+        """Context text and token accounting included in query results."""
+        return {
+            "context": context.text,
+            "context_tokens": context.tokens,
+            "tokens_saved": context.tokens_saved
+        }
 
     def _build_prompt(self, query: str, context: str) -> str:
         """Build the prompt for the LLM."""
@@ -51,47 +88,243 @@ Instructions:
 Answer:"""
         return prompt
 
-    def query(self, query_text: str) -> Dict[str, any]:
-        """Query the RAG system."""
+    def _build_messages(self, prompt: str) -> List[Dict[str, str]]:
+        """Build the chat messages sent to the LLM."""
+        return [
+            {"role": "system", "content": "You are a helpful assistant that answers questions based on provided context."},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _extract_sources(self, metadatas: List[dict]) -> List[Dict[str, str]]:
+        """Collect unique sources from the metadata of chunks used as context."""
+        sources = []
+        for metadata in metadatas:
+            # Chunks with collapsed duplicates list every copy's source
+            paths = json.loads(metadata['sources']) if 'sources' in metadata else [metadata.get('source')]
+            for path in paths:
+                source_info = {
+                    'filename': os.path.basename(path) if path else 'Unknown',
+                    'source': path or 'Unknown'
+                }
+                if source_info not in sources:
+                    sources.append(source_info)
+        return sources
+
+    def _lookup_cached_answer(self, query_text: str, chunk_ids: List[str]) -> Optional[str]:
+        """Return a semantically cached answer for this query and context, if enabled."""
+        if self.answer_cache is None:
+            return None
+
+        answer = self.answer_cache.lookup(
+            self.vector_db.embed_query(query_text),
+            chunk_ids,
+            self.model,
+            self.temperature
+        )
+        if answer is not None:
+            logger.info("Serving answer from semantic cache")
+        return answer
+
+    def _store_cached_answer(self, query_text: str, chunk_ids: List[str], answer: str) -> None:
+        if self.answer_cache is not None:
+            self.answer_cache.store(
+                self.vector_db.embed_query(query_text),
+                chunk_ids,
+                self.model,
+                self.temperature,
+                answer
+            )
+
+    def _retrieve(
+        self,
+        query_text: str,
+        top_k: Optional[int] = None,
+        retrieval_mode: Optional[str] = None,
+        where: Optional[dict] = None,
+        rerank: Optional[bool] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> dict:
+        """Retrieve chunks with the requested (or engine default) retrieval mode.
+
+        With reranking, ``RERANK_CANDIDATES`` chunks are fetched and the
+        cross-encoder keeps the best ``top_k``. Stage durations in seconds are
+        recorded in ``timings``.
+        """
+        top_k = top_k or self.top_k
+        reranker = self._get_reranker(rerank)
+        timings = {} if timings is None else timings
+
         logger.info(f"Searching for relevant documents...")
-        query_results = self.vector_db.query(query_text, n_results=self.top_k)
+        start = time.perf_counter()
+        query_results = self.vector_db.query(
+            query_text,
+            n_results=max(top_k, settings.rerank_candidates) if reranker is not None else top_k,
+            mode=retrieval_mode or self.retrieval_mode,
+            where=where
+        )
+        timings["retrieval"] = time.perf_counter() - start
+
+        if reranker is not None:
+            start = time.perf_counter()
+            query_results = reranker.rerank(query_text, query_results, top_k)
+            timings["rerank"] = time.perf_counter() - start
+
+        return query_results
+
+    def _timed_context(self, query_results: dict, timings: Dict[str, float]) -> AssembledContext:
+        start = time.perf_counter()
+        context = self._build_context(query_results)
+        timings["context"] = time.perf_counter() - start
+        return context
+
+    def query(
+        self,
+        query_text: str,
+        top_k: Optional[int] = None,
+        retrieval_mode: Optional[str] = None,
+        where: Optional[dict] = None,
+        rerank: Optional[bool] = None
+    ) -> Dict[str, any]:
+        """Query the RAG system.
+
+        ``retrieval_mode`` overrides the engine's ``vector``/``hybrid``/``keyword``
+        retrieval for this question, ``where`` restricts the search to chunks
+        whose metadata matches (e.g. ``build_where(extension=".pdf")``) and
+        ``rerank`` turns cross-encoder reranking on or off. ``timings`` in the
+        result holds per-stage durations in seconds.
+        """
+        start = time.perf_counter()
+        timings = {}
+        query_results = self._retrieve(query_text, top_k, retrieval_mode, where, rerank, timings)
 
         if not query_results['documents'][0]:
             logger.warning("No relevant documents found in the database")
+            timings["total"] = time.perf_counter() - start
             return {
                 "answer": "No relevant documents found in the database.",
                 "sources": [],
-                "query": query_text
+                "query": query_text,
+                "timings": timings
             }
 
-        context = self._build_context(query_results)
+        context = self._timed_context(query_results, timings)
+        sources = self._extract_sources(context.metadatas)
+        chunk_ids = query_results['ids'][0]
+
+        answer = self._lookup_cached_answer(query_text, chunk_ids)
+        if answer is not None:
+            timings["total"] = time.perf_counter() - start
+            return {
+                "answer": answer,
+                "sources": sources,
+                "query": query_text,
+                **self._context_fields(context),
+                "cached": True,
+                "timings": timings
+            }
 
-        prompt = self._build_prompt(query_text, context)
+        prompt = self._build_prompt(query_text, context.text)
 
         logger.info(f"Generating answer...")
+        generation_start = time.perf_counter()
         response = self.client.chat.completions.create(
             model=self.model,
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that answers questions based on provided context."},
-                {"role": "user", "content": prompt}
-            ],
+            messages=self._build_messages(prompt),
             temperature=self.temperature
         )
+        timings["generation"] = time.perf_counter() - generation_start
 
         answer = response.choices[0].message.content
-
-        sources = []
-        for metadata in query_results['metadatas'][0]:
-            source_info = {
-                'filename': metadata.get('filename', 'Unknown'),
-                'source': metadata.get('source', 'Unknown')
-            }
-            if source_info not in sources:
-                sources.append(source_info)
+        self._store_cached_answer(query_text, chunk_ids, answer)
+        timings["total"] = time.perf_counter() - start
 
         return {
             "answer": answer,
             "sources": sources,
             "query": query_text,
-            "context": context
+            **self._context_fields(context),
+            "cached": False,
+            "timings": timings
+        }
+
+    def query_stream(
+        self,
+        query_text: str,
+        top_k: Optional[int] = None,
+        retrieval_mode: Optional[str] = None,
+        where: Optional[dict] = None,
+        rerank: Optional[bool] = None
+    ) -> Iterator[Dict[str, any]]:
+        """Query the RAG system, yielding events as they become available.
+
+        Yields a ``retrieval`` event (query, sources, context) as soon as the
+        vector search finishes, then ``token`` events with answer fragments as
+        they arrive from the chat completion stream, and finally a ``done``
+        event carrying the full answer. Both the ``retrieval`` and ``done``
+        events carry the per-stage ``timings`` measured so far.
+        """
+        start = time.perf_counter()
+        timings = {}
+        query_results = self._retrieve(query_text, top_k, retrieval_mode, where, rerank, timings)
+
+        if not query_results['documents'][0]:
+            logger.warning("No relevant documents found in the database")
+            answer = "No relevant documents found in the database."
+            yield {
+                "type": "retrieval",
+                "query": query_text,
+                "sources": [],
+                "context": "",
+                "context_tokens": 0,
+                "tokens_saved": 0,
+                "timings": dict(timings)
+            }
+            timings["total"] = time.perf_counter() - start
+            yield {"type": "token", "content": answer}
+            yield {"type": "done", "answer": answer, "cached": False, "timings": timings}
+            return
+
+        context = self._timed_context(query_results, timings)
+        chunk_ids = query_results['ids'][0]
+        yield {
+            "type": "retrieval",
+            "query": query_text,
+            "sources": self._extract_sources(context.metadatas),
+            **self._context_fields(context),
+            "timings": dict(timings)
         }
+
+        answer = self._lookup_cached_answer(query_text, chunk_ids)
+        if answer is not None:
+            timings["total"] = time.perf_counter() - start
+            yield {"type": "token", "content": answer}
+            yield {"type": "done", "answer": answer, "cached": True, "timings": timings}
+            return
+
+        prompt = self._build_prompt(query_text, context.text)
+
+        logger.info(f"Generating answer...")
+        generation_start = time.perf_counter()
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=self._build_messages(prompt),
+            temperature=self.temperature,
+            stream=True
+        )
+
+        parts = []
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            content = chunk.choices[0].delta.content
+            if content:
+                if not parts:
+                    timings["first_token"] = time.perf_counter() - generation_start
+                parts.append(content)
+                yield {"type": "token", "content": content}
+        timings["generation"] = time.perf_counter() - generation_start
+
+        answer = "".join(parts)
+        self._store_cached_answer(query_text, chunk_ids, answer)
+        timings["total"] = time.perf_counter() - start
+        yield {"type": "done", "answer": answer, "cached": False, "timings": timings}
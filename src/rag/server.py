@@ -0,0 +1,149 @@
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+from .query_engine import RAGQueryEngine
+
+logger = logging.getLogger(__name__)
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """JSON API over a shared RAGQueryEngine.
+
+    ``GET /health`` reports liveness, ``GET /ready`` returns 503 until the
+    engine has loaded, ``GET /stats`` exposes collection and cache counters,
+    and ``POST /query`` answers
+    ``{"query": ..., "top_k": ..., "retrieval_mode": ..., "where": ..., "rerank": ..., "stream": ...}``
+    where ``where`` is a Chroma metadata filter and ``rerank`` overrides
+    ``RERANK_ENABLED``.
+    Streaming responses are newline-delimited JSON events from
+    ``RAGQueryEngine.query_stream``.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server: "QueryServer"
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/ready":
+            if self.server.engine is not None:
+                self._send_json(200, {"status": "ready"})
+            else:
+                self._send_json(503, {
+                    "status": "loading" if self.server.load_error is None else "failed",
+                    "error": self.server.load_error
+                })
+        elif self.path == "/stats":
+            engine = self._require_engine()
+            if engine is not None:
+                self._send_json(200, {
+                    "collection": engine.vector_db.get_collection_stats(),
+                    "caches": engine.vector_db.get_cache_stats()
+                })
+        else:
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+
+    def do_POST(self) -> None:
+        if self.path != "/query":
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(body, dict):
+                raise ValueError("JSON body is not an object")
+            query_text = body["query"]
+        except (ValueError, KeyError):
+            self._send_json(400, {"error": "Expected a JSON body with a 'query' field"})
+            return
+
+        engine = self._require_engine()
+        if engine is None:
+            return
+
+        options = {
+            "top_k": body.get("top_k"),
+            "retrieval_mode": body.get("retrieval_mode"),
+            "where": body.get("where"),
+            "rerank": body.get("rerank")
+        }
+        try:
+            if body.get("stream"):
+                self._stream_events(engine.query_stream(query_text, **options))
+            else:
+                self._send_json(200, engine.query(query_text, **options))
+        except Exception as e:
+            logger.error(f"Error answering query: {e}", exc_info=True)
+            self._send_json(500, {"error": str(e)})
+
+    def _require_engine(self) -> Optional[RAGQueryEngine]:
+        if self.server.engine is None:
+            self._send_json(503, {"error": "Query engine is not ready"})
+        return self.server.engine
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream_events(self, events) -> None:
+        # Pull the retrieval event first so errors still produce a JSON response
+        first = next(events)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        self.wfile.write(json.dumps(first).encode("utf-8") + b"\n")
+        try:
+            for event in events:
+                self.wfile.write(json.dumps(event).encode("utf-8") + b"\n")
+                self.wfile.flush()
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            logger.error(f"Error streaming answer: {e}", exc_info=True)
+            self.wfile.write(json.dumps({"type": "error", "error": str(e)}).encode("utf-8") + b"\n")
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+
+class QueryServer(ThreadingHTTPServer):
+    """Resident query server that loads the engine (models, Chroma, LLM client) once.
+
+    The engine is built in a background thread so ``/health`` answers
+    immediately and ``/ready`` flips once loading completes.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        engine_factory: Callable[[], RAGQueryEngine] = RAGQueryEngine
+    ):
+        super().__init__((host, port), QueryRequestHandler)
+        self.engine: Optional[RAGQueryEngine] = None
+        self.load_error: Optional[str] = None
+        threading.Thread(
+            target=self._load_engine,
+            args=(engine_factory,),
+            name="query-engine-loader",
+            daemon=True
+        ).start()
+
+    def _load_engine(self, engine_factory: Callable[[], RAGQueryEngine]) -> None:
+        try:
+            self.engine = engine_factory()
+            logger.info("Query engine loaded; server is ready")
+        except Exception as e:
+            logger.error(f"Failed to load query engine: {e}", exc_info=True)
+            self.load_error = str(e)
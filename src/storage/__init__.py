@@ -1,11 +1,26 @@
-from .base import StorageConnector
-from .s3_connector import S3Connector
-from .gcp_connector import GCPConnector
-from .azure_connector import AzureConnector
-
-__all__ = [
-    "StorageConnector",
-    "S3Connector",
-    "GCPConnector",
-    "AzureConnector"
-]
+from typing import TYPE_CHECKING
+
+from src.lazy_exports import lazy_exports
+
+if TYPE_CHECKING:
+    from .base import StorageConnector
+    from .base import StorageObject
+    from .base import InMemoryFile
+    from .local_connector import LocalConnector
+    from .s3_connector import S3Connector
+    from .gcp_connector import GCPConnector
+    from .azure_connector import AzureConnector
+
+_EXPORTS = {
+    "StorageConnector": ".base",
+    "StorageObject": ".base",
+    "InMemoryFile": ".base",
+    "LocalConnector": ".local_connector",
+    "S3Connector": ".s3_connector",
+    "GCPConnector": ".gcp_connector",
+    "AzureConnector": ".azure_connector"
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__ = lazy_exports(__name__, _EXPORTS)
@@ -1,9 +1,12 @@
 import os
 import logging
-from typing import List
+from typing import Iterator, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from azure.core.pipeline.transport import RequestsTransport
 from azure.storage.blob import BlobServiceClient
 from azure.core.exceptions import AzureError
-from .base import StorageConnector
+from .base import StorageConnector, StorageObject
 from config import settings
 
 logger = logging.getLogger(__name__)
@@ -12,21 +15,39 @@ logger = logging.getLogger(__name__)
 class AzureConnector(StorageConnector):
     def __init__(self, container_name: str = None):
         self.container_name = container_name or settings.azure_container_name
+        # Share one pooled HTTP session across concurrent downloads
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=settings.download_concurrency,
+            pool_maxsize=settings.download_concurrency
+        )
+        session.mount("https://", adapter)
         self.blob_service_client = BlobServiceClient.from_connection_string(
-            settings.azure_storage_connection_string
+            settings.azure_storage_connection_string,
+            transport=RequestsTransport(session=session)
         )
         self.container_client = self.blob_service_client.get_container_client(
             self.container_name
         )
 
-    def list_files(self, prefix: str = "") -> List[str]:
-        """List all files in Azure container."""
+    @property
+    def location(self) -> str:
+        return f"azure://{self.container_name}"
+
+    def list_objects(self, prefix: str = "") -> Iterator[StorageObject]:
+        """Lazily list blobs in Azure container; the blob pager fetches on demand."""
+        self.last_listing_error = None
         try:
-            blobs = self.container_client.list_blobs(name_starts_with=prefix)
-            return [blob.name for blob in blobs]
+            for blob in self.container_client.list_blobs(name_starts_with=prefix):
+                yield StorageObject(
+                    key=blob.name,
+                    size=blob.size or 0,
+                    etag=(blob.etag or "").strip('"'),
+                    last_modified=blob.last_modified
+                )
         except AzureError as e:
             logger.error(f"Error listing Azure files: {e}", exc_info=True, extra={"container": self.container_name})
-            return []
+            self.last_listing_error = e
 
     def download_file(self, file_path: str, local_path: str) -> str:
         """Download a single file from Azure."""
@@ -34,22 +55,19 @@ class AzureConnector(StorageConnector):
             os.makedirs(os.path.dirname(local_path), exist_ok=True)
             blob_client = self.container_client.get_blob_client(file_path)
 
+            # Stream to disk rather than buffering the whole blob first
             with open(local_path, "wb") as download_file:
-                download_file.write(blob_client.download_blob().readall())
+                blob_client.download_blob().readinto(download_file)
 
             return local_path
         except AzureError as e:
             logger.error(f"Error downloading file {file_path}: {e}", exc_info=True)
             return None
 
-    def download_all(self, local_dir: str, prefix: str = "") -> List[str]:
-        """Download all files from Azure container."""
-        files = self.list_files(prefix)
-        downloaded = []
-
-        for file_path in files:
-            local_path = os.path.join(local_dir, file_path)
-            if self.download_file(file_path, local_path):
-                downloaded.append(local_path)
-
-        return downloaded
+    def download_bytes(self, file_path: str) -> Optional[bytes]:
+        """Read a single file from Azure into memory."""
+        try:
+            return self.container_client.get_blob_client(file_path).download_blob().readall()
+        except AzureError as e:
+            logger.error(f"Error downloading file {file_path}: {e}", exc_info=True)
+            return None
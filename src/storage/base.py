@@ -1,12 +1,53 @@
+import os
+import time
+import tempfile
+import logging
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
 from pathlib import Path
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StorageObject:
+    """Descriptor for a single object returned by a storage listing."""
+    key: str
+    size: int = 0
+    etag: str = ""
+    last_modified: Optional[datetime] = None
+
+
+@dataclass(frozen=True)
+class InMemoryFile:
+    """Contents of a downloaded object held in memory instead of on disk.
+
+    ``path`` is where the object would have been downloaded to, so chunk
+    ``source`` metadata is the same whichever way the object was fetched.
+    """
+    path: str
+    data: bytes
 
 
 class StorageConnector(ABC):
+    # Set by list_objects implementations when a listing ends early on error
+    last_listing_error: Optional[Exception] = None
+    # True when iter_downloads yields the original files rather than copies,
+    # which callers must therefore never delete
+    reads_in_place: bool = False
+
+    @property
+    def location(self) -> str:
+        """URI-style identifier of the bucket/container this connector reads."""
+        return type(self).__name__
+
     @abstractmethod
-    def list_files(self, prefix: str = "") -> List[str]:
-        """List all files in the storage with optional prefix filter."""
+    def list_objects(self, prefix: str = "") -> Iterator[StorageObject]:
+        """Lazily yield objects in the storage with optional prefix filter, page by page."""
         pass
 
     @abstractmethod
@@ -14,7 +55,148 @@ class StorageConnector(ABC):
         """Download a file from storage to local path."""
         pass
 
-    @abstractmethod
-    def download_all(self, local_dir: str, prefix: str = "") -> List[str]:
-        """Download all files to local directory."""
-        pass
+    def download_bytes(self, file_path: str) -> Optional[bytes]:
+        """Fetch a file's contents into memory.
+
+        The default goes through a temporary file; connectors whose SDK can
+        read an object straight into memory override this.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            local_path = self.download_file(file_path, os.path.join(temp_dir, os.path.basename(file_path)))
+            if not local_path:
+                return None
+            with open(local_path, "rb") as f:
+                return f.read()
+
+    def download_all(
+        self,
+        local_dir: str,
+        prefix: str = "",
+        max_workers: Optional[int] = None
+    ) -> List[str]:
+        """Download all files to local directory using a bounded worker pool."""
+        return [
+            local_path
+            for _, local_path in self.iter_downloads(local_dir, prefix, max_workers)
+        ]
+
+    def iter_downloads(
+        self,
+        local_dir: str,
+        prefix: str = "",
+        max_workers: Optional[int] = None,
+        objects: Optional[Iterable[StorageObject]] = None,
+        max_memory_bytes: int = 0
+    ) -> Iterator[Tuple[StorageObject, Union[str, InMemoryFile]]]:
+        """Yield (object, local_path) pairs as downloads complete.
+
+        Listing is consumed lazily and at most ``2 * max_workers`` downloads are
+        in flight, so downloading starts with the first listing page and memory
+        stays bounded regardless of bucket size. Pass ``objects`` to download a
+        pre-filtered listing instead of everything under ``prefix``.
+
+        Objects no larger than ``max_memory_bytes`` are fetched straight into
+        memory and yielded as ``InMemoryFile`` instead of a local path.
+        """
+        max_workers = max(1, max_workers or settings.download_concurrency)
+        listed = downloaded = total_bytes = 0
+        start = time.perf_counter()
+        pending = {}
+
+        def drain():
+            nonlocal downloaded, total_bytes
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                obj = pending.pop(future)
+                result = future.result()
+                if result is not None:
+                    downloaded += 1
+                    if isinstance(result, InMemoryFile):
+                        total_bytes += len(result.data)
+                    else:
+                        total_bytes += os.path.getsize(result)
+                    yield obj, result
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                if objects is None:
+                    objects = self.list_objects(prefix)
+
+                for obj in objects:
+                    listed += 1
+                    future = executor.submit(
+                        self._download_with_retry,
+                        obj.key,
+                        os.path.join(local_dir, obj.key),
+                        0 < max_memory_bytes and obj.size <= max_memory_bytes
+                    )
+                    pending[future] = obj
+
+                    if len(pending) >= 2 * max_workers:
+                        yield from drain()
+
+                while pending:
+                    yield from drain()
+        finally:
+            self.last_download_stats = self._download_summary(
+                listed, downloaded, total_bytes, time.perf_counter() - start
+            )
+
+    def _download_with_retry(
+        self,
+        file_path: str,
+        local_path: str,
+        in_memory: bool = False
+    ) -> Union[str, InMemoryFile, None]:
+        """Download a single file, retrying with exponential backoff on failure.
+
+        With ``in_memory`` the contents are fetched with ``download_bytes`` and
+        returned as an ``InMemoryFile`` named by ``local_path``.
+        """
+        attempts = settings.download_max_retries + 1
+
+        for attempt in range(1, attempts + 1):
+            try:
+                if in_memory:
+                    data = self.download_bytes(file_path)
+                    result = None if data is None else InMemoryFile(local_path, data)
+                else:
+                    result = self.download_file(file_path, local_path)
+            except Exception as e:
+                logger.warning(f"Download attempt {attempt}/{attempts} failed for {file_path}: {e}")
+                result = None
+
+            if result is not None:
+                return result
+
+            if attempt < attempts:
+                time.sleep(settings.download_retry_backoff * (2 ** (attempt - 1)))
+
+        logger.error(f"Giving up on {file_path} after {attempts} attempts")
+        return None
+
+    def _download_summary(
+        self,
+        listed: int,
+        downloaded: int,
+        total_bytes: int,
+        elapsed: float
+    ) -> dict:
+        """Log and return throughput statistics for a download run."""
+        elapsed = max(elapsed, 1e-9)
+        stats = {
+            "files_listed": listed,
+            "files_downloaded": downloaded,
+            "files_failed": listed - downloaded,
+            "bytes": total_bytes,
+            "seconds": elapsed,
+            "files_per_second": downloaded / elapsed,
+            "bytes_per_second": total_bytes / elapsed
+        }
+        logger.info(
+            f"Downloaded {downloaded}/{listed} files "
+            f"({total_bytes / 1_048_576:.1f} MiB) in {elapsed:.2f}s: "
+            f"{stats['files_per_second']:.1f} files/s, "
+            f"{stats['bytes_per_second'] / 1_048_576:.2f} MiB/s"
+        )
+        return stats
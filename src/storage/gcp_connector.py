@@ -1,9 +1,10 @@
 import os
 import logging
-from typing import List
+from typing import Iterator, Optional
 from google.cloud import storage
+from requests.adapters import HTTPAdapter
 from google.api_core.exceptions import GoogleAPIError
-from .base import StorageConnector
+from .base import StorageConnector, StorageObject
 from config import settings
 
 logger = logging.getLogger(__name__)
@@ -17,16 +18,34 @@ class GCPConnector(StorageConnector):
             os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = settings.google_application_credentials
 
         self.client = storage.Client(project=settings.gcp_project_id)
+        # Size the shared HTTP session's pool for concurrent downloads
+        adapter = HTTPAdapter(
+            pool_connections=settings.download_concurrency,
+            pool_maxsize=settings.download_concurrency
+        )
+        self.client._http.mount("https://", adapter)
         self.bucket = self.client.bucket(self.bucket_name)
 
-    def list_files(self, prefix: str = "") -> List[str]:
-        """List all files in GCP bucket."""
+    @property
+    def location(self) -> str:
+        return f"gs://{self.bucket_name}"
+
+    def list_objects(self, prefix: str = "") -> Iterator[StorageObject]:
+        """Lazily list objects in GCP bucket; the blob iterator pages on demand."""
+        self.last_listing_error = None
         try:
-            blobs = self.bucket.list_blobs(prefix=prefix)
-            return [blob.name for blob in blobs]
+            for blob in self.bucket.list_blobs(prefix=prefix):
+                if blob.name.endswith('/'):
+                    continue
+                yield StorageObject(
+                    key=blob.name,
+                    size=blob.size or 0,
+                    etag=blob.md5_hash or blob.etag or "",
+                    last_modified=blob.updated
+                )
         except GoogleAPIError as e:
             logger.error(f"Error listing GCP files: {e}", exc_info=True, extra={"bucket": self.bucket_name})
-            return []
+            self.last_listing_error = e
 
     def download_file(self, file_path: str, local_path: str) -> str:
         """Download a single file from GCP."""
@@ -39,14 +58,10 @@ class GCPConnector(StorageConnector):
             logger.error(f"Error downloading file {file_path}: {e}", exc_info=True)
             return None
 
-    def download_all(self, local_dir: str, prefix: str = "") -> List[str]:
-        """Download all files from GCP bucket."""
-        files = self.list_files(prefix)
-        downloaded = []
-
-        for file_path in files:
-            local_path = os.path.join(local_dir, file_path)
-            if self.download_file(file_path, local_path):
-                downloaded.append(local_path)
-
-        return downloaded
+    def download_bytes(self, file_path: str) -> Optional[bytes]:
+        """Read a single file from GCP into memory."""
+        try:
+            return self.bucket.blob(file_path).download_as_bytes()
+        except GoogleAPIError as e:
+            logger.error(f"Error downloading file {file_path}: {e}", exc_info=True)
+            return None
@@ -0,0 +1,109 @@
+import os
+import time
+import shutil
+import logging
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Optional, Tuple
+from .base import StorageConnector, StorageObject
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LocalConnector(StorageConnector):
+    """Read documents from a local directory or network mount (e.g. NFS).
+
+    Files are parsed in place: ``iter_downloads`` yields their real paths
+    without copying, so ingestion does no extra disk I/O.
+    """
+
+    reads_in_place = True
+
+    def __init__(self, root_dir: str = None):
+        self.root_dir = os.path.abspath(root_dir or settings.local_storage_path)
+
+    @property
+    def location(self) -> str:
+        return f"file://{self.root_dir}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root_dir, *key.split("/"))
+
+    def _walk(self, directory: str) -> Iterator[os.DirEntry]:
+        """Yield file entries under ``directory`` in sorted order."""
+        with os.scandir(directory) as entries:
+            entries = sorted(entries, key=lambda entry: entry.name)
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from self._walk(entry.path)
+            elif entry.is_file():
+                yield entry
+
+    def list_objects(self, prefix: str = "") -> Iterator[StorageObject]:
+        """Lazily list files under the root whose relative key starts with ``prefix``."""
+        self.last_listing_error = None
+        # Only walk the directory the prefix points into
+        start_dir = self._path(prefix.rsplit("/", 1)[0]) if "/" in prefix else self.root_dir
+        if start_dir != self.root_dir and not os.path.isdir(start_dir):
+            return
+        try:
+            for entry in self._walk(start_dir):
+                key = os.path.relpath(entry.path, self.root_dir).replace(os.sep, "/")
+                if not key.startswith(prefix):
+                    continue
+                stat = entry.stat()
+                yield StorageObject(
+                    key=key,
+                    size=stat.st_size,
+                    etag=f"{stat.st_mtime_ns:x}-{stat.st_size:x}",
+                    last_modified=datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+                )
+        except OSError as e:
+            logger.error(f"Error listing local files: {e}", exc_info=True, extra={"root": self.root_dir})
+            self.last_listing_error = e
+
+    def download_file(self, file_path: str, local_path: str) -> str:
+        """Copy a single file to local path."""
+        try:
+            os.makedirs(os.path.dirname(local_path), exist_ok=True)
+            shutil.copyfile(self._path(file_path), local_path)
+            return local_path
+        except OSError as e:
+            logger.error(f"Error copying file {file_path}: {e}", exc_info=True)
+            return None
+
+    def download_bytes(self, file_path: str) -> Optional[bytes]:
+        """Read a single file into memory."""
+        try:
+            with open(self._path(file_path), "rb") as f:
+                return f.read()
+        except OSError as e:
+            logger.error(f"Error reading file {file_path}: {e}", exc_info=True)
+            return None
+
+    def iter_downloads(
+        self,
+        local_dir: str,
+        prefix: str = "",
+        max_workers: Optional[int] = None,
+        objects: Optional[Iterable[StorageObject]] = None,
+        max_memory_bytes: int = 0
+    ) -> Iterator[Tuple[StorageObject, str]]:
+        """Yield (object, path) pairs pointing at the original files.
+
+        Nothing is copied, so ``local_dir``, ``max_workers`` and
+        ``max_memory_bytes`` are ignored.
+        """
+        listed = total_bytes = 0
+        start = time.perf_counter()
+        try:
+            if objects is None:
+                objects = self.list_objects(prefix)
+            for obj in objects:
+                listed += 1
+                total_bytes += obj.size
+                yield obj, self._path(obj.key)
+        finally:
+            self.last_download_stats = self._download_summary(
+                listed, listed, total_bytes, time.perf_counter() - start
+            )
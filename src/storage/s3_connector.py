@@ -1,9 +1,10 @@
 import os
 import logging
-from typing import List
+from typing import Iterator, Optional
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
-from .base import StorageConnector
+from .base import StorageConnector, StorageObject
 from config import settings
 
 logger = logging.getLogger(__name__)
@@ -16,24 +17,32 @@ class S3Connector(StorageConnector):
             's3',
             aws_access_key_id=settings.aws_access_key_id,
             aws_secret_access_key=settings.aws_secret_access_key,
-            region_name=settings.aws_region
+            region_name=settings.aws_region,
+            config=Config(max_pool_connections=settings.download_concurrency)
         )
 
-    def list_files(self, prefix: str = "") -> List[str]:
-        """List all files in S3 bucket."""
-        try:
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=prefix
-            )
-
-            if 'Contents' not in response:
-                return []
+    @property
+    def location(self) -> str:
+        return f"s3://{self.bucket_name}"
 
-            return [obj['Key'] for obj in response['Contents']]
+    def list_objects(self, prefix: str = "") -> Iterator[StorageObject]:
+        """Lazily list objects in S3 bucket, following continuation tokens."""
+        self.last_listing_error = None
+        try:
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+                for obj in page.get('Contents', []):
+                    if obj['Key'].endswith('/'):
+                        continue
+                    yield StorageObject(
+                        key=obj['Key'],
+                        size=obj.get('Size', 0),
+                        etag=obj.get('ETag', '').strip('"'),
+                        last_modified=obj.get('LastModified')
+                    )
         except ClientError as e:
             logger.error(f"Error listing S3 files: {e}", exc_info=True, extra={"bucket": self.bucket_name})
-            return []
+            self.last_listing_error = e
 
     def download_file(self, file_path: str, local_path: str) -> str:
         """Download a single file from S3."""
@@ -45,14 +54,11 @@ class S3Connector(StorageConnector):
             logger.error(f"Error downloading file {file_path}: {e}", exc_info=True)
             return None
 
-    def download_all(self, local_dir: str, prefix: str = "") -> List[str]:
-        """Download all files from S3 bucket."""
-        files = self.list_files(prefix)
-        downloaded = []
-
-        for file_path in files:
-            local_path = os.path.join(local_dir, file_path)
-            if self.download_file(file_path, local_path):
-                downloaded.append(local_path)
-
-        return downloaded
+    def download_bytes(self, file_path: str) -> Optional[bytes]:
+        """Read a single file from S3 into memory."""
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=file_path)
+            return response['Body'].read()
+        except ClientError as e:
+            logger.error(f"Error downloading file {file_path}: {e}", exc_info=True)
+            return None
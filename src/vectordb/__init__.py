@@ -1,3 +1,41 @@
-from .chroma_db import ChromaVectorDB
+from typing import TYPE_CHECKING
 
-__all__ = ["ChromaVectorDB"]
+from src.lazy_exports import lazy_exports
+
+if TYPE_CHECKING:
+    from .chroma_db import ChromaVectorDB
+    from .filters import build_where, prefix_conditions
+    from .embeddings import SentenceEmbedder
+    from .embedding_cache import EmbeddingCache
+    from .dedup_index import DedupIndex
+    from .reranker import CrossEncoderReranker
+    from .query_cache import TTLCache
+    from .resources import (
+        get_embedder,
+        get_reranker,
+        get_chroma_client,
+        get_vector_db,
+        get_resource_stats,
+        clear_resources
+    )
+
+_EXPORTS = {
+    "ChromaVectorDB": ".chroma_db",
+    "build_where": ".filters",
+    "prefix_conditions": ".filters",
+    "SentenceEmbedder": ".embeddings",
+    "EmbeddingCache": ".embedding_cache",
+    "DedupIndex": ".dedup_index",
+    "CrossEncoderReranker": ".reranker",
+    "TTLCache": ".query_cache",
+    "get_embedder": ".resources",
+    "get_reranker": ".resources",
+    "get_chroma_client": ".resources",
+    "get_vector_db": ".resources",
+    "get_resource_stats": ".resources",
+    "clear_resources": ".resources"
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,239 @@
+import os
+import re
+import json
+import math
+import sqlite3
+import logging
+import threading
+from collections import Counter
+from typing import Collection, Dict, List, Optional, Sequence, Tuple
+
+from src.vectordb.filters import where_to_sql
+
+logger = logging.getLogger(__name__)
+
+# Keeps identifiers such as "AB-1234", "v2.1" or "file_name" as one token
+TOKEN_PATTERN = re.compile(r"\w+(?:[-./]\w+)*")
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have how i in is it its of on or "
+    "that the this to was were what when where which who why will with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; compound identifiers also emit their parts."""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        tokens.append(token)
+        if not token.isalnum():
+            tokens.extend(part for part in re.split(r"[-./_]", token) if part)
+    return tokens
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Fuse ranked ID lists, scoring each ID by the sum of ``1 / (k + rank)``."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class BM25Index:
+    """Persistent BM25 inverted index over chunks, backed by SQLite.
+
+    Chunks are keyed by the same IDs as the Chroma collection and remember
+    their ``source`` so they can be dropped together with the vector chunks,
+    and their metadata so ``where`` filters are applied inside SQLite.
+    """
+
+    def __init__(self, path: str, k1: float = 1.5, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS bm25_docs (
+                id TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                length INTEGER NOT NULL,
+                metadata TEXT
+            )"""
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(bm25_docs)")}
+        if "metadata" not in columns:
+            self._conn.execute("ALTER TABLE bm25_docs ADD COLUMN metadata TEXT")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS bm25_postings (
+                term TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                tf INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                PRIMARY KEY (term, doc_id)
+            ) WITHOUT ROWID"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_bm25_docs_source ON bm25_docs (source)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_bm25_postings_doc ON bm25_postings (doc_id)")
+        self._conn.commit()
+
+        self._count, total_length = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM bm25_docs"
+        ).fetchone()
+        self._total_length = total_length
+
+        missing = self._conn.execute("SELECT COUNT(*) FROM bm25_docs WHERE metadata IS NULL").fetchone()[0]
+        if missing:
+            logger.warning(
+                "%d keyword index chunks predate metadata filtering and will not match filtered "
+                "queries; re-ingest with --full-refresh to include them", missing
+            )
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def add(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        sources: Sequence[str],
+        metadatas: Optional[Sequence[dict]] = None
+    ) -> None:
+        """Index chunks; IDs already in the index are left unchanged."""
+        metadatas = metadatas or [{"source": source} for source in sources]
+        with self._lock:
+            for doc_id, text, source, metadata in zip(ids, texts, sources, metadatas):
+                terms = Counter(tokenize(text))
+                length = sum(terms.values())
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO bm25_docs (id, source, length, metadata) VALUES (?, ?, ?, ?)",
+                    (doc_id, source, length, json.dumps(metadata))
+                )
+                if not cursor.rowcount:
+                    continue
+
+                self._conn.executemany(
+                    "INSERT INTO bm25_postings (term, doc_id, tf, length) VALUES (?, ?, ?, ?)",
+                    [(term, doc_id, tf, length) for term, tf in terms.items()]
+                )
+                self._count += 1
+                self._total_length += length
+            self._conn.commit()
+
+    def delete_source(self, source: str) -> int:
+        """Remove every chunk indexed for ``source``; return how many were removed."""
+        with self._lock:
+            removed, length = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM bm25_docs WHERE source = ?",
+                (source,)
+            ).fetchone()
+            self._conn.execute(
+                "DELETE FROM bm25_postings WHERE doc_id IN (SELECT id FROM bm25_docs WHERE source = ?)",
+                (source,)
+            )
+            self._conn.execute("DELETE FROM bm25_docs WHERE source = ?", (source,))
+            self._conn.commit()
+            self._count -= removed
+            self._total_length -= length
+        return removed
+
+    def set_sources(
+        self,
+        ids: Sequence[str],
+        sources: Sequence[str],
+        metadatas: Optional[Sequence[dict]] = None
+    ) -> None:
+        """Re-assign indexed chunks to different sources, optionally replacing their metadata."""
+        with self._lock:
+            if metadatas is None:
+                self._conn.executemany(
+                    "UPDATE bm25_docs SET source = ? WHERE id = ?", list(zip(sources, ids))
+                )
+            else:
+                self._conn.executemany(
+                    "UPDATE bm25_docs SET source = ?, metadata = ? WHERE id = ?",
+                    [(source, json.dumps(metadata), doc_id) for source, metadata, doc_id in zip(sources, metadatas, ids)]
+                )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM bm25_postings")
+            self._conn.execute("DELETE FROM bm25_docs")
+            self._conn.commit()
+            self._count = 0
+            self._total_length = 0
+
+    def search(
+        self,
+        query_text: str,
+        n_results: int = 5,
+        where: Optional[dict] = None,
+        include_ids: Optional[Collection[str]] = None
+    ) -> List[Tuple[str, float]]:
+        """Return the top ``(id, score)`` pairs for a query, best first.
+
+        ``where`` is a Chroma-style metadata filter evaluated against the
+        stored chunk metadata, and ``include_ids`` are chunks scored even when
+        it does not match them; term statistics still cover the whole index.
+        """
+        terms = set(tokenize(query_text))
+        if not terms or not self._count:
+            return []
+
+        with self._lock:
+            placeholders = ", ".join("?" * len(terms))
+            doc_freqs = self._conn.execute(
+                f"SELECT term, COUNT(*) FROM bm25_postings WHERE term IN ({placeholders}) GROUP BY term",
+                tuple(terms)
+            ).fetchall()
+            if not doc_freqs:
+                return []
+
+            idfs = [
+                (term, math.log(1 + (self._count - df + 0.5) / (df + 0.5)))
+                for term, df in doc_freqs
+            ]
+            restrict, filter_params = "", []
+            if where:
+                condition, filter_params = where_to_sql(where, "d.metadata")
+                if include_ids:
+                    self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS bm25_include (id TEXT PRIMARY KEY)")
+                    self._conn.execute("DELETE FROM bm25_include")
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO bm25_include (id) VALUES (?)",
+                        ((doc_id,) for doc_id in include_ids)
+                    )
+                    condition = f"({condition}) OR d.id IN (SELECT id FROM bm25_include)"
+                restrict = f"JOIN bm25_docs d ON d.id = p.doc_id WHERE {condition}"
+
+            # Scoring, filtering and top-k selection run inside SQLite rather than per posting in Python
+            values = ", ".join("(?, ?)" for _ in idfs)
+            params = [value for pair in idfs for value in pair]
+            params += [self.k1, self.k1, self.b, self.b, self._total_length / self._count]
+            params += filter_params + [n_results]
+            return self._conn.execute(
+                f"""WITH query_terms (term, idf) AS (VALUES {values})
+                SELECT p.doc_id,
+                       SUM(q.idf * p.tf * (? + 1) / (p.tf + ? * (1 - ? + ? * p.length / ?))) AS score
+                FROM query_terms q JOIN bm25_postings p ON p.term = q.term {restrict}
+                GROUP BY p.doc_id
+                ORDER BY score DESC
+                LIMIT ?""",
+                params
+            ).fetchall()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,14 +1,24 @@
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
+import os
+import copy
+import json
+import time
 import hashlib
 import logging
-import chromadb
-from chromadb.config import Settings as ChromaSettings
-from sentence_transformers import SentenceTransformer
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from langchain.docstore.document import Document
+from .bm25_index import BM25Index, reciprocal_rank_fusion
+from .dedup_index import DedupIndex, DedupResult
+from .embedding_cache import EmbeddingCache
+from .query_cache import TTLCache
+from .resources import get_chroma_client, get_embedder
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+RETRIEVAL_MODES = ("vector", "hybrid", "keyword")
+
 
 class ChromaVectorDB:
     def __init__(
@@ -21,64 +31,580 @@ class ChromaVectorDB:
         self.persist_directory = persist_directory or settings.chroma_persist_directory
         self.embedding_model_name = embedding_model_name or settings.embedding_model
 
-        self.embedding_model = SentenceTransformer(self.embedding_model_name)
+        # Model and client are process-wide, so extra handles do not reload them
+        self.embedding_model = get_embedder(self.embedding_model_name)
+
+        self.embedding_cache = None
+        if settings.embedding_cache_enabled:
+            self.embedding_cache = EmbeddingCache(
+                settings.embedding_cache_path
+                or os.path.join(self.persist_directory, "embedding_cache.sqlite"),
+                max_entries=settings.embedding_cache_max_entries
+            )
+            # Vectors differ across backends/precisions, so they are cached separately
+            self._embedding_cache_key = (
+                f"{self.embedding_model_name}:{self.embedding_model.backend}:"
+                f"{self.embedding_model.precision}"
+            )
 
-        self.client = chromadb.Client(ChromaSettings(
-            persist_directory=self.persist_directory,
-            anonymized_telemetry=False
-        ))
+        self.client = get_chroma_client(self.persist_directory)
 
         self.collection = self.client.get_or_create_collection(
             name=self.collection_name
         )
 
-    def add_documents(self, documents: List[Document]) -> None:
-        """Add documents to the vector database."""
+        # Lexical index kept in step with the collection for hybrid/keyword retrieval
+        self.bm25_index = None
+        if settings.bm25_index_enabled:
+            self.bm25_index = BM25Index(
+                settings.bm25_index_path
+                or os.path.join(self.persist_directory, f"{self.collection_name}_bm25.sqlite")
+            )
+            if self.bm25_index.count == 0 and self.collection.count():
+                logger.warning(
+                    "BM25 index is empty for a populated collection; re-run ingestion with "
+                    "--full-refresh to enable hybrid and keyword retrieval"
+                )
+
+        # Near-duplicate index consulted before embedding, so copies share one vector
+        self.dedup_index = None
+        if settings.dedup_enabled:
+            self.dedup_index = DedupIndex(
+                settings.dedup_index_path
+                or os.path.join(self.persist_directory, f"{self.collection_name}_dedup.sqlite"),
+                threshold=settings.dedup_threshold
+            )
+            if self.dedup_index.count and not self.collection.count():
+                logger.warning("Dedup index is stale for an empty collection; clearing it")
+                self.dedup_index.clear()
+            elif self.dedup_index.count == 0 and self.collection.count():
+                logger.warning(
+                    "Dedup index is empty for a populated collection; new chunks are only "
+                    "deduplicated against each other until ingestion is re-run with --full-refresh"
+                )
+
+        # Bumped on every write so cached query results never outlive the data;
+        # results are cached and served as copies, so callers may modify them
+        self.collection_version = 0
+        self.query_embedding_cache = TTLCache(settings.query_cache_size, settings.query_cache_ttl)
+        self.query_result_cache = TTLCache(settings.query_cache_size, settings.query_cache_ttl)
+
+    def _invalidate_query_cache(self) -> None:
+        """Mark the collection as changed, dropping cached query results."""
+        self.collection_version += 1
+        self.query_result_cache.clear()
+
+    def embed_documents(self, documents: List[Document]) -> np.ndarray:
+        """Compute float32 embeddings for documents, reusing cached vectors."""
         texts = [doc.page_content for doc in documents]
-        metadatas = [doc.metadata for doc in documents]
+        if self.embedding_cache is None:
+            return self.embedding_model.encode(texts)
+
+        hashes = [EmbeddingCache.hash_text(text) for text in texts]
+        cached = self.embedding_cache.get_many(self._embedding_cache_key, hashes)
+
+        embeddings = np.empty((len(texts), self.embedding_model.dimension), dtype=np.float32)
+        missing = []
+        for i, text_hash in enumerate(hashes):
+            if text_hash in cached:
+                embeddings[i] = cached[text_hash]
+            else:
+                missing.append(i)
+
+        if missing:
+            encoded = self.embedding_model.encode([texts[i] for i in missing])
+            embeddings[missing] = encoded
+            self.embedding_cache.put_many(
+                self._embedding_cache_key, [hashes[i] for i in missing], encoded
+            )
+
+        return embeddings
 
-        embeddings = self.embedding_model.encode(texts).tolist()
+    @staticmethod
+    def _document_id(doc: Document) -> str:
+        # Deterministic IDs based on content + source make re-ingestion idempotent
+        return hashlib.sha256(
+            f"{doc.page_content}:{doc.metadata.get('source', '')}".encode()
+        ).hexdigest()[:16]
 
-        # Generate deterministic IDs based on content + metadata to prevent overwrites
-        ids = [
-            hashlib.sha256(
-                f"{doc.page_content}:{doc.metadata.get('source', '')}".encode()
-            ).hexdigest()[:16]
-            for doc in documents
+    def deduplicate_documents(self, documents: List[Document], run: Optional[str] = None) -> DedupResult:
+        """Collapse exact and near-duplicate chunks before they are embedded.
+
+        Each chunk is matched against every chunk already indexed (including
+        ones earlier in ``documents``). Duplicates are dropped and their source
+        is recorded on the chunk they match; ``merged_ids`` lists those chunks
+        so their ``sources`` metadata can be refreshed with
+        ``sync_duplicate_sources`` once they are stored.
+
+        With ``run`` set, the new index rows stay provisional until the chunks
+        are upserted and the run is finished by ``sync_duplicate_sources``, or
+        are dropped by ``discard_duplicates`` if the run fails.
+        """
+        if self.dedup_index is None:
+            return DedupResult(unique=list(documents))
+
+        matches = self.dedup_index.add(
+            [self._document_id(doc) for doc in documents],
+            [doc.page_content for doc in documents],
+            [doc.metadata.get('source', '') for doc in documents],
+            [doc.metadata for doc in documents],
+            run=run
+        )
+
+        result = DedupResult()
+        for doc, match in zip(documents, matches):
+            if match is None:
+                result.unique.append(doc)
+                continue
+            chunk_id, exact = match
+            result.merged_ids.add(chunk_id)
+            if exact:
+                result.exact += 1
+            else:
+                result.near += 1
+            # One fewer vector, stored document and HNSW entry
+            result.bytes_saved += self.embedding_model.dimension * 4 + len(doc.page_content.encode("utf-8"))
+        return result
+
+    def _update_duplicate_sources(self, members: dict) -> None:
+        """Point stored chunks at their canonical copy and list all their sources."""
+        ids = list(members)
+        metadatas = [
+            {**copies[0][1], "sources": json.dumps([source for source, _ in copies])}
+            for copies in members.values()
         ]
+        batch_size = self.client.get_max_batch_size()
+        for start in range(0, len(ids), batch_size):
+            self.collection.update(
+                ids=ids[start:start + batch_size],
+                metadatas=metadatas[start:start + batch_size]
+            )
+        if self.bm25_index is not None:
+            self.bm25_index.set_sources(ids, [copies[0][0] for copies in members.values()], metadatas)
+
+    def sync_duplicate_sources(self, chunk_ids: Iterable[str], run: Optional[str] = None) -> None:
+        """Write the ``sources`` metadata of chunks that had duplicates collapsed into them.
+
+        With ``run`` set, the copies that run collapsed are confirmed first.
+        """
+        if self.dedup_index is None:
+            return
+        if run is not None:
+            self.dedup_index.finish_run(run)
+        members = self.dedup_index.members(list(chunk_ids))
+        if members:
+            self._update_duplicate_sources(members)
+            self._invalidate_query_cache()
 
-        self.collection.add(
+    def discard_duplicates(self, run: str) -> None:
+        """Forget the dedup index rows of a run that failed before finishing."""
+        if self.dedup_index is not None:
+            self.dedup_index.discard_run(run)
+
+    def _write_batch(self, ids: List[str], documents: List[Document], embeddings: np.ndarray) -> None:
+        texts = [doc.page_content for doc in documents]
+        metadatas = [doc.metadata for doc in documents]
+        self.collection.upsert(
             embeddings=embeddings,
             documents=texts,
             metadatas=metadatas,
             ids=ids
         )
+        sources = [metadata.get('source', '') for metadata in metadatas]
+        if self.bm25_index is not None:
+            self.bm25_index.add(ids, texts, sources, metadatas)
+        # Only stored chunks may have later copies collapsed into them
+        if self.dedup_index is not None:
+            self.dedup_index.confirm(ids, sources)
 
-        logger.info(f"Added {len(documents)} documents to vector database")
+    def upsert_documents(
+        self,
+        documents: List[Document],
+        embeddings: Optional[np.ndarray] = None,
+        batch_size: Optional[int] = None
+    ) -> int:
+        """Upsert documents in batches no larger than the client's maximum.
 
-    def query(
+        Chunks with the same ID (same content and source) are written once, and
+        re-ingesting a file overwrites its chunks instead of failing. When no
+        embeddings are given, batch N+1 is embedded while batch N is written.
+        Returns the number of unique chunks written.
+        """
+        unique = {}
+        for i, doc in enumerate(documents):
+            unique.setdefault(self._document_id(doc), i)
+        if len(unique) < len(documents):
+            logger.info(f"Skipping {len(documents) - len(unique)} duplicate chunks")
+
+        ids = list(unique)
+        positions = list(unique.values())
+        documents = [documents[i] for i in positions]
+        if embeddings is not None:
+            embeddings = np.asarray(embeddings, dtype=np.float32)[positions]
+
+        batch_size = min(batch_size or settings.upsert_batch_size, self.client.get_max_batch_size())
+        batches = [
+            (ids[start:start + batch_size], documents[start:start + batch_size], start)
+            for start in range(0, len(ids), batch_size)
+        ]
+
+        def embed(batch_documents: List[Document], start: int) -> np.ndarray:
+            if embeddings is not None:
+                return embeddings[start:start + len(batch_documents)]
+            return self.embed_documents(batch_documents)
+
+        def write(
+            number: int,
+            batch_ids: List[str],
+            batch_documents: List[Document],
+            batch_embeddings: np.ndarray,
+            embed_seconds: float
+        ) -> None:
+            start_time = time.perf_counter()
+            self._write_batch(batch_ids, batch_documents, batch_embeddings)
+            logger.info(
+                f"Upserted batch {number}/{len(batches)}: {len(batch_ids)} chunks "
+                f"(embed {embed_seconds:.2f}s, write {time.perf_counter() - start_time:.2f}s)"
+            )
+
+        try:
+            # One writer thread: the next batch is embedded while the previous one is written
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="chroma-upsert") as writer:
+                pending = None
+                for number, (batch_ids, batch_documents, start) in enumerate(batches, 1):
+                    start_time = time.perf_counter()
+                    batch_embeddings = embed(batch_documents, start)
+                    embed_seconds = time.perf_counter() - start_time
+
+                    if pending is not None:
+                        pending.result()
+                    pending = writer.submit(
+                        write, number, batch_ids, batch_documents, batch_embeddings, embed_seconds
+                    )
+                if pending is not None:
+                    pending.result()
+        finally:
+            self._invalidate_query_cache()
+
+        logger.info(f"Upserted {len(ids)} documents to vector database")
+        return len(ids)
+
+    def add_documents(
+        self,
+        documents: List[Document],
+        embeddings: Optional[np.ndarray] = None
+    ) -> None:
+        """Add documents to the vector database, embedding them unless precomputed."""
+        self.upsert_documents(documents, embeddings)
+
+    def _resolve_mode(self, mode: Optional[str]) -> str:
+        """Validate a retrieval mode, falling back to vector search without a BM25 index."""
+        mode = (mode or settings.retrieval_mode).lower()
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unsupported retrieval mode: {mode}")
+        if mode != "vector" and self.bm25_index is None:
+            logger.warning(f"BM25 index is disabled; using vector retrieval instead of {mode}")
+            return "vector"
+        return mode
+
+    @staticmethod
+    def _where_key(where: Optional[dict]) -> Optional[str]:
+        return json.dumps(where, sort_keys=True) if where else None
+
+    def _vector_candidates(self, mode: str, n_results: int) -> int:
+        # Hybrid fusion needs a deeper vector ranking than the final result count
+        if mode == "hybrid":
+            return n_results * settings.hybrid_candidate_multiplier
+        return n_results
+
+    def _results_for_ids(
+        self,
+        ranked: List[tuple],
+        vector_results: Optional[dict] = None
+    ) -> dict:
+        """Build a Chroma-style single-query result for ranked ``(id, score)`` pairs.
+
+        Documents already returned by the vector search are reused; the rest
+        are fetched from the collection in one call.
+        """
+        known = {}
+        if vector_results is not None:
+            for doc_id, document, metadata, distance in zip(
+                vector_results['ids'][0],
+                vector_results['documents'][0],
+                vector_results['metadatas'][0],
+                vector_results['distances'][0]
+            ):
+                known[doc_id] = (document, metadata, distance)
+
+        missing = [doc_id for doc_id, _ in ranked if doc_id not in known]
+        if missing:
+            fetched = self.collection.get(ids=missing, include=["documents", "metadatas"])
+            for doc_id, document, metadata in zip(fetched['ids'], fetched['documents'], fetched['metadatas']):
+                known[doc_id] = (document, metadata, None)
+
+        # Chunks deleted from the collection but still indexed are dropped
+        ranked = [(doc_id, score) for doc_id, score in ranked if doc_id in known]
+        return {
+            "ids": [[doc_id for doc_id, _ in ranked]],
+            "documents": [[known[doc_id][0] for doc_id, _ in ranked]],
+            "metadatas": [[known[doc_id][1] for doc_id, _ in ranked]],
+            "distances": [[known[doc_id][2] for doc_id, _ in ranked]],
+            "scores": [[score for _, score in ranked]]
+        }
+
+    def _filtered_copies(self, where: Optional[dict]) -> Dict[str, dict]:
+        """Chunks matching ``where`` only through a collapsed copy, with that copy's metadata."""
+        if not where or self.dedup_index is None:
+            return {}
+        return self.dedup_index.copies_matching(where)
+
+    def _distances(self, query_embeddings: np.ndarray, embeddings: np.ndarray) -> np.ndarray:
+        """Distances in the collection's space, as Chroma reports them."""
+        space = (self.collection.metadata or {}).get("hnsw:space", "l2")
+        if space == "cosine":
+            query_embeddings = query_embeddings / np.linalg.norm(query_embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+        if space in ("cosine", "ip"):
+            return 1.0 - query_embeddings @ embeddings.T
+        return (
+            (query_embeddings ** 2).sum(axis=1)[:, np.newaxis]
+            - 2.0 * query_embeddings @ embeddings.T
+            + (embeddings ** 2).sum(axis=1)[np.newaxis]
+        )
+
+    def _rank_copies(
+        self,
+        query_embeddings: np.ndarray,
+        results: List[dict],
+        copies: Dict[str, dict],
+        n_results: int
+    ) -> None:
+        """Rank chunks matching only through a collapsed copy into filtered vector results.
+
+        Chroma filters on the stored (canonical) metadata, so these chunks are
+        scored here against each query and merged in by distance.
+        """
+        stored = self.collection.get(ids=list(copies), include=["embeddings", "documents", "metadatas"])
+        if not stored['ids']:
+            return
+        distances = self._distances(
+            np.asarray(query_embeddings, dtype=np.float32),
+            np.asarray(stored['embeddings'], dtype=np.float32)
+        )
+        for result, row in zip(results, distances):
+            found = set(result['ids'][0])
+            candidates = list(zip(
+                result['ids'][0], result['documents'][0], result['metadatas'][0], result['distances'][0]
+            ))
+            candidates += [
+                (doc_id, document, metadata, float(distance))
+                for doc_id, document, metadata, distance in zip(
+                    stored['ids'], stored['documents'], stored['metadatas'], row
+                )
+                if doc_id not in found
+            ]
+            candidates = sorted(candidates, key=lambda candidate: candidate[3])[:n_results]
+            for key, position in (("ids", 0), ("documents", 1), ("metadatas", 2), ("distances", 3)):
+                result[key] = [[candidate[position] for candidate in candidates]]
+
+    @staticmethod
+    def _with_copy_metadata(results: dict, copies: Dict[str, dict]) -> dict:
+        """Show chunks found through a collapsed copy with the metadata of that copy."""
+        if not copies:
+            return results
+        metadatas = []
+        for doc_id, metadata in zip(results['ids'][0], results['metadatas'][0]):
+            if doc_id in copies:
+                copy = dict(copies[doc_id])
+                if "sources" in metadata:
+                    copy["sources"] = metadata["sources"]
+                metadata = copy
+            metadatas.append(metadata)
+        return {**results, "metadatas": [metadatas]}
+
+    def _keyword_query(
         self,
         query_text: str,
-        n_results: int = 5
+        n_results: int,
+        where: Optional[dict] = None,
+        copies: Optional[Dict[str, dict]] = None
     ) -> dict:
-        """Query the vector database."""
-        query_embedding = self.embedding_model.encode([query_text]).tolist()
+        return self._results_for_ids(self.bm25_index.search(query_text, n_results, where, copies))
 
-        results = self.collection.query(
-            query_embeddings=query_embedding,
-            n_results=n_results
+    def _fuse(
+        self,
+        query_text: str,
+        vector_results: dict,
+        n_results: int,
+        where: Optional[dict] = None,
+        copies: Optional[Dict[str, dict]] = None
+    ) -> dict:
+        """Fuse vector and BM25 rankings with reciprocal rank fusion."""
+        keyword_ranked = self.bm25_index.search(
+            query_text, n_results * settings.hybrid_candidate_multiplier, where, copies
+        )
+        fused = reciprocal_rank_fusion(
+            [vector_results['ids'][0], [doc_id for doc_id, _ in keyword_ranked]],
+            k=settings.rrf_k
         )
+        return self._results_for_ids(fused[:n_results], vector_results)
+
+    def query(
+        self,
+        query_text: str,
+        n_results: int = 5,
+        mode: Optional[str] = None,
+        where: Optional[dict] = None
+    ) -> dict:
+        """Query the database, serving repeat queries from cache.
+
+        ``mode`` is ``vector`` (dense similarity), ``keyword`` (BM25) or
+        ``hybrid`` (both, fused with reciprocal rank fusion); it defaults to
+        ``RETRIEVAL_MODE``. ``where`` is a Chroma metadata filter (see
+        ``build_where``) applied inside the search, so only matching chunks
+        are ranked; a chunk collapsed from several sources matches when any of
+        its copies does, and is returned with that copy's metadata.
+        """
+        mode = self._resolve_mode(mode)
+        cache_key = (query_text, n_results, mode, self._where_key(where), self.collection_version)
+        results = self.query_result_cache.get(cache_key)
+        if results is not None:
+            return copy.deepcopy(results)
+
+        copies = self._filtered_copies(where)
+        if mode == "keyword":
+            results = self._keyword_query(query_text, n_results, where, copies)
+        else:
+            query_embeddings = self.embed_query(query_text)[np.newaxis]
+            results = self.collection.query(
+                query_embeddings=query_embeddings,
+                n_results=self._vector_candidates(mode, n_results),
+                where=where
+            )
+            if copies:
+                self._rank_copies(query_embeddings, [results], copies, self._vector_candidates(mode, n_results))
+            if mode == "hybrid":
+                results = self._fuse(query_text, results, n_results, where, copies)
+        results = self._with_copy_metadata(results, copies)
+
+        self.query_result_cache.set(cache_key, copy.deepcopy(results))
+        return results
+
+    def query_batch(
+        self,
+        query_texts: List[str],
+        n_results: int = 5,
+        mode: Optional[str] = None,
+        where: Optional[dict] = None
+    ) -> List[dict]:
+        """Query the database for many queries with one encode and one vector search call."""
+        mode = self._resolve_mode(mode)
+        version = self.collection_version
+        where_key = self._where_key(where)
+        results = [
+            copy.deepcopy(self.query_result_cache.get((query_text, n_results, mode, where_key, version)))
+            for query_text in query_texts
+        ]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if not missing:
+            return results
+
+        copies = self._filtered_copies(where)
+        split = []
+        if mode != "keyword":
+            query_embeddings = self.embed_queries([query_texts[i] for i in missing])
+            batch = self.collection.query(
+                query_embeddings=query_embeddings,
+                n_results=self._vector_candidates(mode, n_results),
+                where=where
+            )
+            # Split the batched response into one single-query result per text
+            split = [
+                {key: value if key == "included" or value is None else [value[j]] for key, value in batch.items()}
+                for j in range(len(missing))
+            ]
+            if copies:
+                self._rank_copies(query_embeddings, split, copies, self._vector_candidates(mode, n_results))
+
+        for j, i in enumerate(missing):
+            if mode == "keyword":
+                result = self._keyword_query(query_texts[i], n_results, where, copies)
+            else:
+                result = split[j]
+                if mode == "hybrid":
+                    result = self._fuse(query_texts[i], result, n_results, where, copies)
+            result = self._with_copy_metadata(result, copies)
+            self.query_result_cache.set((query_texts[i], n_results, mode, where_key, version), copy.deepcopy(result))
+            results[i] = result
 
         return results
 
+    def embed_query(self, query_text: str) -> np.ndarray:
+        """Embed a single query, reusing the cached vector for repeat queries."""
+        return self.embed_queries([query_text])[0]
+
+    def embed_queries(self, query_texts: List[str]) -> np.ndarray:
+        """Embed queries in one encode call, reusing cached vectors for repeat queries."""
+        embeddings = np.empty((len(query_texts), self.embedding_model.dimension), dtype=np.float32)
+        missing = []
+        for i, query_text in enumerate(query_texts):
+            cached = self.query_embedding_cache.get(query_text)
+            if cached is None:
+                missing.append(i)
+            else:
+                embeddings[i] = cached
+
+        if missing:
+            encoded = self.embedding_model.encode([query_texts[i] for i in missing])
+            for j, i in enumerate(missing):
+                embeddings[i] = encoded[j]
+                self.query_embedding_cache.set(query_texts[i], encoded[j])
+
+        return embeddings
+
+    def get_cache_stats(self) -> dict:
+        """Get hit/miss counters for the query caches."""
+        stats = {
+            "query_embeddings": self.query_embedding_cache.stats(),
+            "query_results": self.query_result_cache.stats()
+        }
+        if self.embedding_cache is not None:
+            stats["document_embeddings"] = self.embedding_cache.stats()
+        return stats
+
+    def delete_documents_by_source(self, source: str) -> None:
+        """Delete all chunks whose ``source`` metadata matches.
+
+        Chunks that duplicates from other sources were collapsed into are kept
+        and re-pointed at the next remaining copy instead.
+        """
+        if self.dedup_index is not None:
+            remaining = self.dedup_index.remove_source(source)
+            if remaining:
+                self._update_duplicate_sources(remaining)
+        self.collection.delete(where={"source": source})
+        if self.bm25_index is not None:
+            self.bm25_index.delete_source(source)
+        self._invalidate_query_cache()
+        logger.info(f"Deleted chunks for source: {source}")
+
     def delete_collection(self) -> None:
         """Delete the collection."""
         self.client.delete_collection(self.collection_name)
+        if self.bm25_index is not None:
+            self.bm25_index.clear()
+        if self.dedup_index is not None:
+            self.dedup_index.clear()
+        self._invalidate_query_cache()
         logger.info(f"Deleted collection: {self.collection_name}")
 
     def get_collection_stats(self) -> dict:
         """Get statistics about the collection."""
-        return {
+        stats = {
             "name": self.collection_name,
             "count": self.collection.count()
         }
+        if self.dedup_index is not None:
+            stats["duplicates_collapsed"] = self.dedup_index.stats()["collapsed"]
+        return stats
@@ -0,0 +1,417 @@
+import os
+import re
+import json
+import zlib
+import sqlite3
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+import numpy as np
+
+from src.vectordb.filters import where_to_sql
+
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r"\w+")
+
+# Chunks are compared as sets of overlapping word n-grams
+SHINGLE_WORDS = 3
+
+# MinHash signature length, split into LSH bands; two chunks become candidates
+# when all rows of any band agree, which for 16 bands of 8 rows happens with
+# ~99% probability at Jaccard similarity 0.85 and ~10% at 0.5
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# Signatures are persisted, so the hash parameters must never change; the
+# legacy RandomState stream is frozen across numpy versions
+_rng = np.random.RandomState(20240611)
+_PERM_A = _rng.randint(0, 2**63, NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_PERM_B = _rng.randint(0, 2**63, NUM_PERM, dtype=np.uint64)
+_SHINGLE_MULT = _rng.randint(0, 2**63, SHINGLE_WORDS, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_BAND_MULT = _rng.randint(0, 2**63, ROWS, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_BAND_SALT = _rng.randint(0, 2**63, BANDS, dtype=np.uint64)
+
+# Shingle rows hashed per numpy pass, bounding the (rows x NUM_PERM) matrix
+_SIGNATURE_BLOCK = 16384
+
+
+def text_hash(text: str) -> str:
+    """Hash of a chunk's text with whitespace collapsed, for exact-duplicate lookup."""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+def _shingle_hashes(text: str, word_cache: Dict[str, int]) -> np.ndarray:
+    """64-bit hashes of a text's lowercase word n-grams (one n-gram for short texts)."""
+    words = WORD_PATTERN.findall(text.lower())
+    if not words:
+        return np.zeros(0, dtype=np.uint64)
+
+    # Vocabulary is small next to word count, so each distinct word is hashed once
+    for word in set(words).difference(word_cache):
+        word_cache[word] = zlib.crc32(word.encode("utf-8"))
+    word_hashes = np.array([word_cache[word] for word in words], dtype=np.uint64)
+    n = max(len(words) - SHINGLE_WORDS + 1, 1)
+    shingles = np.zeros(n, dtype=np.uint64)
+    for offset in range(min(SHINGLE_WORDS, len(words))):
+        shingles += word_hashes[offset:offset + n] * _SHINGLE_MULT[offset]
+    return shingles
+
+
+def minhash_signatures(texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (signatures, has_words) for texts.
+
+    Each signature holds the minimum of ``NUM_PERM`` multiply-shift hashes
+    over the text's shingles, so the fraction of equal positions in two
+    signatures estimates the Jaccard similarity of their shingle sets.
+    Texts without words get an all-zero signature and ``has_words`` False.
+    """
+    word_cache: Dict[str, int] = {}
+    shingles = [_shingle_hashes(text, word_cache) for text in texts]
+    signatures = np.zeros((len(texts), NUM_PERM), dtype=np.uint32)
+    has_words = np.array([len(s) > 0 for s in shingles], dtype=bool)
+
+    # Hash shingles of consecutive texts together, then reduce each text's rows
+    i = 0
+    while i < len(texts):
+        j, rows = i, 0
+        while j < len(texts) and (j == i or rows + len(shingles[j]) <= _SIGNATURE_BLOCK):
+            rows += len(shingles[j])
+            j += 1
+        block = [k for k in range(i, j) if has_words[k]]
+        if block:
+            values = np.concatenate([shingles[k] for k in block])
+            hashed = ((values[:, np.newaxis] * _PERM_A + _PERM_B) >> np.uint64(32)).astype(np.uint32)
+            offsets = np.cumsum([0] + [len(shingles[k]) for k in block[:-1]])
+            signatures[block] = np.minimum.reduceat(hashed, offsets, axis=0)
+        i = j
+    return signatures, has_words
+
+
+def band_keys(signatures: np.ndarray) -> np.ndarray:
+    """LSH bucket keys, shape (n, BANDS), as signed 64-bit integers for SQLite."""
+    bands = signatures.reshape(len(signatures), BANDS, ROWS).astype(np.uint64)
+    keys = (bands * _BAND_MULT).sum(axis=2, dtype=np.uint64) + _BAND_SALT
+    return keys.view(np.int64)
+
+
+@dataclass
+class DedupResult:
+    """Outcome of deduplicating a batch of chunks before embedding."""
+
+    unique: list = field(default_factory=list)
+    merged_ids: Set[str] = field(default_factory=set)
+    exact: int = 0
+    near: int = 0
+    bytes_saved: int = 0
+
+    @property
+    def duplicates(self) -> int:
+        return self.exact + self.near
+
+
+class DedupIndex:
+    """Persistent near-duplicate index over chunks, backed by SQLite.
+
+    Each indexed chunk keeps its MinHash signature, LSH band keys and the
+    list of sources (with their chunk metadata) whose copies were collapsed
+    into it, in the order they were seen; the first is the canonical copy
+    stored in the vector database. Chunks are keyed by the same IDs as the
+    Chroma collection.
+
+    Rows added for an ingestion ``run`` are provisional: other runs ignore
+    them, a chunk's row is confirmed once the chunk is stored (``confirm``)
+    and the run's remaining copies when it finishes (``finish_run``). Rows
+    of a failed run are dropped with ``discard_run``, and rows left behind
+    by a process that died mid-run are dropped when the index is opened, so
+    a chunk never collapses into one that was never stored.
+    """
+
+    def __init__(self, path: str, threshold: float = 0.85):
+        self.path = path
+        self.threshold = threshold
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS dedup_chunks (
+                id TEXT PRIMARY KEY,
+                text_hash TEXT NOT NULL,
+                signature BLOB,
+                run TEXT
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS dedup_bands (
+                band_key INTEGER NOT NULL,
+                chunk_id TEXT NOT NULL,
+                PRIMARY KEY (band_key, chunk_id)
+            ) WITHOUT ROWID"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS dedup_members (
+                chunk_id TEXT NOT NULL,
+                source TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                run TEXT,
+                UNIQUE (chunk_id, source)
+            )"""
+        )
+        # Indexes created before runs were tracked lack the column
+        for table in ("dedup_chunks", "dedup_members"):
+            columns = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            if "run" not in columns:
+                self._conn.execute(f"ALTER TABLE {table} ADD COLUMN run TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_dedup_chunks_hash ON dedup_chunks (text_hash)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_dedup_bands_chunk ON dedup_bands (chunk_id)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_dedup_members_source ON dedup_members (source)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_dedup_chunks_run ON dedup_chunks (run)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_dedup_members_run ON dedup_members (run)")
+        # No run is in progress yet, so provisional rows belong to a run that died
+        self._discard("run IS NOT NULL", ())
+        self._conn.commit()
+
+        self._count = self._conn.execute("SELECT COUNT(*) FROM dedup_chunks").fetchone()[0]
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def _find_near_duplicate(self, signature: np.ndarray, keys: np.ndarray, run: Optional[str]) -> Optional[str]:
+        """Return the indexed chunk most similar to ``signature`` above the threshold."""
+        placeholders = ", ".join("?" * len(keys))
+        rows = self._conn.execute(
+            f"""SELECT c.id, c.signature FROM dedup_chunks c
+            WHERE c.signature IS NOT NULL AND (c.run IS NULL OR c.run = ?) AND c.id IN
+                (SELECT chunk_id FROM dedup_bands WHERE band_key IN ({placeholders}))""",
+            [run] + [int(key) for key in keys]
+        ).fetchall()
+        if not rows:
+            return None
+
+        candidates = np.frombuffer(b"".join(blob for _, blob in rows), dtype=np.uint32).reshape(len(rows), NUM_PERM)
+        similarity = (candidates == signature).mean(axis=1)
+        best = int(np.argmax(similarity))
+        return rows[best][0] if similarity[best] >= self.threshold else None
+
+    def add(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        sources: Sequence[str],
+        metadatas: Sequence[dict],
+        run: Optional[str] = None
+    ) -> List[Optional[Tuple[str, bool]]]:
+        """Index chunks, collapsing duplicates of chunks already indexed.
+
+        Returns, per chunk, None when it was indexed as a new chunk, or
+        ``(chunk_id, exact)`` for the indexed chunk it duplicates, in which
+        case its source is appended to that chunk's sources instead. Chunks
+        earlier in the same call or run count as indexed; a chunk matching
+        its own ID (stored by an earlier, interrupted run) counts as new.
+        With ``run`` set, the rows are provisional until confirmed.
+        """
+        digests = [text_hash(text) for text in texts]
+        matches: List[Optional[Tuple[str, bool]]] = [None] * len(ids)
+
+        with self._lock:
+            # Exact copies are resolved by hash, so only the rest need signatures
+            indexed = {}
+            unique_digests = list(dict.fromkeys(digests))
+            for i in range(0, len(unique_digests), 500):
+                batch = unique_digests[i:i + 500]
+                placeholders = ", ".join("?" * len(batch))
+                indexed.update(self._conn.execute(
+                    f"SELECT text_hash, id FROM dedup_chunks "
+                    f"WHERE (run IS NULL OR run = ?) AND text_hash IN ({placeholders})",
+                    (run, *batch)
+                ).fetchall())
+
+            first_index = {}
+            candidates = []
+            for i, digest in enumerate(digests):
+                if digest in first_index:
+                    continue
+                first_index[digest] = i
+                if digest not in indexed:
+                    candidates.append(i)
+                elif indexed[digest] != ids[i]:
+                    matches[i] = (indexed[digest], True)
+
+            signatures, has_words = minhash_signatures([texts[i] for i in candidates])
+            keys = band_keys(signatures)
+            for j, i in enumerate(candidates):
+                near = self._find_near_duplicate(signatures[j], keys[j], run) if has_words[j] else None
+                if near is not None:
+                    matches[i] = (near, False)
+                    continue
+
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO dedup_chunks (id, text_hash, signature, run) VALUES (?, ?, ?, ?)",
+                    (ids[i], digests[i], signatures[j].tobytes() if has_words[j] else None, run)
+                )
+                if cursor.rowcount:
+                    self._count += 1
+                    if has_words[j]:
+                        self._conn.executemany(
+                            "INSERT OR IGNORE INTO dedup_bands (band_key, chunk_id) VALUES (?, ?)",
+                            [(int(key), ids[i]) for key in keys[j]]
+                        )
+
+            # Later exact copies within the batch follow their first copy's outcome
+            for i, digest in enumerate(digests):
+                first = first_index.get(digest, i)
+                if first != i:
+                    matches[i] = (matches[first][0] if matches[first] else ids[first], True)
+
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO dedup_members (chunk_id, source, metadata, run) VALUES (?, ?, ?, ?)",
+                [
+                    (match[0] if match else chunk_id, source, json.dumps(metadata), run)
+                    for chunk_id, source, metadata, match in zip(ids, sources, metadatas, matches)
+                ]
+            )
+            self._conn.commit()
+
+        return matches
+
+    def confirm(self, ids: Sequence[str], sources: Sequence[str]) -> None:
+        """Confirm chunks (and their copy from ``sources``) once they are stored."""
+        with self._lock:
+            self._conn.executemany("UPDATE dedup_chunks SET run = NULL WHERE id = ?", [(i,) for i in ids])
+            self._conn.executemany(
+                "UPDATE dedup_members SET run = NULL WHERE chunk_id = ? AND source = ?", list(zip(ids, sources))
+            )
+            self._conn.commit()
+
+    def _discard(self, condition: str, params: tuple) -> int:
+        """Delete provisional rows matching ``condition`` on their ``run`` column.
+
+        Returns how many chunks were deleted.
+        """
+        self._conn.execute(
+            f"DELETE FROM dedup_bands WHERE chunk_id IN (SELECT id FROM dedup_chunks WHERE {condition})", params
+        )
+        cursor = self._conn.execute(f"DELETE FROM dedup_chunks WHERE {condition}", params)
+        self._conn.execute(f"DELETE FROM dedup_members WHERE {condition}", params)
+        return cursor.rowcount
+
+    def finish_run(self, run: str) -> None:
+        """Confirm the copies a successful run collapsed into stored chunks.
+
+        Any chunk of the run that was never confirmed was never stored, so it
+        is dropped rather than left for later chunks to collapse into.
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE dedup_members SET run = NULL WHERE run = ? AND chunk_id IN "
+                "(SELECT id FROM dedup_chunks WHERE run IS NULL)",
+                (run,)
+            )
+            self._count -= self._discard("run = ?", (run,))
+            self._conn.commit()
+
+    def discard_run(self, run: str) -> None:
+        """Drop every row a failed run added."""
+        with self._lock:
+            self._count -= self._discard("run = ?", (run,))
+            self._conn.commit()
+
+    def _members(self, chunk_ids: Sequence[str]) -> Dict[str, List[Tuple[str, dict]]]:
+        members: Dict[str, List[Tuple[str, dict]]] = {}
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(chunk_ids), 500):
+            batch = chunk_ids[i:i + 500]
+            placeholders = ", ".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT chunk_id, source, metadata FROM dedup_members "
+                f"WHERE chunk_id IN ({placeholders}) ORDER BY rowid",
+                tuple(batch)
+            ).fetchall()
+            for chunk_id, source, metadata in rows:
+                members.setdefault(chunk_id, []).append((source, json.loads(metadata)))
+        return members
+
+    def members(self, chunk_ids: Sequence[str]) -> Dict[str, List[Tuple[str, dict]]]:
+        """Return each chunk's ``(source, metadata)`` copies, canonical copy first."""
+        with self._lock:
+            return self._members(list(chunk_ids))
+
+    def copies_matching(self, where: dict) -> Dict[str, dict]:
+        """Return collapsed copies matching ``where`` whose stored chunk does not.
+
+        The stored chunk carries its canonical copy's metadata, so a filter on
+        a field that differs between copies (``filename``, ``folder``, ...)
+        only finds the others here. Maps each such chunk ID to the metadata of
+        its first matching copy.
+        """
+        copy_condition, copy_params = where_to_sql(where, "m.metadata")
+        canonical_condition, canonical_params = where_to_sql(where, "f.metadata")
+        with self._lock:
+            rows = self._conn.execute(
+                f"""SELECT m.chunk_id, m.metadata FROM dedup_members m
+                JOIN dedup_members f ON f.rowid =
+                    (SELECT MIN(rowid) FROM dedup_members WHERE chunk_id = m.chunk_id)
+                WHERE m.run IS NULL AND m.rowid != f.rowid AND ({copy_condition})
+                    AND NOT COALESCE(({canonical_condition}), 0)
+                ORDER BY m.rowid""",
+                copy_params + canonical_params
+            ).fetchall()
+        copies: Dict[str, dict] = {}
+        for chunk_id, metadata in rows:
+            copies.setdefault(chunk_id, json.loads(metadata))
+        return copies
+
+    def remove_source(self, source: str) -> Dict[str, List[Tuple[str, dict]]]:
+        """Drop ``source`` from every chunk it holds.
+
+        Chunks left without sources are removed from the index. Returns the
+        remaining copies of chunks other sources still hold, so the caller can
+        re-point the stored chunk at its new canonical copy.
+        """
+        with self._lock:
+            chunk_ids = [
+                row[0] for row in self._conn.execute(
+                    "SELECT chunk_id FROM dedup_members WHERE source = ?", (source,)
+                )
+            ]
+            self._conn.execute("DELETE FROM dedup_members WHERE source = ?", (source,))
+            remaining = self._members(chunk_ids)
+
+            orphans = [(chunk_id,) for chunk_id in chunk_ids if chunk_id not in remaining]
+            self._conn.executemany("DELETE FROM dedup_bands WHERE chunk_id = ?", orphans)
+            cursor = self._conn.executemany("DELETE FROM dedup_chunks WHERE id = ?", orphans)
+            self._count -= cursor.rowcount
+            self._conn.commit()
+        return remaining
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM dedup_members")
+            self._conn.execute("DELETE FROM dedup_bands")
+            self._conn.execute("DELETE FROM dedup_chunks")
+            self._conn.commit()
+            self._count = 0
+
+    def stats(self) -> dict:
+        """Return how many chunks are indexed and how many extra copies were collapsed into them."""
+        with self._lock:
+            copies = self._conn.execute("SELECT COUNT(*) FROM dedup_members").fetchone()[0]
+        return {
+            "chunks": self._count,
+            "copies": copies,
+            "collapsed": max(copies - self._count, 0)
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
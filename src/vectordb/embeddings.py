@@ -0,0 +1,120 @@
+import time
+import logging
+from typing import TYPE_CHECKING, Sequence
+import numpy as np
+from config import settings
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+# Portable (AVX2) dynamically quantized export shipped with most sentence-transformers models
+DEFAULT_ONNX_INT8_FILE = "onnx/model_quint8_avx2.onnx"
+
+
+class SentenceEmbedder:
+    """Batched sentence-transformer encoder producing contiguous float32 arrays.
+
+    Texts are sorted by length before batching so each batch pads to similar
+    lengths, then scattered back to input order. ``backend`` selects the torch
+    or ONNX runtime; ``precision`` may be ``float32``, ``float16`` (GPU) or
+    ``int8`` (dynamically quantized, CPU).
+    """
+
+    def __init__(
+        self,
+        model_name: str = None,
+        batch_size: int = None,
+        device: str = None,
+        backend: str = None,
+        precision: str = None
+    ):
+        self.model_name = model_name or settings.embedding_model
+        self.batch_size = batch_size or settings.embedding_batch_size
+        self.device = device or settings.embedding_device or None
+        self.backend = (backend or settings.embedding_backend).lower()
+        self.precision = (precision or settings.embedding_precision).lower()
+
+        self.model = self._load_model()
+        self.dimension = self.model.get_sentence_embedding_dimension()
+
+        self.texts_encoded = 0
+        self.seconds_encoding = 0.0
+
+    def _load_model(self) -> "SentenceTransformer":
+        """Load the model with the configured backend, device and precision."""
+        # Deferred so torch is only imported when a model is actually built
+        from sentence_transformers import SentenceTransformer
+
+        if self.backend == "onnx":
+            try:
+                import onnxruntime  # noqa: F401
+                import optimum.onnxruntime  # noqa: F401
+            except ImportError as e:
+                raise ImportError(
+                    f"EMBEDDING_BACKEND=onnx needs ONNX Runtime ({e}); "
+                    "install it with: pip install 'optimum[onnxruntime]'"
+                ) from e
+
+            model_kwargs = {}
+            onnx_file = settings.embedding_onnx_file
+            if not onnx_file and self.precision == "int8":
+                onnx_file = DEFAULT_ONNX_INT8_FILE
+            if onnx_file:
+                model_kwargs["file_name"] = onnx_file
+
+            return SentenceTransformer(
+                self.model_name,
+                device=self.device,
+                backend="onnx",
+                model_kwargs=model_kwargs or None
+            )
+
+        model = SentenceTransformer(self.model_name, device=self.device)
+
+        if self.precision == "float16":
+            if model.device.type == "cpu":
+                logger.warning("float16 embeddings need a GPU; keeping float32 on CPU")
+            else:
+                model.half()
+        elif self.precision == "int8":
+            if model.device.type != "cpu":
+                logger.warning("int8 dynamic quantization is CPU-only; keeping full precision")
+            else:
+                import torch
+                model = torch.quantization.quantize_dynamic(
+                    model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+
+        return model
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """Encode texts into an (n, dimension) float32 array in input order."""
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+        if not texts:
+            return embeddings
+
+        start = time.perf_counter()
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+
+        for i in range(0, len(texts), self.batch_size):
+            batch_idx = order[i:i + self.batch_size]
+            embeddings[batch_idx] = self.model.encode(
+                [texts[j] for j in batch_idx],
+                batch_size=self.batch_size,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+
+        elapsed = time.perf_counter() - start
+        self.texts_encoded += len(texts)
+        self.seconds_encoding += elapsed
+        logger.debug(f"Encoded {len(texts)} texts in {elapsed:.2f}s ({len(texts) / max(elapsed, 1e-9):.1f}/s)")
+
+        return embeddings
+
+    @property
+    def throughput(self) -> float:
+        """Average texts encoded per second since creation."""
+        return self.texts_encoded / self.seconds_encoding if self.seconds_encoding else 0.0
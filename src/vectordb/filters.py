@@ -0,0 +1,87 @@
+from typing import List, Optional, Tuple
+
+# Metadata key holding a storage key's enclosing folder at a given depth
+FOLDER_LEVEL_KEY = "folder_{depth}"
+
+
+def folder_levels(key: str) -> dict:
+    """Metadata naming each folder enclosing a storage key, one field per depth.
+
+    ``reports/2024/q3.pdf`` gets ``folder_1="reports"`` and
+    ``folder_2="reports/2024"``, so a folder prefix filter is one equality
+    on the field for its depth.
+    """
+    parts = key.split("/")[:-1]
+    return {
+        FOLDER_LEVEL_KEY.format(depth=depth): "/".join(parts[:depth])
+        for depth in range(1, len(parts) + 1)
+    }
+
+
+def prefix_conditions(prefix: Optional[str]) -> dict:
+    """``build_where`` conditions matching keys anywhere under the folder ``prefix``."""
+    prefix = (prefix or "").strip("/")
+    if not prefix:
+        return {}
+    return {FOLDER_LEVEL_KEY.format(depth=prefix.count("/") + 1): prefix}
+
+
+def build_where(**conditions) -> Optional[dict]:
+    """Build a Chroma ``where`` filter from metadata equality conditions.
+
+    ``None`` values are skipped, lists match any of their values (``$in``)
+    and several conditions are combined with ``$and``.
+    """
+    clauses = []
+    for key, value in conditions.items():
+        if value is None or (isinstance(value, (list, tuple, set)) and not value):
+            continue
+        if isinstance(value, (list, tuple, set)):
+            clauses.append({key: {"$in": list(value)}})
+        else:
+            clauses.append({key: value})
+
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+_COMPARISONS = {"$eq": "=", "$ne": "!=", "$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+
+
+def where_to_sql(where: dict, column: str) -> Tuple[str, List]:
+    """Translate a Chroma ``where`` filter into a SQL condition on a JSON metadata column.
+
+    Supports Chroma's metadata operators: ``$and`` and ``$or`` over clauses,
+    and ``$eq``, ``$ne``, ``$gt``, ``$gte``, ``$lt``, ``$lte``, ``$in`` and
+    ``$nin`` on a field (a bare value means ``$eq``). Returns the SQL and
+    its parameters.
+    """
+    clauses, params = [], []
+    for key, value in where.items():
+        if key in ("$and", "$or"):
+            parts = [where_to_sql(clause, column) for clause in value]
+            if not parts:
+                clauses.append("1" if key == "$and" else "0")
+                continue
+            joiner = " AND " if key == "$and" else " OR "
+            clauses.append("(" + joiner.join(f"({sql})" for sql, _ in parts) + ")")
+            params.extend(param for _, part_params in parts for param in part_params)
+            continue
+
+        path = f'$."{key}"'
+        for operator, operand in (value.items() if isinstance(value, dict) else [("$eq", value)]):
+            if operator in _COMPARISONS:
+                clauses.append(f"json_extract({column}, ?) {_COMPARISONS[operator]} ?")
+                params.extend((path, operand))
+            elif operator in ("$in", "$nin"):
+                placeholders = ", ".join("?" * len(operand))
+                negate = "NOT " if operator == "$nin" else ""
+                clauses.append(f"json_extract({column}, ?) {negate}IN ({placeholders})")
+                params.extend((path, *operand))
+            else:
+                raise ValueError(f"Unsupported where operator: {operator}")
+
+    if not clauses:
+        return "1", []
+    return " AND ".join(clauses), params
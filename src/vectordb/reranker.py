@@ -0,0 +1,111 @@
+import time
+import logging
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+import numpy as np
+from .query_cache import TTLCache
+from config import settings
+
+if TYPE_CHECKING:
+    from sentence_transformers import CrossEncoder
+
+logger = logging.getLogger(__name__)
+
+
+class CrossEncoderReranker:
+    """Batched cross-encoder that re-scores retrieved chunks against the query.
+
+    Each (query, chunk) pair is scored jointly, which ranks far more precisely
+    than embedding similarity but costs a model pass per candidate, so it is
+    applied to a small over-fetched candidate set. Pairs are sorted by length
+    before batching so each batch pads to similar lengths.
+    """
+
+    def __init__(self, model_name: str = None, batch_size: int = None, device: str = None):
+        self.model_name = model_name or settings.rerank_model
+        self.batch_size = batch_size or settings.rerank_batch_size
+        self.device = device or settings.embedding_device or None
+
+        # Deferred so torch is only imported when a reranker is actually built
+        from sentence_transformers import CrossEncoder
+        self.model: "CrossEncoder" = CrossEncoder(self.model_name, device=self.device)
+
+        # Scores depend only on the query and candidate chunks, so repeat queries skip the model
+        self.score_cache = TTLCache(settings.query_cache_size, settings.query_cache_ttl)
+
+        self.pairs_scored = 0
+        self.seconds_scoring = 0.0
+
+    def score(self, pairs: Sequence[Tuple[str, str]]) -> np.ndarray:
+        """Return one relevance score per (query, text) pair, higher is more relevant."""
+        scores = np.empty(len(pairs), dtype=np.float32)
+        if not pairs:
+            return scores
+
+        start = time.perf_counter()
+        order = np.argsort([-len(text) for _, text in pairs], kind="stable")
+
+        for i in range(0, len(pairs), self.batch_size):
+            batch_idx = order[i:i + self.batch_size]
+            scores[batch_idx] = self.model.predict(
+                [pairs[j] for j in batch_idx],
+                batch_size=self.batch_size,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+
+        elapsed = time.perf_counter() - start
+        self.pairs_scored += len(pairs)
+        self.seconds_scoring += elapsed
+        logger.debug(f"Scored {len(pairs)} pairs in {elapsed:.2f}s ({len(pairs) / max(elapsed, 1e-9):.1f}/s)")
+        return scores
+
+    def rerank(self, query_text: str, query_results: dict, top_n: Optional[int] = None) -> dict:
+        """Reorder a Chroma-style single-query result by cross-encoder score.
+
+        Only the best ``top_n`` candidates are kept; their scores are added
+        under ``rerank_scores``.
+        """
+        return self.rerank_batch([query_text], [query_results], top_n)[0]
+
+    def rerank_batch(
+        self,
+        query_texts: Sequence[str],
+        all_results: Sequence[dict],
+        top_n: Optional[int] = None
+    ) -> List[dict]:
+        """Rerank many single-query results, scoring every uncached pair in one batched pass."""
+        cache_keys = [
+            (query_text, tuple(results['ids'][0]))
+            for query_text, results in zip(query_texts, all_results)
+        ]
+        all_scores = [self.score_cache.get(key) for key in cache_keys]
+
+        missing = [i for i, scores in enumerate(all_scores) if scores is None]
+        pairs = [
+            (query_texts[i], text)
+            for i in missing
+            for text in all_results[i]['documents'][0]
+        ]
+        scores = self.score(pairs)
+        offset = 0
+        for i in missing:
+            count = len(all_results[i]['ids'][0])
+            all_scores[i] = scores[offset:offset + count]
+            offset += count
+            self.score_cache.set(cache_keys[i], all_scores[i])
+
+        reranked = []
+        for results, scores in zip(all_results, all_scores):
+            order = np.argsort(-scores, kind="stable")[:top_n or len(scores)]
+            result = {
+                key: value if key == "included" or value is None else [[value[0][i] for i in order]]
+                for key, value in results.items()
+            }
+            result["rerank_scores"] = [[float(scores[i]) for i in order]]
+            reranked.append(result)
+        return reranked
+
+    @property
+    def throughput(self) -> float:
+        """Average pairs scored per second since creation."""
+        return self.pairs_scored / self.seconds_scoring if self.seconds_scoring else 0.0
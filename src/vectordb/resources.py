@@ -0,0 +1,175 @@
+import os
+import sys
+import logging
+import threading
+from typing import TYPE_CHECKING, Dict, Tuple
+from .embeddings import SentenceEmbedder
+from config import settings
+
+if TYPE_CHECKING:
+    from chromadb.api import ClientAPI
+    from .chroma_db import ChromaVectorDB
+    from .reranker import CrossEncoderReranker
+
+logger = logging.getLogger(__name__)
+
+# Process-wide registries; module state survives Streamlit reruns and is shared
+# by every pipeline, engine and server thread in the process
+_lock = threading.RLock()
+_embedders: Dict[Tuple, SentenceEmbedder] = {}
+_chroma_clients: Dict[str, "ClientAPI"] = {}
+_vector_dbs: Dict[Tuple, "ChromaVectorDB"] = {}
+_rerankers: Dict[Tuple, "CrossEncoderReranker"] = {}
+
+
+def get_embedder(
+    model_name: str = None,
+    batch_size: int = None,
+    device: str = None,
+    backend: str = None,
+    precision: str = None
+) -> SentenceEmbedder:
+    """Return the shared embedder for this configuration, loading it on first use."""
+    key = (
+        model_name or settings.embedding_model,
+        batch_size or settings.embedding_batch_size,
+        device or settings.embedding_device or None,
+        (backend or settings.embedding_backend).lower(),
+        (precision or settings.embedding_precision).lower()
+    )
+    with _lock:
+        if key not in _embedders:
+            logger.info(f"Loading embedding model {key[0]} ({key[3]}, {key[4]})")
+            _embedders[key] = SentenceEmbedder(*key)
+        return _embedders[key]
+
+
+def get_reranker(model_name: str = None, batch_size: int = None, device: str = None) -> "CrossEncoderReranker":
+    """Return the shared cross-encoder reranker, loading it on first use."""
+    from .reranker import CrossEncoderReranker
+
+    key = (
+        model_name or settings.rerank_model,
+        batch_size or settings.rerank_batch_size,
+        device or settings.embedding_device or None
+    )
+    with _lock:
+        if key not in _rerankers:
+            logger.info(f"Loading reranker model {key[0]}")
+            _rerankers[key] = CrossEncoderReranker(*key)
+        return _rerankers[key]
+
+
+def get_chroma_client(persist_directory: str = None, mode: str = None) -> "ClientAPI":
+    """Return the shared Chroma client for the configured client mode.
+
+    ``persistent`` stores collections on disk under ``persist_directory``,
+    ``http`` talks to a Chroma server at ``CHROMA_HOST:CHROMA_PORT`` and
+    ``memory`` keeps everything in process (lost on exit).
+    """
+    import chromadb
+    from chromadb.config import Settings as ChromaSettings
+
+    persist_directory = persist_directory or settings.chroma_persist_directory
+    mode = (mode or settings.chroma_client_mode).lower()
+    chroma_settings = ChromaSettings(anonymized_telemetry=False)
+
+    if mode == "persistent":
+        key = f"persistent:{os.path.abspath(persist_directory)}"
+    elif mode == "http":
+        key = f"http:{settings.chroma_host}:{settings.chroma_port}"
+    elif mode == "memory":
+        key = f"memory:{persist_directory}"
+    else:
+        raise ValueError(f"Unsupported Chroma client mode: {mode}")
+
+    with _lock:
+        if key not in _chroma_clients:
+            if mode == "persistent":
+                _chroma_clients[key] = chromadb.PersistentClient(path=persist_directory, settings=chroma_settings)
+            elif mode == "http":
+                _chroma_clients[key] = chromadb.HttpClient(
+                    host=settings.chroma_host,
+                    port=settings.chroma_port,
+                    settings=chroma_settings
+                )
+            else:
+                _chroma_clients[key] = chromadb.EphemeralClient(settings=chroma_settings)
+            logger.info(f"Opened {mode} Chroma client ({key.split(':', 1)[1]})")
+        return _chroma_clients[key]
+
+
+def get_vector_db(
+    collection_name: str = None,
+    persist_directory: str = None,
+    embedding_model_name: str = None
+) -> "ChromaVectorDB":
+    """Return the shared vector database handle for a collection.
+
+    Sharing one handle also shares its query caches and collection version,
+    so writes made by ingestion invalidate results cached for queries.
+    """
+    from .chroma_db import ChromaVectorDB
+
+    key = (
+        collection_name or settings.collection_name,
+        persist_directory or settings.chroma_persist_directory,
+        embedding_model_name or settings.embedding_model
+    )
+    with _lock:
+        if key not in _vector_dbs:
+            _vector_dbs[key] = ChromaVectorDB(*key)
+        return _vector_dbs[key]
+
+
+def clear_resources() -> None:
+    """Drop all shared handles so the next access reloads them."""
+    with _lock:
+        for vector_db in _vector_dbs.values():
+            if vector_db.embedding_cache is not None:
+                vector_db.embedding_cache.close()
+            if vector_db.bm25_index is not None:
+                vector_db.bm25_index.close()
+            if vector_db.dedup_index is not None:
+                vector_db.dedup_index.close()
+        _vector_dbs.clear()
+        _chroma_clients.clear()
+        _embedders.clear()
+        _rerankers.clear()
+
+
+def _process_memory_mb() -> Tuple[float, float]:
+    """Return (current, peak) resident set size of this process in MiB."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, KiB elsewhere
+        peak_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        peak_mb = 0.0
+
+    current_mb = peak_mb
+    try:
+        with open("/proc/self/statm") as f:
+            current_mb = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    return current_mb, peak_mb
+
+
+def get_resource_stats() -> dict:
+    """Report loaded shared resources and process memory usage."""
+    current_mb, peak_mb = _process_memory_mb()
+    with _lock:
+        return {
+            "rss_mb": current_mb,
+            "peak_rss_mb": peak_mb,
+            "embedding_models": [
+                f"{model_name} ({backend}, {precision})"
+                for model_name, _, _, backend, precision in _embedders
+            ],
+            "reranker_models": [model_name for model_name, _, _ in _rerankers],
+            "chroma_clients": len(_chroma_clients),
+            "vector_dbs": len(_vector_dbs)
+        }
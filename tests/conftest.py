@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the application packages the same way the CLI scripts do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
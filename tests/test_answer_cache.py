@@ -0,0 +1,87 @@
+import zlib
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from config import settings
+from src.rag.query_engine import RAGQueryEngine
+
+
+class StubOpenAI:
+    """Counts chat completion calls and answers with a canned reply."""
+
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, temperature, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(choices=[
+            SimpleNamespace(message=SimpleNamespace(content=f"answer {self.calls}"))
+        ])
+
+
+class StubVectorDB:
+    """Returns the chunks in ``retrieved`` for every query and hashes words into embeddings."""
+
+    def __init__(self, persist_directory: str):
+        self.persist_directory = persist_directory
+        self.retrieved = ["a"]
+
+    def query(self, query_text, n_results=5, mode=None, where=None) -> dict:
+        return {
+            "ids": [list(self.retrieved)],
+            "documents": [[f"Chunk {doc_id} about pump seals." for doc_id in self.retrieved]],
+            "metadatas": [[{"source": f"{doc_id}.txt"} for doc_id in self.retrieved]],
+            "distances": [[0.1] * len(self.retrieved)]
+        }
+
+    def embed_query(self, query_text: str) -> np.ndarray:
+        embedding = np.zeros(64, dtype=np.float32)
+        for word in query_text.lower().split():
+            embedding[zlib.crc32(word.encode()) % 64] += 1.0
+        return embedding
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "answer_cache_path", str(tmp_path / "answers.sqlite"))
+    monkeypatch.setattr(settings, "answer_cache_max_entries", 2)
+    return RAGQueryEngine(
+        client=StubOpenAI(),
+        use_answer_cache=True,
+        vector_db=StubVectorDB(str(tmp_path)),
+        use_reranker=False
+    )
+
+
+def test_repeat_question_is_answered_from_cache(engine):
+    first = engine.query("How was the pump seal inspected?")
+    second = engine.query("How was the pump seal inspected?")
+
+    assert engine.client.calls == 1
+    assert not first["cached"] and second["cached"]
+    assert second["answer"] == first["answer"]
+
+
+def test_different_retrieved_chunks_miss_the_cache(engine):
+    engine.query("How was the pump seal inspected?")
+    engine.vector_db.retrieved = ["a", "b"]
+    result = engine.query("How was the pump seal inspected?")
+
+    assert engine.client.calls == 2
+    assert not result["cached"]
+
+
+def test_oldest_answers_are_evicted_beyond_the_size_limit(engine):
+    for chunk_id in ("a", "b", "c"):
+        engine.vector_db.retrieved = [chunk_id]
+        engine.query("How was the pump seal inspected?")
+    assert engine.client.calls == 3
+
+    engine.vector_db.retrieved = ["c"]
+    assert engine.query("How was the pump seal inspected?")["cached"]
+    engine.vector_db.retrieved = ["a"]
+    assert not engine.query("How was the pump seal inspected?")["cached"]
+    assert engine.client.calls == 4
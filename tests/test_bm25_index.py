@@ -0,0 +1,67 @@
+from src.vectordb.bm25_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+
+def build_index(path) -> BM25Index:
+    index = BM25Index(str(path))
+    index.add(
+        ["a", "b", "c"],
+        [
+            "Pump XJ-9920 failed the pressure inspection",
+            "Quarterly revenue forecast for the pump division",
+            "Valve maintenance schedule and warranty terms"
+        ],
+        ["a.txt", "b.txt", "c.txt"],
+        [
+            {"source": "a.txt", "extension": ".txt", "page": 1},
+            {"source": "b.txt", "extension": ".txt", "page": 4},
+            {"source": "c.txt", "extension": ".md", "page": 2}
+        ]
+    )
+    return index
+
+
+def test_tokenize_keeps_identifiers_and_their_parts():
+    assert tokenize("The XJ-9920 valve") == ["xj-9920", "xj", "9920", "valve"]
+
+
+def test_identifier_query_ranks_the_exact_match_first(tmp_path):
+    index = build_index(tmp_path / "bm25.sqlite")
+    results = index.search("XJ-9920", n_results=3)
+
+    assert results[0][0] == "a"
+    assert {doc_id for doc_id, _ in results} == {"a"}
+
+
+def test_search_applies_where_filters(tmp_path):
+    index = build_index(tmp_path / "bm25.sqlite")
+
+    assert [doc_id for doc_id, _ in index.search("pump", where={"source": "b.txt"})] == ["b"]
+    assert [doc_id for doc_id, _ in index.search("pump", where={"page": {"$gte": 4}})] == ["b"]
+    assert index.search("pump", where={"extension": ".md"}) == []
+    assert index.search("pump", where={"source": {"$in": ["a.txt", "c.txt"]}})[0][0] == "a"
+
+
+def test_set_sources_replaces_filterable_metadata(tmp_path):
+    index = build_index(tmp_path / "bm25.sqlite")
+    index.set_sources(["b"], ["d.txt"], [{"source": "d.txt"}])
+
+    assert index.search("pump", where={"source": "b.txt"}) == []
+    assert [doc_id for doc_id, _ in index.search("pump", where={"source": "d.txt"})] == ["b"]
+
+
+def test_delete_source_and_reopen(tmp_path):
+    path = tmp_path / "bm25.sqlite"
+    index = build_index(path)
+    assert index.delete_source("a.txt") == 1
+    index.close()
+
+    reopened = BM25Index(str(path))
+    assert reopened.count == 2
+    assert reopened.search("XJ-9920") == []
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "a", "d"]], k=60)
+
+    assert [doc_id for doc_id, _ in fused][:2] in (["a", "b"], ["b", "a"])
+    assert dict(fused)["a"] > dict(fused)["c"]
@@ -0,0 +1,71 @@
+import random
+import numpy as np
+from langchain.docstore.document import Document
+from src.ingestion.chunker import TokenChunker
+
+WORDS = "pump valve pressure seal flange gasket bearing motor shaft impeller housing inspection".split()
+
+
+def make_markdown(seed: int, sections: int = 6) -> str:
+    rng = random.Random(seed)
+    parts = []
+    for section in range(sections):
+        parts.append(f"# Section {section}")
+        for _ in range(rng.randint(2, 4)):
+            sentences = [
+                " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 20))).capitalize() + "."
+                for _ in range(rng.randint(2, 6))
+            ]
+            parts.append(" ".join(sentences))
+    return "\n\n".join(parts)
+
+
+def test_chunks_fit_the_token_limit_and_cover_the_text():
+    chunker = TokenChunker(max_tokens=64, overlap_tokens=8)
+    text = make_markdown(1)
+    starts, ends = chunker.token_offsets(text)
+
+    covered = np.zeros(len(starts), dtype=bool)
+    for start, end, _ in chunker.iter_spans(text):
+        inside = (starts >= start) & (ends <= end)
+        assert inside.sum() <= 64
+        covered |= inside
+    assert covered.all()
+
+
+def test_chunks_are_slices_of_the_text():
+    chunker = TokenChunker(max_tokens=48, overlap_tokens=8)
+    text = make_markdown(2)
+
+    chunks = list(chunker.iter_chunks(text))
+    assert len(chunks) > 1
+    assert all(chunk in text for chunk in chunks)
+
+
+def test_chunks_record_their_markdown_section():
+    chunker = TokenChunker(max_tokens=48, overlap_tokens=0)
+    document = Document(page_content=make_markdown(3), metadata={"source": "doc.md"})
+
+    chunks = list(chunker.iter_split_documents([document]))
+    assert all(chunk.metadata["source"] == "doc.md" for chunk in chunks)
+    for chunk in chunks:
+        if chunk.page_content.startswith("# Section"):
+            assert chunk.metadata["section"] == chunk.page_content.splitlines()[0][2:]
+
+
+def test_overlap_never_exceeds_half_a_chunk():
+    chunker = TokenChunker(max_tokens=10, overlap_tokens=100)
+    assert chunker.overlap_tokens == 5
+
+
+def test_lone_surrogates_are_replaced_instead_of_failing_the_document():
+    chunker = TokenChunker(max_tokens=16, overlap_tokens=0)
+    text = "Pump seal \ud800 inspected. " * 20
+    document = Document(page_content=text, metadata={"source": "doc.pdf"})
+
+    assert chunker.count_tokens(text) > 16
+    chunks = [chunk.page_content for chunk in chunker.iter_split_documents([document])]
+    assert len(chunks) > 1
+    assert all("�" in chunk for chunk in chunks)
+    for chunk in chunks + list(chunker.iter_chunks(text)):
+        chunk.encode("utf-8")
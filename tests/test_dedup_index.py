@@ -0,0 +1,136 @@
+import random
+import numpy as np
+from src.vectordb.dedup_index import DedupIndex, minhash_signatures
+
+WORDS = (
+    "revenue forecast quarterly policy contract clause vendor invoice compliance "
+    "audit retention schedule region warehouse shipment liability coverage term"
+).split()
+
+
+def make_text(seed: int, words: int = 300) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def edit(text: str, every: int) -> str:
+    words = text.split()
+    for i in range(0, len(words), every):
+        words[i] = "edited"
+    return " ".join(words)
+
+
+def test_exact_and_near_duplicates_collapse(tmp_path):
+    index = DedupIndex(str(tmp_path / "dedup.sqlite"), threshold=0.85)
+    base = make_text(1)
+
+    matches = index.add(
+        ["a", "b", "c", "d"],
+        [base, "  " + base.replace(" ", "\n"), edit(base, 100), make_text(2)],
+        ["a.txt", "b.txt", "c.txt", "d.txt"],
+        [{}, {}, {}, {}]
+    )
+
+    assert matches == [None, ("a", True), ("a", False), None]
+    assert index.count == 2
+    assert [source for source, _ in index.members(["a"])["a"]] == ["a.txt", "b.txt", "c.txt"]
+    assert index.stats()["collapsed"] == 2
+
+
+def test_removing_a_source_keeps_chunks_other_sources_hold(tmp_path):
+    index = DedupIndex(str(tmp_path / "dedup.sqlite"))
+    text = make_text(3)
+    index.add(["a"], [text], ["a.txt"], [{"filename": "a.txt"}])
+    index.add(["b"], [text], ["b.txt"], [{"filename": "b.txt"}])
+
+    remaining = index.remove_source("a.txt")
+    assert remaining == {"a": [("b.txt", {"filename": "b.txt"})]}
+    assert index.count == 1
+
+    assert index.remove_source("b.txt") == {}
+    assert index.count == 0
+
+
+def test_index_survives_reopen(tmp_path):
+    path = str(tmp_path / "dedup.sqlite")
+    text = make_text(4)
+    index = DedupIndex(path)
+    index.add(["a"], [text], ["a.txt"], [{}])
+    index.close()
+
+    reopened = DedupIndex(path)
+    assert reopened.count == 1
+    assert reopened.add(["b"], [edit(text, 100)], ["b.txt"], [{}]) == [("a", False)]
+
+
+def test_signature_agreement_estimates_jaccard_similarity():
+    base = make_text(5, words=2000)
+    signatures, has_words = minhash_signatures([base, edit(base, 10), make_text(6, words=2000), ""])
+
+    assert has_words.tolist() == [True, True, True, False]
+    assert np.mean(signatures[0] == signatures[1]) > 0.4
+    assert np.mean(signatures[0] == signatures[2]) < np.mean(signatures[0] == signatures[1])
+
+
+def test_rows_of_a_failed_run_are_discarded(tmp_path):
+    index = DedupIndex(str(tmp_path / "dedup.sqlite"))
+    text = make_text(7)
+
+    assert index.add(["a"], [text], ["a.txt"], [{}], run="failed") == [None]
+    # Other runs never collapse into chunks that may not be stored
+    assert index.add(["b"], [text], ["b.txt"], [{}], run="other") == [None]
+    index.discard_run("failed")
+
+    assert index.count == 1
+    assert list(index.members(["a", "b"])) == ["b"]
+
+
+def test_unconfirmed_rows_are_dropped_on_reopen(tmp_path):
+    path = str(tmp_path / "dedup.sqlite")
+    text = make_text(8)
+    index = DedupIndex(path)
+    index.add(["a", "b"], [text, make_text(9)], ["a.txt", "b.txt"], [{}, {}], run="crashed")
+    index.confirm(["b"], ["b.txt"])
+    index.close()
+
+    reopened = DedupIndex(path)
+    assert reopened.count == 1
+    assert reopened.add(["c"], [text], ["c.txt"], [{}]) == [None]
+
+
+def test_finished_run_keeps_confirmed_chunks_and_their_copies(tmp_path):
+    index = DedupIndex(str(tmp_path / "dedup.sqlite"))
+    text = make_text(10)
+    matches = index.add(["a", "b", "c"], [text, text, make_text(11)], ["a.txt", "b.txt", "c.txt"], [{}] * 3, run="run")
+    assert matches == [None, ("a", True), None]
+
+    # Only "a" was stored before the run finished
+    index.confirm(["a"], ["a.txt"])
+    index.finish_run("run")
+
+    assert index.count == 1
+    assert [source for source, _ in index.members(["a"])["a"]] == ["a.txt", "b.txt"]
+
+
+def test_a_chunk_matching_its_own_id_is_new(tmp_path):
+    index = DedupIndex(str(tmp_path / "dedup.sqlite"))
+    text = make_text(12)
+    index.add(["a"], [text], ["a.txt"], [{}])
+
+    assert index.add(["a"], [text], ["a.txt"], [{}]) == [None]
+    assert index.count == 1
+
+
+def test_filters_find_copies_the_stored_chunk_does_not_match(tmp_path):
+    index = DedupIndex(str(tmp_path / "dedup.sqlite"))
+    text = make_text(4)
+    index.add(["a"], [text], ["a.txt"], [{"filename": "a.txt", "extension": ".txt"}])
+    index.add(["b"], [text], ["b.txt"], [{"filename": "b.txt", "extension": ".txt"}])
+
+    assert index.copies_matching({"filename": "b.txt"}) == {"a": {"filename": "b.txt", "extension": ".txt"}}
+    # The stored chunk matches by itself, so there is nothing to add
+    assert index.copies_matching({"extension": ".txt"}) == {}
+    assert index.copies_matching({"filename": "c.txt"}) == {}
+
+    index.remove_source("a.txt")
+    assert index.copies_matching({"filename": "b.txt"}) == {}
@@ -0,0 +1,52 @@
+import pytest
+from langchain.docstore.document import Document
+from src.ingestion import extractors
+from src.ingestion.document_processor import DocumentProcessor
+
+
+def test_parse_failures_are_reported_apart_from_empty_files(tmp_path):
+    good = tmp_path / "good.txt"
+    good.write_text("Pump inspection report for the north plant. " * 20)
+    broken = tmp_path / "broken.json"
+    broken.write_text("{not json")
+    unsupported = tmp_path / "image.bin"
+    unsupported.write_bytes(b"\x00\x01")
+
+    results = dict(DocumentProcessor().iter_process_documents([str(good), str(broken), str(unsupported)], max_workers=1))
+
+    assert results[str(good)]
+    assert all(chunk.metadata["filename"] == "good.txt" for chunk in results[str(good)])
+    assert results[str(broken)] is None
+    assert results[str(unsupported)] == []
+
+
+def test_load_document_logs_errors_unless_asked_to_raise(tmp_path):
+    broken = tmp_path / "broken.json"
+    broken.write_text("{not json")
+    processor = DocumentProcessor()
+
+    assert processor.load_document(str(broken)) == []
+    with pytest.raises(ValueError):
+        processor.load_document(str(broken), raise_errors=True)
+
+
+def test_pages_are_chunked_as_they_are_extracted(tmp_path, monkeypatch):
+    extracted = []
+
+    def extract_pages(file):
+        for page in range(3):
+            extracted.append(page)
+            yield Document(page_content=f"Page {page} of the pump inspection report.", metadata={"page": page})
+        raise ValueError("truncated file")
+
+    monkeypatch.setitem(extractors._EXTRACTORS, ".txt", extract_pages)
+    path = tmp_path / "report.txt"
+    path.write_text("unused")
+    processor = DocumentProcessor(use_native_extractors=True)
+
+    pages = processor.iter_load_file(str(path))
+    assert next(pages).metadata == {"page": 0, "source": str(path), "filename": "report.txt", "extension": ".txt"}
+    assert extracted == [0]
+
+    # A failure after pages were passed on is reported, not retried with the loader
+    assert dict(processor.iter_process_documents([str(path)], max_workers=1)) == {str(path): None}
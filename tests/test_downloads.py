@@ -0,0 +1,109 @@
+import os
+import time
+import threading
+from typing import Iterator
+
+import pytest
+
+from config import settings
+from src.storage.base import InMemoryFile, StorageConnector, StorageObject
+
+
+class FakeConnector(StorageConnector):
+    """In-process bucket whose downloads can be slowed down or made to fail."""
+
+    def __init__(self, keys, delays=None, failures=None):
+        self.keys = list(keys)
+        self.delays = delays or {}
+        # Number of attempts that fail per key; -1 fails every attempt
+        self.failures = dict(failures or {})
+        self.attempts = {}
+        self.running = self.max_running = 0
+        self._lock = threading.Lock()
+
+    def list_objects(self, prefix: str = "") -> Iterator[StorageObject]:
+        for key in self.keys:
+            yield StorageObject(key=key, size=4)
+
+    def download_file(self, file_path: str, local_path: str) -> str:
+        with self._lock:
+            self.attempts[file_path] = self.attempts.get(file_path, 0) + 1
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            time.sleep(self.delays.get(file_path, 0.001))
+            failures = self.failures.get(file_path, 0)
+            if failures == -1 or self.attempts[file_path] <= failures:
+                raise ConnectionError(f"transient error for {file_path}")
+            os.makedirs(os.path.dirname(local_path), exist_ok=True)
+            with open(local_path, "w") as f:
+                f.write(file_path)
+            return local_path
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "download_max_retries", 2)
+    monkeypatch.setattr(settings, "download_retry_backoff", 0.0)
+
+
+def test_listing_is_consumed_at_most_two_batches_ahead(tmp_path):
+    connector = FakeConnector([f"doc_{i}.txt" for i in range(40)])
+    pulled = 0
+
+    def objects():
+        nonlocal pulled
+        for obj in connector.list_objects():
+            pulled += 1
+            yield obj
+
+    consumed = 0
+    for _ in connector.iter_downloads(str(tmp_path), max_workers=3, objects=objects()):
+        assert pulled - consumed <= 2 * 3
+        consumed += 1
+
+    assert consumed == 40
+    assert connector.max_running <= 3
+
+
+def test_transient_errors_are_retried(tmp_path):
+    connector = FakeConnector(["a.txt", "b.txt"], failures={"a.txt": 2})
+    results = dict(connector.iter_downloads(str(tmp_path), max_workers=2))
+
+    assert sorted(obj.key for obj in results) == ["a.txt", "b.txt"]
+    assert connector.attempts["a.txt"] == 3
+    assert connector.last_download_stats["files_failed"] == 0
+
+
+def test_permanent_failures_are_reported_not_raised(tmp_path):
+    connector = FakeConnector(["a.txt", "b.txt", "c.txt"], failures={"b.txt": -1})
+    keys = [obj.key for obj, _ in connector.iter_downloads(str(tmp_path), max_workers=2)]
+
+    assert sorted(keys) == ["a.txt", "c.txt"]
+    assert connector.attempts["b.txt"] == 3
+    stats = connector.last_download_stats
+    assert (stats["files_listed"], stats["files_downloaded"], stats["files_failed"]) == (3, 2, 1)
+
+
+def test_downloads_are_yielded_complete_as_they_finish(tmp_path):
+    keys = [f"dir/doc_{i}.txt" for i in range(10)]
+    connector = FakeConnector(keys, delays={"dir/doc_0.txt": 0.3})
+    results = list(connector.iter_downloads(str(tmp_path), max_workers=4))
+
+    # Every object arrives exactly once with its contents, the slow one last
+    assert sorted(obj.key for obj, _ in results) == keys
+    assert results[-1][0].key == "dir/doc_0.txt"
+    for obj, local_path in results:
+        assert local_path == os.path.join(str(tmp_path), obj.key)
+        with open(local_path) as f:
+            assert f.read() == obj.key
+
+
+def test_small_objects_can_be_fetched_into_memory(tmp_path):
+    connector = FakeConnector(["a.txt"])
+    [(obj, file)] = connector.iter_downloads(str(tmp_path), max_workers=1, max_memory_bytes=16)
+
+    assert file == InMemoryFile(os.path.join(str(tmp_path), "a.txt"), b"a.txt")
@@ -0,0 +1,48 @@
+import json
+import sqlite3
+
+from src.vectordb.filters import build_where, folder_levels, prefix_conditions, where_to_sql
+
+
+def test_build_where_combines_conditions():
+    assert build_where(filename=None, extension=[]) is None
+    assert build_where(filename="a.pdf") == {"filename": "a.pdf"}
+    assert build_where(filename="a.pdf", extension=[".pdf", ".docx"]) == {
+        "$and": [{"filename": "a.pdf"}, {"extension": {"$in": [".pdf", ".docx"]}}]
+    }
+
+
+def test_folder_levels_name_every_enclosing_folder():
+    assert folder_levels("reports/2024/q3.pdf") == {"folder_1": "reports", "folder_2": "reports/2024"}
+    assert folder_levels("top.pdf") == {}
+
+
+def test_prefix_matches_the_folder_at_its_depth():
+    key = "reports/2024/q3.pdf"
+    for prefix in ("reports", "reports/", "reports/2024", "/reports/2024/"):
+        [(field, value)] = prefix_conditions(prefix).items()
+        assert folder_levels(key)[field] == value
+    assert prefix_conditions("") == {}
+
+
+def test_where_to_sql_matches_chroma_semantics():
+    conn = sqlite3.connect(":memory:")
+    rows = [
+        {"filename": "a.pdf", "extension": ".pdf", "page": 1},
+        {"filename": "b.docx", "extension": ".docx", "page": 3},
+        {"filename": "c.txt", "extension": ".txt", "page": 5}
+    ]
+
+    def matching(where):
+        sql, params = where_to_sql(where, "metadata")
+        return [
+            row["filename"] for row in rows
+            if conn.execute(f"SELECT {sql} FROM (SELECT ? AS metadata)", [*params, json.dumps(row)]).fetchone()[0]
+        ]
+
+    assert matching({"filename": "a.pdf"}) == ["a.pdf"]
+    assert matching({"extension": {"$in": [".pdf", ".docx"]}}) == ["a.pdf", "b.docx"]
+    assert matching({"extension": {"$nin": [".pdf"]}}) == ["b.docx", "c.txt"]
+    assert matching({"$and": [{"page": {"$gt": 1}}, {"page": {"$lte": 3}}]}) == ["b.docx"]
+    assert matching({"$or": [{"filename": "a.pdf"}, {"page": {"$gte": 5}}]}) == ["a.pdf", "c.txt"]
+    assert matching({"filename": {"$ne": "a.pdf"}}) == ["b.docx", "c.txt"]
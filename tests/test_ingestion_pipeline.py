@@ -0,0 +1,83 @@
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from config import settings
+from src.ingestion.ingestion_pipeline import IngestionPipeline
+from src.ingestion.manifest import IngestionManifest
+from src.vectordb.dedup_index import DedupResult
+
+
+class RecordingVectorDB:
+    """In-memory stand-in for ChromaVectorDB that records what the pipeline stores."""
+
+    def __init__(self, persist_directory: str):
+        self.persist_directory = persist_directory
+        self.collection_name = "documents"
+        self.embedding_model = SimpleNamespace(throughput=0.0)
+        self.embedding_cache = None
+        self.chunks = {}
+        self.dedup_calls = 0
+
+    def get_collection_stats(self) -> dict:
+        return {"name": self.collection_name, "count": len(self.chunks)}
+
+    def deduplicate_documents(self, documents, run=None) -> DedupResult:
+        self.dedup_calls += 1
+        return DedupResult(unique=list(documents))
+
+    def embed_documents(self, documents) -> np.ndarray:
+        return np.zeros((len(documents), 4), dtype=np.float32)
+
+    def upsert_documents(self, documents, embeddings=None) -> None:
+        for doc in documents:
+            self.chunks[(doc.metadata["source"], doc.page_content)] = doc.metadata
+
+    def delete_documents_by_source(self, source: str) -> None:
+        self.chunks = {key: value for key, value in self.chunks.items() if key[0] != source}
+
+    def sync_duplicate_sources(self, chunk_ids, run=None) -> None:
+        pass
+
+    def discard_duplicates(self, run: str) -> None:
+        pass
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    data.mkdir()
+    monkeypatch.setattr(settings, "local_storage_path", str(data))
+    monkeypatch.setattr(settings, "ingestion_manifest_path", str(tmp_path / "manifest.json"))
+    monkeypatch.setattr(settings, "parse_workers", 1)
+    monkeypatch.setattr(settings, "ingest_batch_size", 4)
+    return IngestionPipeline("local", vector_db=RecordingVectorDB(str(tmp_path)))
+
+
+def write_files(directory: str, count: int, version: str) -> None:
+    for i in range(count):
+        with open(os.path.join(directory, f"doc_{i}.txt"), "w", encoding="utf-8") as f:
+            f.write(f"Document {i} revision {version}. The pump seal was inspected.")
+
+
+def test_modified_files_are_retired_with_one_manifest_save_per_batch(pipeline, monkeypatch):
+    directory = settings.local_storage_path
+    write_files(directory, 12, "one")
+    pipeline.run()
+    assert len(pipeline.vector_db.chunks) == 12
+
+    saves = []
+    original_save = IngestionManifest.save
+    monkeypatch.setattr(IngestionManifest, "save", lambda self: saves.append(1) or original_save(self))
+    write_files(directory, 12, "two")
+    pipeline.vector_db.dedup_calls = 0
+    pipeline.run()
+
+    # One chunk per file and four chunks per batch: three retirement saves plus the
+    # final save, and one dedup index call per batch
+    assert len(saves) == 4
+    assert pipeline.vector_db.dedup_calls == 3
+    assert len(pipeline.vector_db.chunks) == 12
+    assert all("revision two" in text for _, text in pipeline.vector_db.chunks)
@@ -0,0 +1,56 @@
+from datetime import datetime, timezone
+from src.ingestion.manifest import IngestionManifest
+from src.storage.base import StorageObject
+
+
+def make_object(key: str, etag: str = "v1", size: int = 10) -> StorageObject:
+    return StorageObject(key=key, size=size, etag=etag, last_modified=datetime(2024, 1, 1, tzinfo=timezone.utc))
+
+
+def test_recorded_objects_survive_reload(tmp_path):
+    path = str(tmp_path / "manifest.json")
+    manifest = IngestionManifest(path, "s3://bucket")
+    manifest.record(make_object("a.pdf"), "s3://bucket/a.pdf")
+    manifest.save()
+
+    reloaded = IngestionManifest(path, "s3://bucket")
+    assert reloaded.is_unchanged(make_object("a.pdf"))
+    assert reloaded.get_source("a.pdf") == "s3://bucket/a.pdf"
+
+
+def test_changed_fingerprint_is_not_unchanged(tmp_path):
+    manifest = IngestionManifest(str(tmp_path / "manifest.json"), "s3://bucket")
+    manifest.record(make_object("a.pdf"), "s3://bucket/a.pdf")
+
+    assert not manifest.is_unchanged(make_object("a.pdf", etag="v2"))
+    assert not manifest.is_unchanged(make_object("a.pdf", size=11))
+    assert not manifest.is_unchanged(make_object("b.pdf"))
+
+
+def test_locations_are_kept_apart(tmp_path):
+    path = str(tmp_path / "manifest.json")
+    first = IngestionManifest(path, "s3://a")
+    first.record(make_object("report.pdf"), "s3://a/report.pdf")
+    first.save()
+
+    second = IngestionManifest(path, "gs://b")
+    assert not second.is_unchanged(make_object("report.pdf"))
+    second.record(make_object("report.pdf"), "gs://b/report.pdf")
+    second.save()
+
+    assert IngestionManifest(path, "s3://a").get_source("report.pdf") == "s3://a/report.pdf"
+
+
+def test_missing_keys_only_cover_the_prefix(tmp_path):
+    manifest = IngestionManifest(str(tmp_path / "manifest.json"), "local")
+    for key in ("reports/a.pdf", "reports/b.pdf", "other/c.pdf"):
+        manifest.record(make_object(key), key)
+
+    assert manifest.missing_keys("reports/", {"reports/a.pdf"}) == ["reports/b.pdf"]
+
+
+def test_unreadable_manifest_starts_empty(tmp_path):
+    path = tmp_path / "manifest.json"
+    path.write_text("{not json")
+
+    assert IngestionManifest(str(path), "local").entries == {}
@@ -0,0 +1,82 @@
+"""Data written through ChromaVectorDB must be readable from a new process."""
+import os
+import sys
+import json
+import subprocess
+import pytest
+
+pytest.importorskip("chromadb")
+pytest.importorskip("sentence_transformers")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WRITE_SCRIPT = """
+import json
+from langchain.docstore.document import Document
+from src.vectordb import get_vector_db
+
+vector_db = get_vector_db()
+vector_db.upsert_documents([
+    Document(
+        page_content=f"Inspection report {i}: pump XJ-99{i:02d} passed the pressure test",
+        metadata={"source": f"reports/{i}.txt", "filename": f"{i}.txt"}
+    )
+    for i in range(20)
+])
+print(json.dumps(vector_db.get_collection_stats()))
+"""
+
+READ_SCRIPT = """
+import json
+from src.vectordb import get_vector_db
+
+vector_db = get_vector_db()
+vector = vector_db.query("pump XJ-9907 pressure test", n_results=3, mode="vector")
+keyword = vector_db.query("XJ-9907", n_results=1, mode="keyword")
+print(json.dumps({
+    "count": vector_db.get_collection_stats()["count"],
+    "vector": vector["ids"][0],
+    "keyword": [metadata["source"] for metadata in keyword["metadatas"][0]]
+}))
+"""
+
+DELETE_SCRIPT = """
+from src.vectordb import get_vector_db
+
+get_vector_db().delete_documents_by_source("reports/7.txt")
+"""
+
+
+def run_script(script: str, persist_directory: str) -> dict:
+    env = {
+        **os.environ,
+        "CHROMA_CLIENT_MODE": "persistent",
+        "CHROMA_PERSIST_DIRECTORY": persist_directory,
+        "COLLECTION_NAME": "persistence_test"
+    }
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    lines = output.strip().splitlines()
+    return json.loads(lines[-1]) if lines else {}
+
+
+def test_chunks_survive_process_restarts(tmp_path):
+    persist_directory = str(tmp_path / "chroma")
+
+    assert run_script(WRITE_SCRIPT, persist_directory)["count"] == 20
+
+    restarted = run_script(READ_SCRIPT, persist_directory)
+    assert restarted["count"] == 20
+    assert len(restarted["vector"]) == 3
+    assert restarted["keyword"] == ["reports/7.txt"]
+
+    run_script(DELETE_SCRIPT, persist_directory)
+    after_delete = run_script(READ_SCRIPT, persist_directory)
+    assert after_delete["count"] == 19
+    assert "reports/7.txt" not in after_delete["keyword"]
@@ -0,0 +1,56 @@
+import copy
+import zlib
+
+import numpy as np
+import pytest
+from langchain.docstore.document import Document
+
+from config import settings
+
+pytest.importorskip("chromadb")
+from src.vectordb import chroma_db
+
+
+class StubEmbedder:
+    """Hashes words into vectors instead of loading a model."""
+
+    dimension = 64
+    backend = "stub"
+    precision = "float32"
+
+    def encode(self, texts) -> np.ndarray:
+        embeddings = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in text.lower().split():
+                embeddings[i, zlib.crc32(word.encode()) % self.dimension] += 1.0
+        return embeddings
+
+
+@pytest.fixture
+def vector_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(chroma_db, "get_embedder", lambda model_name: StubEmbedder())
+    monkeypatch.setattr(settings, "embedding_cache_enabled", False)
+    monkeypatch.setattr(settings, "dedup_enabled", False)
+    monkeypatch.setattr(settings, "bm25_index_path", "")
+    vector_db = chroma_db.ChromaVectorDB("cache_test", str(tmp_path))
+    vector_db.upsert_documents([
+        Document(page_content=f"Pump {i} seal was inspected", metadata={"source": f"{i}.txt"})
+        for i in range(4)
+    ])
+    return vector_db
+
+
+@pytest.mark.parametrize("mode", ["vector", "keyword"])
+def test_mutating_a_result_does_not_change_later_hits(vector_db, mode):
+    first = vector_db.query("pump seal", n_results=2, mode=mode)
+    expected = copy.deepcopy({key: first[key] for key in ("ids", "documents", "metadatas")})
+    first["ids"][0].clear()
+    first["metadatas"][0].append({"source": "injected.txt"})
+
+    second = vector_db.query("pump seal", n_results=2, mode=mode)
+    assert vector_db.query_result_cache.hits == 1
+    assert {key: second[key] for key in expected} == expected
+
+    second["documents"][0][0] = "changed"
+    [third] = vector_db.query_batch(["pump seal"], n_results=2, mode=mode)
+    assert {key: third[key] for key in expected} == expected
@@ -0,0 +1,83 @@
+import json
+import time
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from src.rag.client import QueryServerClient, QueryServerError
+from src.rag.server import QueryServer
+
+
+class StubEngine:
+    """Answers from canned text instead of retrieval and an LLM."""
+
+    def query(self, query_text: str, **options) -> dict:
+        if query_text == "fail":
+            raise RuntimeError("LLM unavailable")
+        return {"answer": f"answer to {query_text}", "sources": [], "query": query_text, "options": options}
+
+    def query_stream(self, query_text: str, **options):
+        yield {"type": "retrieval", "query": query_text, "sources": []}
+        for word in ("streamed", "answer"):
+            yield {"type": "token", "content": word}
+        yield {"type": "done"}
+
+
+@pytest.fixture
+def server():
+    server = QueryServer("127.0.0.1", 0, engine_factory=StubEngine)
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    deadline = time.monotonic() + 5
+    while server.engine is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def url(server: QueryServer) -> str:
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def post(server: QueryServer, body: bytes) -> tuple:
+    request = urllib.request.Request(f"{url(server)}/query", data=body, method="POST")
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_query_and_stream_through_the_client(server):
+    client = QueryServerClient(url(server))
+    assert client.ready()
+
+    result = client.query("pump seal?", top_k=3, where={"extension": ".pdf"})
+    assert result["answer"] == "answer to pump seal?"
+    assert result["options"]["top_k"] == 3
+    assert result["options"]["where"] == {"extension": ".pdf"}
+
+    events = list(client.query_stream("pump seal?"))
+    assert [event["type"] for event in events] == ["retrieval", "token", "token", "done"]
+
+
+@pytest.mark.parametrize("body", [b"[1, 2]", b'"pump"', b"3", b"{}", b"not json"])
+def test_bodies_without_a_query_object_are_rejected(server, body):
+    status, payload = post(server, body)
+    assert status == 400
+    assert "query" in payload["error"]
+
+
+def test_engine_errors_reach_the_client_as_readable_errors(server):
+    assert post(server, b'{"query": "fail"}') == (500, {"error": "LLM unavailable"})
+
+    with pytest.raises(QueryServerError, match="HTTP 500: LLM unavailable") as error:
+        QueryServerClient(url(server)).query("fail")
+    assert error.value.status == 500
+
+
+def test_unreachable_server_raises_a_readable_error():
+    with pytest.raises(QueryServerError, match="Cannot reach the query server"):
+        QueryServerClient("http://127.0.0.1:9", timeout=1).query("pump")
@@ -4,9 +4,9 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.ingestion import IngestionPipeline
+from src.ingestion import start_ingestion_job, get_ingestion_job
 from src.rag import RAGQueryEngine
-from src.vectordb import ChromaVectorDB
+from src.vectordb import build_where, get_vector_db, get_resource_stats, prefix_conditions
 from config import settings
 
 
@@ -22,6 +22,47 @@ if 'query_engine' not in st.session_state:
     st.session_state.query_engine = None
 if 'chat_history' not in st.session_state:
     st.session_state.chat_history = []
+if 'ingestion_job_id' not in st.session_state:
+    st.session_state.ingestion_job_id = None
+
+
+@st.fragment(run_every=1.0)
+def render_ingestion_progress():
+    """Poll the background ingestion job and render its progress."""
+    if st.session_state.ingestion_job_id is None:
+        return
+    job = get_ingestion_job(st.session_state.ingestion_job_id)
+    if job is None:
+        return
+
+    progress = job.progress
+    total = progress.files_to_process
+    if job.status == "complete":
+        st.success(f"✅ Ingestion complete in {progress.elapsed:.0f}s")
+        if st.session_state.query_engine is None:
+            st.session_state.query_engine = RAGQueryEngine()
+    elif job.status == "failed":
+        st.error(f"❌ Error during ingestion: {job.error}")
+    else:
+        fraction = min(progress.files_processed / total, 1.0) if total else 0.0
+        st.progress(fraction, text=f"Ingesting ({progress.stage})...")
+        if progress.eta_seconds is not None:
+            st.caption(f"ETA: {progress.eta_seconds:.0f}s")
+
+    st.caption(
+        f"Files: {progress.listed} listed ({progress.skipped} unchanged), "
+        f"{progress.downloaded} downloaded, {progress.parsed} parsed, {progress.failed} failed"
+    )
+    st.caption(
+        f"Chunks: {progress.chunks} produced, {progress.duplicates} duplicates collapsed, "
+        f"{progress.embedded} embedded, {progress.upserted} upserted"
+    )
+    st.caption(
+        f"Throughput: {progress.files_per_second:.1f} files/s, "
+        f"{progress.chunks_per_second:.1f} chunks/s, "
+        f"{progress.bytes_downloaded / (1024 * 1024):.1f} MiB downloaded"
+    )
+
 
 with st.sidebar:
     st.header("⚙️ Configuration")
@@ -29,8 +70,8 @@ with st.sidebar:
     st.subheader("1. Document Ingestion")
     storage_type = st.selectbox(
         "Select Storage Provider",
-        ["s3", "gcp", "azure"],
-        help="Choose your cloud storage provider"
+        ["s3", "gcp", "azure", "local"],
+        help="Choose your cloud storage provider, or local to read LOCAL_STORAGE_PATH in place"
     )
 
     prefix = st.text_input(
@@ -39,16 +80,15 @@ with st.sidebar:
         help="Filter files by prefix/folder path"
     )
 
+    # Ingestion runs in a background job so the UI and queries stay responsive
     if st.button("🔄 Ingest Documents", type="primary"):
-        with st.spinner("Ingesting documents..."):
-            try:
-                pipeline = IngestionPipeline(storage_type=storage_type)
-                pipeline.run(prefix=prefix)
-                st.success("✅ Documents ingested successfully!")
+        try:
+            job = start_ingestion_job(storage_type, prefix=prefix)
+            st.session_state.ingestion_job_id = job.id
+        except Exception as e:
+            st.error(f"❌ Error starting ingestion: {str(e)}")
 
-                st.session_state.query_engine = RAGQueryEngine()
-            except Exception as e:
-                st.error(f"❌ Error during ingestion: {str(e)}")
+    render_ingestion_progress()
 
     st.divider()
 
@@ -64,13 +104,26 @@ with st.sidebar:
 
     st.subheader("📊 Database Stats")
     try:
-        vector_db = ChromaVectorDB()
-        stats = vector_db.get_collection_stats()
+        # Shared handle: reruns reuse the loaded embedding model and Chroma client
+        stats = get_vector_db().get_collection_stats()
         st.metric("Documents in DB", stats['count'])
+        if stats.get('duplicates_collapsed'):
+            st.caption(f"♻️ {stats['duplicates_collapsed']} duplicate chunks collapsed")
         st.info(f"Collection: {stats['name']}")
     except Exception as e:
         st.warning("Unable to fetch stats")
 
+    resources = get_resource_stats()
+    st.metric(
+        "Process Memory",
+        f"{resources['rss_mb']:.0f} MiB",
+        help=f"Peak: {resources['peak_rss_mb']:.0f} MiB"
+    )
+    for model in resources['embedding_models']:
+        st.caption(f"🧠 {model}")
+    for model in resources['reranker_models']:
+        st.caption(f"🎯 {model}")
+
     st.divider()
 
     if st.button("🗑️ Clear Chat History"):
@@ -93,19 +146,64 @@ with col1:
             key="query_input"
         )
 
-        if st.button("🔍 Ask", type="primary") and query:
-            with st.spinner("Searching and generating answer..."):
-                try:
-                    result = st.session_state.query_engine.query(query)
+        with st.expander("🔎 Filters"):
+            filter_extensions = st.multiselect(
+                "File types",
+                [".pdf", ".docx", ".doc", ".txt", ".md", ".xlsx", ".xls", ".pptx", ".ppt", ".csv", ".json", ".html"]
+            )
+            filter_provider = st.selectbox("Storage provider", ["any", "s3", "gcp", "azure", "local"])
+            filter_filename = st.text_input("File name", "")
+            filter_prefix = st.text_input("Folder", "", help="Only search files under this folder, e.g. reports/2024")
+
+        rerank = st.checkbox(
+            "Rerank with cross-encoder",
+            value=settings.rerank_enabled,
+            help="Over-fetch candidates and keep the best few by cross-encoder score"
+        )
 
-                    st.session_state.chat_history.append({
-                        'query': query,
-                        'result': result
-                    })
+        # Filters are applied inside the search, so only matching chunks are ranked
+        where = build_where(
+            extension=filter_extensions,
+            storage_provider=None if filter_provider == "any" else filter_provider,
+            filename=filter_filename or None,
+            **prefix_conditions(filter_prefix)
+        )
 
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"❌ Error: {str(e)}")
+        if st.button("🔍 Ask", type="primary") and query:
+            try:
+                events = st.session_state.query_engine.query_stream(query, where=where, rerank=rerank)
+                with st.spinner("Searching documents..."):
+                    retrieval = next(events)
+
+                result = {
+                    'answer': "",
+                    'sources': retrieval['sources'],
+                    'query': retrieval['query'],
+                    'context': retrieval['context'],
+                    'context_tokens': retrieval['context_tokens'],
+                    'tokens_saved': retrieval['tokens_saved'],
+                    'timings': retrieval['timings']
+                }
+
+                def answer_tokens():
+                    for event in events:
+                        if event['type'] == 'token':
+                            yield event['content']
+                        elif event['type'] == 'done':
+                            result['answer'] = event['answer']
+                            result['timings'] = event['timings']
+
+                st.markdown("**Answer:**")
+                st.write_stream(answer_tokens())
+
+                st.session_state.chat_history.append({
+                    'query': query,
+                    'result': result
+                })
+
+                st.rerun()
+            except Exception as e:
+                st.error(f"❌ Error: {str(e)}")
 
 with col2:
     st.subheader("ℹ️ About")
@@ -141,6 +239,13 @@ if st.session_state.chat_history:
 
             if st.checkbox(f"Show context", key=f"context_{len(st.session_state.chat_history) - i}"):
                 st.markdown("**Retrieved Context:**")
+                st.caption(
+                    f"{chat['result']['context_tokens']} tokens "
+                    f"({chat['result']['tokens_saved']} saved by merging, deduplication and budgeting)"
+                )
+                st.caption("⏱️ " + ", ".join(
+                    f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in chat['result']['timings'].items()
+                ))
                 st.text(chat['result']['context'])
 else:
     st.info("No questions asked yet. Start by asking a question above!")